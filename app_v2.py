@@ -1,122 +1,179 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
 import time
 
+# Taken before any heavy import so the startup profile covers them
+run_timer_start = time.perf_counter()
+
+import json
+import os
+
+import numpy as np
+import streamlit as st
+
+from safedrive.alerts import AlertEngine
+from safedrive.config_store import DEFAULT_PROFILE, ConfigStore
+from safedrive.engine import ActionDispatcher
+from safedrive.events import ActionsDispatched, EventBus, stats_table
+from safedrive.executor import BackgroundExecutor, MockVehicleBackend
+from safedrive.history import VitalHistory
+from safedrive.producer import SharedFeed, Snapshot
+from safedrive.profiling import (
+    NULL_STAGE_TIMER, PhaseTimer, StageTimer, markdown_table, record_run, report, stage_table
+)
+from safedrive.render import CARD_ROWS, CardRenderer, PanelRenderer
+from safedrive.risk import RiskEngine
+from safedrive.rules import ACTIONS, CATEGORIES, compile_rules, shared_config
+from safedrive.sessions import MB, SessionRegistry, memory_table
+from safedrive.streaming import AdaptiveScheduler, TickClock
+from safedrive.telemetry import generate_batch, make_rng
+from safedrive.theme import DASHBOARD_CSS
+
+# Plotly, pandas and the non-default sources are imported only when the
+# trends, fleet view or that source are switched on.
+run_timer = PhaseTimer(run_timer_start)
+run_timer.mark("imports")
+
 # Streamlit configuration
 st.set_page_config(page_title="SafeDrive Sync", layout="wide")
 
 # Custom CSS with working color coding
-st.markdown("""
-    <style>
-        .main { background-color: #3a3a3a; color: black; }
-        .stAlert { font-size: 16px; }
-        .stButton>button { border-radius: 8px; padding: 10px; background: #007bff; color: white; border: none; }
-        .stDataFrame { background-color: white; color: black; border-radius: 10px; padding: 10px; }
-        .stSidebar { background: #e9ecef; }
-        .dashboard-container { display: flex; justify-content: space-between; padding: 10px; gap: 20px; }
-        .dashboard-box { 
-            flex: 1; 
-            padding: 20px; 
-            border-radius: 10px; 
-            background: #ffffff; 
-            margin: 10px; 
-            border: 2px solid #ced4da; 
-            text-align: left;
-            transition: transform 0.2s ease;
-        }
-        .dashboard-box:hover { transform: translateY(-3px); }
-        .action-box { border-left: 4px solid #004085; }
-        .notification-box { border-left: 4px solid #dc3545; }
-        .alert-title { 
-            font-weight: bold; 
-            font-size: 22px; 
-            margin-bottom: 15px; 
-            text-align: left;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }
-        .status-item { margin-bottom: 15px; }
-        .status-indicator { font-size: 18px; margin-right: 8px; }
-        .metric-header { 
-            font-size: 18px !important; 
-            margin: 0 0 12px 0 !important; 
-            color: #2c3e50; 
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }
-        .status-text { margin-left: 28px; }
+st.markdown(DASHBOARD_CSS, unsafe_allow_html=True)
+run_timer.mark("page setup")
 
-        /* Multiselect Color Coding */
-        div[data-baseweb="select"] [aria-selected="true"] {
-            background-color: #28a745 !important;
-            color: white !important;
-        }
-        div[data-baseweb="select"] [aria-selected="true"][title*="Moderate"] {
-            background-color: #90EE90 !important;
-            color: #2c3e50 !important;
-        }
-        div[data-baseweb="select"] [aria-selected="true"][title*="High"] {
-            background-color: #FFA500 !important;
-            color: white !important;
-        }
-        div[data-baseweb="select"] [aria-selected="true"][title*="Critical"] {
-            background-color: #dc3545 !important;
-            color: white !important;
-        }
-    </style>
-""", unsafe_allow_html=True)
+# Samples kept per metric for the trend charts (one hour at 1 Hz)
+HISTORY_CAPACITY = 3600
+
+# Adaptive rate: drivers Low on every risk for CALM_AFTER seconds drop to
+# IDLE_HZ; a Critical transition is picked up within CRITICAL_LATENCY seconds
+IDLE_HZ = 1.0
+CALM_AFTER = 5.0
+CRITICAL_LATENCY = 1.0
+
+# Sample rate of the shared feed; sessions ticking slower see every n-th sample
+SHARED_FEED_HZ = 50
+
+# Where "Record Session" writes binary recordings
+RECORDINGS_DIR = "recordings"
+
+# SQLite file holding the versioned action profiles
+CONFIG_DB_PATH = "safedrive_config.sqlite3"
+
+# Memory budgets: a session idle for SESSION_IDLE_AFTER seconds loses its
+# history and fleet views when it is over SESSION_BUDGET, or, least recently
+# active first, while all sessions together are over SERVER_BUDGET
+SESSION_BUDGET = 64 * MB
+SERVER_BUDGET = 1024 * MB
+SESSION_IDLE_AFTER = 300.0
+
+# Persistent action profiles, one connection per server process
+@st.cache_resource
+def get_config_store():
+    return ConfigStore(CONFIG_DB_PATH)
+
+# Per-session memory accounting, one registry per server process
+@st.cache_resource
+def get_session_registry():
+    return SessionRegistry(SESSION_BUDGET, SERVER_BUDGET, SESSION_IDLE_AFTER)
 
 # Session state initialization
 if 'fake_data' not in st.session_state:
     st.session_state.fake_data = None
+if 'fleet_rng' not in st.session_state:
+    st.session_state.fleet_rng = make_rng()
+if 'last_seq' not in st.session_state:
+    st.session_state.last_seq = -1
+if 'memory' not in st.session_state:
+    st.session_state.memory = get_session_registry().register()
 if 'actions' not in st.session_state:
-    st.session_state.actions = {
-        'stress': {'Low': ["Send Notification"], 'Moderate': [], 'High': [], 'Critical': []},
-        'fatigue': {'Low': ["Send Notification"], 'Moderate': [], 'High': [], 'Critical': []},
-        'health': {'Low': ["Send Notification"], 'Moderate': [], 'High': [], 'Critical': []}
-    }
-
-# Notification generator
-def generate_notification(category, level):
-    messages = {
-        "Stress": {
-            "Moderate": "🟠 Moderate stress detected. Consider taking deep breaths.",
-            "High": "🔴 High stress detected! Reduce distractions and focus on the road.",
-            "Critical": "🚨 CRITICAL STRESS! Pull over safely and take a break."
-        },
-        "Fatigue": {
-            "Moderate": "🟠 Moderate fatigue detected. Consider stretching or stopping soon.",
-            "High": "🔴 High fatigue detected! Take a break immediately.",
-            "Critical": "🚨 CRITICAL FATIGUE! Your reaction time is dangerously low. Stop now."
-        },
-        "Health Crisis": {
-            "Moderate": "🟠 Mild health irregularity detected. Monitor your condition.",
-            "High": "🔴 Significant health concern! Consider seeking medical attention.",
-            "Critical": "🚨 EMERGENCY! Health crisis detected. Contact emergency services immediately."
-        }
-    }
-    return messages.get(category, {}).get(level, "✅ Normal Condition")
+    # Read-only and shared by every session with the same configuration
+    st.session_state.actions = shared_config(get_config_store().load(DEFAULT_PROFILE))
+# History and fleet views live in the session's evictable memory; state
+# evicted while the session was idle is rebuilt empty here
+memory = st.session_state.memory
+history = memory.get('history', lambda: VitalHistory(HISTORY_CAPACITY))
+run_timer.mark("session state")
+
+# In-process event bus: the feed publishes samples, the alert engine level
+# changes and the dispatcher the actions it dispatches. The executor and recorder
+# drain their own queues on their own threads, so a slow page never holds up
+# vehicle actions; the executor queue applies backpressure instead of dropping.
+@st.cache_resource
+def get_event_bus():
+    bus = EventBus()
+    executor = get_action_executor()
+    bus.subscribe(
+        "vehicle actions", (ActionsDispatched,), maxsize=256, policy='block',
+        handler=lambda event: executor.submit(event.requests),
+    )
+    return bus
+
+# Shared telemetry feed: one producer per server process, read by every session
+@st.cache_resource
+def get_shared_feed(source_kind="Simulator", location=None, replay_speed=1.0, derive_risk=True):
+    from safedrive import sources
+
+    if source_kind == "Replay Log":
+        source = sources.ReplaySource(location, speed=replay_speed, loop=True)
+    elif source_kind == "UDP Stream":
+        source = sources.UdpSource(port=int(location))
+    elif source_kind == "WebSocket Stream":
+        source = sources.WebSocketSource(location)
+    else:
+        source = sources.RandomSource(hz=SHARED_FEED_HZ)
+    return SharedFeed(
+        hz=SHARED_FEED_HZ, source=source, risk=RiskEngine() if derive_risk else None, bus=get_event_bus()
+    )
+
+# Vehicle action executor: one event loop per server process, shared by sessions
+@st.cache_resource
+def get_action_executor():
+    return BackgroundExecutor(MockVehicleBackend())
+
+# Alert debouncing, shared like the feed so every session sees the same alerts
+@st.cache_resource
+def get_alert_engine():
+    return AlertEngine(bus=get_event_bus())
+
+# Debounces and dispatches every sample once, on its own thread, so vehicle
+# actions never wait for a page to render and still run with no page open.
+# It starts on the default profile; sessions hand it their configuration
+# when they edit or load one.
+@st.cache_resource
+def get_dispatcher():
+    default_rules = compile_rules(get_config_store().load(DEFAULT_PROFILE))
+    return ActionDispatcher(get_event_bus(), get_alert_engine(), default_rules, timer=StageTimer())
+
+# Session recorder, one append-only file per server process and day, fed by
+# the dispatched-actions events while any session has recording switched on
+@st.cache_resource
+def get_recorder(day):
+    from safedrive.recording import RecordingWriter
+
+    os.makedirs(RECORDINGS_DIR, exist_ok=True)
+    writer = RecordingWriter(os.path.join(RECORDINGS_DIR, f"session-{day}.sdsrec"))
+
+    def record(event):
+        if event.recording and time.strftime("%Y%m%d", time.localtime(event.timestamp)) == day:
+            writer.append(event.sample, event.requests, now=event.timestamp)
+
+    get_event_bus().subscribe(f"recorder {day}", (ActionsDispatched,), maxsize=1024, handler=record)
+    return writer
+
+# Windowed analytics of the live stream, fed by the dispatched-actions events
+@st.cache_resource
+def get_stream_analytics():
+    from safedrive.analytics import FleetAnalytics
+
+    analytics = FleetAnalytics()
+    get_event_bus().subscribe("stream analytics", (ActionsDispatched,), maxsize=1024, handler=analytics.observe)
+    return analytics
+
+# This page's own sample queue; when it falls behind the oldest samples are dropped
+if 'events' not in st.session_state:
+    st.session_state.events = get_event_bus().subscribe("dashboard", (Snapshot,), maxsize=64)
 
 # Data generator
 def generate_fake_data():
-    levels = ['Low', 'Moderate', 'High', 'Critical']
-    health_crisis_probs = np.array([0.57, 0.23, 0.1, 0.1])
-    health_crisis_probs /= health_crisis_probs.sum()
-
-    return {
-        'Heart Rate (bpm)': np.random.randint(60, 110),
-        'HRV (ms)': np.random.randint(20, 80),
-        'SpO2 (%)': np.random.randint(90, 100),
-        'Blood Pressure (mmHg)': f"{np.random.randint(90, 140)}/{np.random.randint(60, 90)}",
-        'Blood Sugar (mg/dL)': np.random.randint(70, 140),
-        'Body Temperature': np.random.randint(35.5, 40),
-        'Stress Level': np.random.choice(levels),
-        'Fatigue Risk': np.random.choice(levels, p=[0.5, 0.3, 0.15, 0.05]),
-        'Health Crisis Risk': np.random.choice(levels, p=health_crisis_probs)
-    }
+    return feed.snapshot()
 
 st.title("🚗 SafeDrive Sync - Health Dashboard")
 monitoring = st.toggle("Enable Real-Time Monitoring", value=True)
@@ -124,230 +181,450 @@ monitoring = st.toggle("Enable Real-Time Monitoring", value=True)
 # Vehicle Response Settings
 st.subheader("🚘 Configure Vehicle Actions")
 levels = ['Low', 'Moderate', 'High', 'Critical']
-actions = [
-    "No Action", "Send Notification", "Reduce Speed", "Play Calming Music", 
-    "Turn On Air Conditioning", "Adjust Seat Position", "Activate Horn", 
-    "Call Emergency Services", "Activate Autopilot", "Flash Alert Lights"
-]
 
 def action_multiselect(label, category, level):
-    return st.multiselect(
-        label,
-        actions,
-        default=st.session_state.actions[category][level],
-        key=f"{category}_{level}"
-    )
+    key = f"{category}_{level}"
+    if key not in st.session_state:
+        st.session_state[key] = list(st.session_state.actions[category][level])
+    return st.multiselect(label, ACTIONS, key=key)
+
+# Profile callbacks run before the widgets are drawn, so loading can set them
+def load_profile():
+    name = st.session_state.profile_name
+    version = st.session_state.profile_version
+    try:
+        config = get_config_store().load(name, None if version == "latest" else version)
+    except KeyError as exc:
+        st.session_state.profile_message = f"⚠️ {exc.args[0]}"
+        return
+    st.session_state.actions = shared_config(config)
+    for category, per_level in config.items():
+        for level, selected in per_level.items():
+            st.session_state[f"{category}_{level}"] = list(selected)
+    st.session_state.profile_message = f"Loaded '{name}' ({version})"
+
+def save_profile():
+    name = st.session_state.profile_name
+    version = get_config_store().save(name, st.session_state.actions)
+    st.session_state.profile_message = f"Saved '{name}' as version {version}"
+
+pcol1, pcol2, pcol3, pcol4 = st.columns([2, 1, 1, 1], vertical_alignment="bottom")
+profile_name = pcol1.text_input("Profile", value=DEFAULT_PROFILE, key="profile_name")
+profile_versions = ["latest"] + [v for v, _ in reversed(get_config_store().versions(profile_name))]
+pcol2.selectbox("Version", profile_versions, key="profile_version")
+pcol3.button("Load Profile", on_click=load_profile)
+pcol4.button("Save New Version", on_click=save_profile)
+if 'profile_message' in st.session_state:
+    st.caption(st.session_state.pop('profile_message'))
 
 col1, col2, col3 = st.columns(3)
+selected = {key: {} for _, _, key, _ in CATEGORIES}
 
 with col1:
     st.subheader("🧘 Stress Actions")
     for level in levels:
-        st.session_state.actions['stress'][level] = action_multiselect(f"Stress {level}", 'stress', level)
+        selected['stress'][level] = action_multiselect(f"Stress {level}", 'stress', level)
 
 with col2:
     st.subheader("😴 Fatigue Actions")
     for level in levels:
-        st.session_state.actions['fatigue'][level] = action_multiselect(f"Fatigue {level}", 'fatigue', level)
+        selected['fatigue'][level] = action_multiselect(f"Fatigue {level}", 'fatigue', level)
 
 with col3:
     st.subheader("🚑 Health Crisis Actions")
     for level in levels:
-        st.session_state.actions['health'][level] = action_multiselect(f"Health Crisis {level}", 'health', level)
+        selected['health'][level] = action_multiselect(f"Health Crisis {level}", 'health', level)
+
+st.session_state.actions = shared_config(selected)
+
+# Rules are recompiled only when the multiselect configuration changes
+rules = compile_rules(st.session_state.actions)
+
+# Vehicle actions follow the configuration last edited or loaded in any
+# session; opening a session does not replace the one in use
+dispatcher = get_dispatcher()
+if st.session_state.get('applied_actions') != st.session_state.actions:
+    if 'applied_actions' in st.session_state:
+        dispatcher.rules = rules
+    st.session_state.applied_actions = st.session_state.actions
+if dispatcher.rules is not rules:
+    st.caption("ℹ️ Vehicle actions follow a configuration edited in another session")
+
+# What-if: score the edited configuration against the saved profile offline
+with st.expander("🧪 What-If Policy Evaluation"):
+    wcol1, wcol2, wcol3 = st.columns(3, vertical_alignment="bottom")
+    recordings = sorted(os.listdir(RECORDINGS_DIR)) if os.path.isdir(RECORDINGS_DIR) else []
+    whatif_source = wcol1.selectbox("Samples", ["Generated"] + recordings)
+    whatif_samples = wcol2.number_input(
+        "Generated Samples", min_value=1_000, max_value=100_000_000, value=1_000_000, step=1_000_000,
+        disabled=whatif_source != "Generated",
+    )
+    # Raw generated levels fire far more often than the derived ones in use
+    whatif_derive = wcol3.checkbox(
+        "Derive Risk Levels From Vitals", value=True, key="whatif_derive", disabled=whatif_source != "Generated"
+    )
+    if st.button(f"Compare With Saved Profile '{profile_name}'"):
+        from safedrive import whatif
+
+        try:
+            current = get_config_store().load(profile_name)
+        except KeyError as exc:
+            st.error(f"Could not load the saved profile: {exc}")
+        else:
+            configs = {'current': current, 'candidate': st.session_state.actions}
+            if whatif_source == "Generated":
+                hz = SHARED_FEED_HZ
+                batches = whatif.generated_batches(whatif_samples, derive_risk=whatif_derive)
+                result = whatif.evaluate(batches, configs)
+            else:
+                from safedrive.recording import RecordingReader
+
+                reader = RecordingReader(os.path.join(RECORDINGS_DIR, whatif_source))
+                hz = whatif.recording_hz(reader)
+                result = whatif.evaluate(whatif.recording_batches(reader), configs)
+            st.caption(f"{result['samples']:,} samples evaluated in {result['seconds']:.2f} s (before debouncing and cooldowns)")
+            st.dataframe(whatif.comparison_rows(result, hz=hz), hide_index=True)
+
+# Streaming Settings
+streaming = st.toggle("Continuous Streaming", value=False)
+tick_rate = st.slider("Tick Rate (Hz)", min_value=1, max_value=50, value=5, disabled=not streaming)
+adaptive = st.toggle("Adaptive Rate (slow down while all risks are Low)", value=True)
+
+recording = st.toggle("Record Session", value=False)
+dispatcher.record(memory, recording)
+if recording:
+    clamped = get_recorder(time.strftime("%Y%m%d")).clamped
+    if clamped:
+        st.caption(f"⚠️ {clamped:,} recorded samples had vitals outside the recording format and were clamped")
+
+# Data Source
+derive_risk = st.toggle("Derive Risk Levels From Vitals", value=True)
+source_kind = st.selectbox("Data Source", ["Simulator", "Replay Log", "UDP Stream", "WebSocket Stream"])
+source_location, replay_speed = None, 1.0
+if source_kind == "Replay Log":
+    source_location = st.text_input("Log File (CSV/Parquet)")
+    replay_speed = st.slider("Replay Speed", min_value=0.25, max_value=20.0, value=1.0, step=0.25)
+elif source_kind == "UDP Stream":
+    source_location = st.number_input("UDP Port", min_value=1024, max_value=65535, value=9870)
+elif source_kind == "WebSocket Stream":
+    source_location = st.text_input("WebSocket URL", value="ws://127.0.0.1:8765")
+try:
+    feed = get_shared_feed(source_kind, source_location, replay_speed, derive_risk)
+    # Like the configuration, vehicle actions follow the data source last
+    # changed in any session; opening a session does not switch it
+    feed_choice = (source_kind, source_location, replay_speed, derive_risk)
+    if st.session_state.get('applied_feed') != feed_choice:
+        if 'applied_feed' in st.session_state or dispatcher.feed is None:
+            dispatcher.follow(feed)
+        st.session_state.applied_feed = feed_choice
+    dispatcher.start()
+    if dispatcher.feed is not feed:
+        st.caption("ℹ️ Vehicle actions follow a data source chosen in another session")
+    if getattr(feed.source, 'malformed', 0) and source_kind == "Replay Log":
+        st.caption(f"⚠️ Skipped {feed.source.malformed:,} malformed rows in the log")
+except (OSError, ImportError, KeyError, ValueError) as exc:
+    st.error(f"Could not open {source_kind}: {exc}")
+    monitoring = False
 
 # Real-Time Data Display
 st.subheader("📊 Real-Time Driver Health Data")
+fps_placeholder = st.empty()
 data_placeholder = st.empty()
 action_placeholder = st.empty()
 notification_placeholder = st.empty()
 
-if monitoring:
-    st.session_state.fake_data = generate_fake_data()
-    
-    # Health Metrics Visualization
-    with data_placeholder.container():
-        # First row - Vital Signs
-        col1, col2, col3, col4 = st.columns(4)
-        with col1:
-            st.markdown(f"""
-            <div class='dashboard-box' style='border-left: 5px solid #4CAF50;'>
-                <h3 style='margin:0; color: #2c3e50;'>❤️ Heart Rate</h3>
-                <div style='display: flex; align-items: baseline; gap: 10px;'>
-                    <span style='font-size: 34px; font-weight: bold; color: #2c3e50;'>{st.session_state.fake_data['Heart Rate (bpm)']}</span>
-                    <span style='font-size: 16px; color: #7f8c8d;'>bpm</span>
-                </div>
-                <div style='color: #4CAF50; font-weight: 500;'>Normal</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col2:
-            st.markdown(f"""
-            <div class='dashboard-box' style='border-left: 5px solid #2196F3;'>
-                <h3 style='margin:0; color: #2c3e50;'>🔄 HRV</h3>
-                <div style='display: flex; align-items: baseline; gap: 10px;'>
-                    <span style='font-size: 34px; font-weight: bold; color: #2c3e50;'>{st.session_state.fake_data['HRV (ms)']}</span>
-                    <span style='font-size: 16px; color: #7f8c8d;'>ms</span>
-                </div>
-                <div style='color: #2196F3; font-weight: 500;'>Variability</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col3:
-            st.markdown(f"""
-            <div class='dashboard-box' style='border-left: 5px solid #9C27B0;'>
-                <h3 style='margin:0; color: #2c3e50;'>🩸 SpO2</h3>
-                <div style='display: flex; align-items: baseline; gap: 10px;'>
-                    <span style='font-size: 34px; font-weight: bold; color: #2c3e50;'>{st.session_state.fake_data['SpO2 (%)']}</span>
-                    <span style='font-size: 16px; color: #7f8c8d;'>%</span>
-                </div>
-                <div style='color: #9C27B0; font-weight: 500;'>Oxygenation</div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col4:
-            st.markdown(f"""
-            <div class='dashboard-box' style='border-left: 5px solid #FF9800;'>
-                <h3 style='margin:0; color: #2c3e50;'>🩸 Blood Pressure</h3>
-                <div style='font-size: 34px; font-weight: bold; color: #2c3e50;'>{st.session_state.fake_data['Blood Pressure (mmHg)']}</div>
-                <div style='color: #FF9800; font-weight: 500;'>Continuous Monitoring</div>
-            </div>
-            """, unsafe_allow_html=True)
-
-        # Second row - Other Metrics
-        col5, col6, col7, col8 = st.columns(4)
-        with col5:
-            st.markdown(f"""
-            <div class='dashboard-box'>
-                <h3 style='margin:0; color: #2c3e50;'>🌡️ Body Temperature</h3>
-                <div style='display: flex; align-items: center; gap: 15px;'>
-                    <div style='font-size: 42px; font-weight: bold; color: #e74c3c;'>{st.session_state.fake_data['Body Temperature']}</div>
-                    <div style='width: 100%; background: #eee; height: 10px; border-radius: 5px;'>
-                        <div style='width: {st.session_state.fake_data['Body Temperature']*2}%; background: #e74c3c; height: 10px; border-radius: 5px;'></div>
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col6:
-            stress_color = {"Low": "#2ecc71", "Moderate": "#f1c40f", "High": "#e67e22", "Critical": "#e74c3c"}[st.session_state.fake_data['Stress Level']]
-            st.markdown(f"""
-            <div class='dashboard-box'>
-                <h3 style='margin:0; color: #2c3e50;'>🧠 Stress Level</h3>
-                <div style='display: flex; align-items: center; gap: 15px;'>
-                    <div style='font-size: 32px; color: {stress_color};'>""" +
-                    {"Low": "😊", "Moderate": "😐", "High": "😣", "Critical": "😡"}[st.session_state.fake_data['Stress Level']] +
-                    f"""</div>
-                    <div style='font-size: 24px; font-weight: bold; color: {stress_color};'>
-                        {st.session_state.fake_data['Stress Level']}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col7:
-            fatigue_color = {"Low": "#2ecc71", "Moderate": "#f1c40f", "High": "#e67e22", "Critical": "#e74c3c"}[st.session_state.fake_data['Fatigue Risk']]
-            st.markdown(f"""
-            <div class='dashboard-box'>
-                <h3 style='margin:0; color: #2c3e50;'>💤 Fatigue Risk</h3>
-                <div style='display: flex; align-items: center; gap: 15px;'>
-                    <div style='font-size: 32px; color: {fatigue_color};'>""" +
-                    {"Low": "😃", "Moderate": "😑", "High": "🥱", "Critical": "😴"}[st.session_state.fake_data['Fatigue Risk']] +
-                    f"""</div>
-                    <div style='font-size: 24px; font-weight: bold; color: {fatigue_color};'>
-                        {st.session_state.fake_data['Fatigue Risk']}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-            
-        with col8:
-            risk_color = {"Low": "#2ecc71", "Moderate": "#f1c40f", "High": "#e67e22", "Critical": "#e74c3c"}[st.session_state.fake_data['Health Crisis Risk']]
-            st.markdown(f"""
-            <div class='dashboard-box'>
-                <h3 style='margin:0; color: #2c3e50;'>⚕️ Health Crisis Risk</h3>
-                <div style='display: flex; align-items: center; gap: 15px;'>
-                    <div style='font-size: 32px; color: {risk_color};'>⚠️</div>
-                    <div style='font-size: 24px; font-weight: bold; color: {risk_color};'>
-                        {st.session_state.fake_data['Health Crisis Risk']}
-                    </div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-    # Process actions and notifications
-    actions_taken = {"Stress": [], "Fatigue": [], "Health Crisis": []}
-    notifications = {"Stress": [], "Fatigue": [], "Health Crisis": []}
-
-    for category, risk_key, action_dict in zip(
-        ["Stress", "Fatigue", "Health Crisis"],
-        ["Stress Level", "Fatigue Risk", "Health Crisis Risk"],
-        [st.session_state.actions['stress'], st.session_state.actions['fatigue'], st.session_state.actions['health']]
-    ):
-        current_level = st.session_state.fake_data[risk_key]
-        selected_actions = action_dict.get(current_level, [])
-        
-        for action in selected_actions:
-            if action == "Send Notification":
-                notifications[category].append(generate_notification(category, current_level))
-            else:
-                actions_taken[category].append(f"🚗 {action} activated due to {category} ({current_level})")
-
-    # Display Actions
-    action_placeholder.markdown(f"""
-    <div class='dashboard-container'>
-        <div class='dashboard-box action-box'>
-            <div class='alert-title'>
-                <div style='font-size: 24px;'>🚗</div>
-                <h3>Vehicle Actions</h3>
-            </div>
-            {"".join([
-                f"""<div class='status-item'>
-                    <div class='metric-header'>
-                        <span class='status-indicator'>{
-                            "🟢" if not actions else "🔴"
-                        }</span>
-                        <strong>{category}</strong>
-                    </div>
-                    <div class='status-text' style='color: {
-                        '#2ecc71' if not actions else '#e74c3c'
-                    };'>
-                        {', '.join(actions) if actions else 'No actions taken'}
-                    </div>
-                </div>"""
-                for category, actions in actions_taken.items()
-            ])}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
-
-        # Display Notifications
-    notification_placeholder.markdown(f"""
-    <div class='dashboard-container'>
-        <div class='dashboard-box notification-box'>
-            <div class='alert-title'>
-                <div style='font-size: 24px;'>📢</div>
-                <h3>Infotainment Notifications</h3>
-            </div>
-            {"".join([
-                f"""<div class='status-item'>
-                    <div class='metric-header'>
-                        <span class='status-indicator'>{
-                            "🟢" if not notifs else 
-                            "🟠" if "Moderate" in str(notifs) else 
-                            "🔴"
-                        }</span>
-                        <strong>{category}</strong>
-                    </div>
-                    <div class='status-text' style='color: {
-                        '#2ecc71' if not notifs else 
-                        '#e67e22' if "Moderate" in str(notifs) else 
-                        '#e74c3c'
-                    };'>
-                        {', '.join(notifs) if notifs else 'Normal condition'}
-                    </div>
-                </div>"""
-                for category, notifs in notifications.items()
-            ])}
-        </div>
-    </div>
-    """, unsafe_allow_html=True)
+# Vital Sign Trends
+show_trends = st.toggle("Show Trends", value=False)
+trend_placeholder = st.empty()
+analytics_placeholder = st.empty()
+if show_trends:
+    from safedrive.charts import TrendChart
+
+    trend_chart = memory.get('trend_chart', TrendChart)
+
+# Fleet Overview
+st.subheader("🚚 Fleet Overview")
+fleet_mode = st.toggle("Enable Fleet Mode", value=False)
+if fleet_mode:
+    from safedrive.fleet import DISPLAY_COLUMNS, FILTER_CATEGORIES, FleetStore
+
+    from safedrive.analytics import FleetAnalytics
+
+    fcol1, fcol2, fcol3, fcol4, fcol5 = st.columns(5)
+    fleet_size = fcol1.number_input("Vehicles", min_value=1, max_value=100_000, value=1000, step=100)
+    depots = fcol5.number_input("Depots", min_value=1, max_value=100, value=4)
+    filter_category = fcol2.selectbox("Filter Category", ["Any"] + list(FILTER_CATEGORIES))
+    min_level = fcol3.selectbox("Minimum Level", levels, index=2)
+    sort_label = fcol4.selectbox("Sort By", list(DISPLAY_COLUMNS.values()), index=9)
+    sort_by = {label: name for name, label in DISPLAY_COLUMNS.items()}[sort_label]
+    fleet, fleet_risk = memory.get(
+        'fleet', lambda: (FleetStore(fleet_size), RiskEngine(fleet_size)),
+        valid=lambda f: f[0].capacity == fleet_size,
+    )
+    fleet_schedule = memory.get(
+        'fleet_schedule',
+        lambda: AdaptiveScheduler(
+            fleet_size, tick_rate, idle_hz=IDLE_HZ, calm_after=CALM_AFTER, max_latency=CRITICAL_LATENCY
+        ),
+        valid=lambda s: s.n == fleet_size and s.base_period == 1.0 / tick_rate,
+    )
+    # Vehicles are spread over the depots round-robin
+    fleet_analytics, fleet_depots = memory.get(
+        'fleet_analytics',
+        lambda: (
+            FleetAnalytics([f"Depot {i + 1}" for i in range(depots)], n_rows=fleet_size),
+            np.arange(fleet_size) % depots,
+        ),
+        valid=lambda a: a[1].size == fleet_size and len(a[0].group_names) == depots,
+    )
+    if st.button(f"Assign Profile '{profile_name}' To All {fleet_size} Vehicles"):
+        if len(profile_versions) == 1 and profile_name != DEFAULT_PROFILE:
+            st.caption(f"⚠️ Save '{profile_name}' before assigning it")
+        else:
+            get_config_store().assign(fleet.driver_ids, profile_name)
+            st.caption(f"Assigned {fleet_size} vehicles to '{profile_name}'")
+    fleet_placeholder = st.empty()
+
+# Sidebar performance panel; timing is a no-op while it is hidden
+perf_panel = st.sidebar.toggle("⚡ Performance Panel", value=False)
+if perf_panel:
+    if 'stage_timer' not in st.session_state or st.session_state.stage_timer is NULL_STAGE_TIMER:
+        st.session_state.stage_timer = StageTimer()
+    # Built when clicked, so the export includes the streaming loop's ticks;
+    # it runs on another thread without session state, hence the bound timer
+    stage_timer = st.session_state.stage_timer
+    st.sidebar.download_button(
+        "Export timings (JSON)",
+        data=lambda: json.dumps(stage_timer.export()),
+        file_name="safedrive-timings.json",
+        mime="application/json",
+    )
+    perf_placeholder = st.sidebar.empty()
+else:
+    st.session_state.stage_timer = NULL_STAGE_TIMER
+
+# Memory accounting: measure this session on every run (and once a second
+# while streaming), then let the registry evict idle sessions. The shared
+# configurations are not charged to the session.
+memory_placeholder = st.sidebar.empty()
+UNCHARGED_STATE = ('memory', 'actions', 'applied_actions')
+
+def account_memory():
+    registry = get_session_registry()
+    memory.touch({key: value for key, value in st.session_state.items() if key not in UNCHARGED_STATE})
+    registry.enforce(keep=memory)
+    if memory.nbytes > registry.session_budget:
+        memory_placeholder.warning(
+            f"This session holds {memory.nbytes / MB:.0f} MB, over its {registry.session_budget / MB:.0f} MB budget"
+        )
+    else:
+        memory_placeholder.empty()
+
+account_memory()
+
+run_timer.mark("controls")
+
+# Health Metrics Visualization
+# One placeholder per card, created on first use in this run; the renderer
+# only returns HTML for cards whose value changed since the previous tick.
+card_placeholders = {}
+card_renderer = CardRenderer()
+
+def render_metrics(cards):
+    if not card_placeholders:
+        with data_placeholder.container():
+            for row in CARD_ROWS:
+                for key, col in zip(row, st.columns(len(row))):
+                    card_placeholders[key] = col.empty()
+    for key, html in cards.items():
+        card_placeholders[key].markdown(html, unsafe_allow_html=True)
+
+# Vehicle Actions and Infotainment panels: a static head plus one placeholder
+# per category, so a level change only resends the affected category.
+panel_renderers = {kind: PanelRenderer(kind) for kind in ('actions', 'notifications')}
+panel_placeholders = {'actions': action_placeholder, 'notifications': notification_placeholder}
+panel_items = {}
+
+def render_panel(kind, items):
+    if kind not in panel_items:
+        renderer = panel_renderers[kind]
+        with panel_placeholders[kind].container():
+            st.markdown(renderer.head_html, unsafe_allow_html=True)
+            panel_items[kind] = {category: st.empty() for category in renderer.categories}
+    for category, html in items.items():
+        panel_items[kind][category].markdown(html, unsafe_allow_html=True)
+
+# Fleet table, capped so large fleets do not flood the browser
+FLEET_TABLE_ROWS = 500
+
+def fleet_profiles():
+    """Each vehicle's assigned profile as ``(revision, index, [RuleTable])``, resolved again only after a store write."""
+    store = get_config_store()
+    return memory.get(
+        'fleet_profiles',
+        lambda: (store.revision(), *store.fleet_rules(fleet.driver_ids)),
+        valid=lambda p: p[0] == store.revision() and p[1].size == fleet.capacity,
+    )
+
+def render_fleet():
+    _, profile_index, profile_rules = fleet_profiles()
+    batch = generate_batch(fleet.capacity, st.session_state.fleet_rng)
+    if derive_risk:
+        fleet_risk.apply(batch)
+    now = time.time()
+    rows = None
+    groups = fleet_depots
+    profiles = profile_index
+    schedule = fleet_schedule
+    if adaptive:
+        # Vehicle-side generation and risk scoring cover the whole fleet, but
+        # only vehicles that are due are ingested and only then is the table
+        # resent, so the cost follows the number of at-risk vehicles
+        rows = schedule.due(now)
+        if len(rows) == 0:
+            return
+        worst = np.maximum.reduce([batch[column][rows] for column in FILTER_CATEGORIES.values()])
+        schedule.update(rows, worst, now)
+        batch = {name: column[rows] for name, column in batch.items()}
+        groups = groups[rows]
+        profiles = profiles[rows]
+    fleet.update(batch, rows=rows, now=now)
+    # Actions follow each vehicle's assigned profile, not this page's edits
+    fleet_analytics.update(batch, now, groups=groups, rules=profile_rules, rows=rows, profiles=profiles)
+    mask = fleet.mask(filter_category, min_level)
+    with fleet_placeholder.container():
+        rate = (
+            f" · adaptive: {schedule.full_rate} at full rate, {schedule.effective_hz:,.0f} samples/s"
+            if adaptive else ""
+        )
+        st.caption(f"{int(mask.sum())} of {fleet.capacity} vehicles at {min_level} or above ({filter_category}){rate}")
+        st.dataframe(fleet.to_frame(mask, sort_by=sort_by, limit=FLEET_TABLE_ROWS), hide_index=True)
+        st.caption("Per depot: level entries per hour over the last hour, heart rate quantile over 15 min")
+        st.dataframe(fleet_analytics.summary(), hide_index=True)
+        fired = {
+            action: sum(fleet_analytics.action_count(category, action) for category, _, _, _ in CATEGORIES)
+            for action in ACTIONS
+        }
+        st.caption(
+            "Actions over the last hour, by each vehicle's assigned profile: "
+            + " · ".join(f"{action}: {count:,}" for action, count in fired.items() if count)
+        )
+
+# Trend charts resend the whole figure, so they are refreshed at most once a second
+CHART_REFRESH_SECONDS = 1.0
+last_chart_refresh = 0.0
+
+def render_trends():
+    global last_chart_refresh
+    now = time.perf_counter()
+    if now - last_chart_refresh < CHART_REFRESH_SECONDS:
+        return
+    if trend_chart.update(history):
+        trend_placeholder.plotly_chart(trend_chart.figure)
+    summary = get_stream_analytics().summary()[0]
+    analytics_placeholder.caption(
+        " · ".join(f"{label}: {value}" for label, value in summary.items() if label != 'Group')
+        + " (events per hour over the last hour, quantile over 15 min)"
+    )
+    last_chart_refresh = now
+
+def monitor_tick():
+    perf = st.session_state.stage_timer
+    perf.begin()
+    snapshot = generate_fake_data()
+    perf.lap("generation")
+    if snapshot is None:
+        data_placeholder.info("⏳ Waiting for telemetry from the data source...")
+        return None
+    st.session_state.fake_data = snapshot.sample
+    # Panels follow the dispatcher's debounced levels, the cards show raw values
+    latest = dispatcher.latest
+    debounced = snapshot.sample if latest is None else latest[1]
+    # Samples queued for this page since the last tick also go into the trends
+    queued = st.session_state.events.drain()
+    if snapshot.seq != st.session_state.last_seq:
+        for earlier in queued:
+            if st.session_state.last_seq < earlier.seq < snapshot.seq:
+                history.append_sample(earlier.sample, now=earlier.timestamp)
+        history.append_sample(snapshot.sample, now=snapshot.timestamp)
+        st.session_state.last_seq = snapshot.seq
+        if recording:
+            # Opens the day's file; the dispatcher flags samples for recording
+            get_recorder(time.strftime("%Y%m%d"))
+    perf.lap("history/recorder")
+    panels = {kind: renderer.render(dispatcher.rules, debounced) for kind, renderer in panel_renderers.items()}
+    perf.lap("panels html")
+    cards = card_renderer.render(st.session_state.fake_data)
+    perf.lap("cards html")
+    render_metrics(cards)
+    for kind, items in panels.items():
+        if items:
+            render_panel(kind, items)
+    perf.lap("streamlit deltas")
+    if show_trends:
+        render_trends()
+        perf.lap("trends")
+    if fleet_mode:
+        render_fleet()
+        perf.lap("fleet")
+    return snapshot.sample
+
+# Performance panel: per-stage tick timings, refreshed at most once a second
+PERF_REFRESH_SECONDS = 1.0
+last_perf_refresh = 0.0
+
+def render_perf_panel(force=False):
+    global last_perf_refresh
+    now = time.perf_counter()
+    if not perf_panel or not (force or now - last_perf_refresh >= PERF_REFRESH_SECONDS):
+        return
+    perf_placeholder.markdown(
+        stage_table(st.session_state.stage_timer)
+        + "\n\nDispatcher thread (shared by all sessions):\n\n" + stage_table(dispatcher.timer)
+        + "\n\n" + stats_table(get_event_bus())
+        + "\n\n" + memory_table(get_session_registry())
+    )
+    last_perf_refresh = now
+
+# Startup profile: cold start of this process vs. the mean of later reruns
+profile_placeholder = st.empty()
+
+def finish_profile():
+    run_timer.mark("monitoring")
+    record_run(run_timer)
+    with profile_placeholder.expander("⏱️ Startup Profile"):
+        st.markdown(markdown_table(report()))
+
+if monitoring and streaming:
+    # Continuous loop: only the placeholders are updated in place, the script
+    # is not rerun. Any widget interaction interrupts the loop via a rerun.
+    clock = TickClock(tick_rate)
+    # This page's own rate follows the raw levels, so escalation is not
+    # delayed by the alert debouncing
+    schedule = AdaptiveScheduler(1, tick_rate, idle_hz=IDLE_HZ, calm_after=CALM_AFTER, max_latency=CRITICAL_LATENCY)
+    monitor_tick()
+    finish_profile()
+    last_report = 0.0
+    while True:
+        now = clock.wait()
+        sample = monitor_tick()
+        if adaptive and sample is not None and not fleet_mode:
+            schedule.update([0], [max(sample.stress, sample.fatigue, sample.health)], time.time())
+            clock.set_hz(1.0 / schedule.interval[0])
+        render_perf_panel()
+        if now - last_report >= 1.0:
+            status = "🟢" if clock.keeping_up else "🔴"
+            fps_placeholder.caption(
+                f"{status} Achieved {clock.achieved_hz:.1f} Hz / target {clock.target_hz:.0f} Hz"
+                f" · missed ticks: {clock.missed}"
+                f" · {feed.source.name}: {feed.source.samples_per_sec:.0f} samples/s, backlog {feed.source.backlog}"
+                + (f" · ⚠️ {feed.source.error!r}, retrying" if getattr(feed.source, 'error', None) else "")
+            )
+            account_memory()
+            last_report = now
+elif monitoring:
+    monitor_tick()
+    finish_profile()
+    render_perf_panel(force=True)
+else:
+    finish_profile()
@@ -0,0 +1,204 @@
+"""Headless per-tick benchmarks for the SafeDrive Sync pipeline.
+
+Measures throughput and p50/p99 latency of data generation, action dispatch,
+notification lookup and the dashboard's HTML builders, outside a browser, and
+writes the results as JSON.  The ``legacy`` cases reproduce the original
+per-sample code from app.py so the two styles can be compared directly.
+
+    python benchmark.py --output bench_results.json
+    python benchmark.py --compare bench_results.json   # exit 1 on regressions
+"""
+import argparse
+import json
+import platform
+import sys
+import time
+from itertools import cycle
+
+import numpy as np
+
+from safedrive.render import CARDS, CardRenderer, PanelRenderer, actions_panel_html, notifications_panel_html
+from safedrive.rules import DEFAULT_ACTIONS, RuleTable, compile_rules, generate_notification
+from safedrive.telemetry import BatchSampler, LEVELS, generate_batch, make_rng, to_display, to_record, to_sample
+
+# A configuration with actions on every level so dispatch does real work
+BENCH_ACTIONS = {
+    key: {
+        'Low': ["Send Notification"],
+        'Moderate': ["Send Notification", "Play Calming Music"],
+        'High': ["Send Notification", "Reduce Speed", "Flash Alert Lights"],
+        'Critical': ["Send Notification", "Reduce Speed", "Call Emergency Services", "Activate Autopilot"],
+    }
+    for key in DEFAULT_ACTIONS
+}
+BATCH_SIZE = 10_000
+
+
+def legacy_generate_fake_data():
+    levels = ['Low', 'Moderate', 'High', 'Critical']
+    health_crisis_probs = np.array([0.57, 0.23, 0.1, 0.1])
+    health_crisis_probs /= health_crisis_probs.sum()
+
+    return {
+        'Heart Rate (bpm)': np.random.randint(60, 110),
+        'HRV (ms)': np.random.randint(20, 80),
+        'SpO2 (%)': np.random.randint(90, 100),
+        'Blood Pressure (mmHg)': f"{np.random.randint(90, 140)}/{np.random.randint(60, 90)}",
+        'Blood Sugar (mg/dL)': np.random.randint(70, 140),
+        'Body Temperature': np.random.randint(35.5, 40),
+        'Stress Level': np.random.choice(levels),
+        'Fatigue Risk': np.random.choice(levels, p=[0.5, 0.3, 0.15, 0.05]),
+        'Health Crisis Risk': np.random.choice(levels, p=health_crisis_probs)
+    }
+
+
+def legacy_dispatch(data, config):
+    actions_taken = {"Stress": [], "Fatigue": [], "Health Crisis": []}
+    notifications = {"Stress": [], "Fatigue": [], "Health Crisis": []}
+
+    for category, risk_key, action_dict in zip(
+        ["Stress", "Fatigue", "Health Crisis"],
+        ["Stress Level", "Fatigue Risk", "Health Crisis Risk"],
+        [config['stress'], config['fatigue'], config['health']]
+    ):
+        current_level = data[risk_key]
+        selected_actions = action_dict.get(current_level, [])
+
+        for action in selected_actions:
+            if action == "Send Notification":
+                notifications[category].append(generate_notification(category, current_level))
+            else:
+                actions_taken[category].append(f"🚗 {action} activated due to {category} ({current_level})")
+
+    return actions_taken, notifications
+
+
+def measure(func, iterations, warmup, items_per_call=1):
+    """Time ``iterations`` calls of ``func()`` one by one."""
+    for _ in range(warmup):
+        func()
+    samples = np.empty(iterations, dtype=np.int64)
+    clock = time.perf_counter_ns
+    for i in range(iterations):
+        start = clock()
+        func()
+        samples[i] = clock() - start
+    total_s = samples.sum() / 1e9
+    return {
+        'calls': iterations,
+        'items_per_call': items_per_call,
+        'calls_per_s': iterations / total_s,
+        'items_per_s': iterations * items_per_call / total_s,
+        'mean_us': float(samples.mean() / 1e3),
+        'p50_us': float(np.percentile(samples, 50) / 1e3),
+        'p99_us': float(np.percentile(samples, 99) / 1e3),
+    }
+
+
+def build_cases(seed=0):
+    rng = make_rng(seed)
+    batch = generate_batch(BATCH_SIZE, rng)
+    records = [to_record(batch, i) for i in range(1024)]
+    samples = [to_sample(batch, i) for i in range(1024)]
+    rules = compile_rules(BENCH_ACTIONS)
+    dispatched = [
+        rules.dispatch(s) + ({rule.category: rule.level for rule in rules.rules_for(s)},) for s in samples
+    ]
+
+    next_record = cycle(records).__next__
+    next_sample = cycle(samples).__next__
+    next_dispatched = cycle(dispatched).__next__
+    next_level = cycle([(c, l) for c in ("Stress", "Fatigue", "Health Crisis") for l in LEVELS]).__next__
+    sampler = BatchSampler(seed=seed)
+    renderer = CardRenderer()
+    panels = [PanelRenderer(kind) for kind in ('actions', 'notifications')]
+
+    def panel_deltas():
+        sample = next_sample()
+        return [panel.render(rules, sample) for panel in panels]
+
+    def full_cards():
+        sample = next_sample()
+        return [build(get(sample)) for get, build in CARDS.values()]
+
+    return {
+        'generate_fake_data[legacy]': (legacy_generate_fake_data, 1),
+        'generate_fake_data[sampler]': (sampler.next_record, 1),
+        'generate_fake_data[sample]': (sampler.next_sample, 1),
+        'to_display': (lambda: to_display(next_sample()), 1),
+        'generate_batch': (lambda: generate_batch(BATCH_SIZE, rng), BATCH_SIZE),
+        'dispatch[legacy]': (lambda: legacy_dispatch(next_record(), BENCH_ACTIONS), 1),
+        'dispatch[rule_table]': (lambda: rules.dispatch(next_sample()), 1),
+        'dispatch_batch': (lambda: rules.dispatch_batch(batch), BATCH_SIZE),
+        'compile_rules[uncached]': (lambda: RuleTable(BENCH_ACTIONS), 1),
+        'generate_notification': (lambda: generate_notification(*next_level()), 1),
+        'metric_cards[full]': (full_cards, 8),
+        'metric_cards[incremental]': (lambda: renderer.render(next_sample()), 8),
+        'actions_panel_html': (lambda: actions_panel_html(next_dispatched()[0]), 1),
+        'notifications_panel_html': (lambda: notifications_panel_html(*next_dispatched()[1:]), 1),
+        'panels[incremental]': (panel_deltas, 2),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Cases whose p50 latency grew by more than ``tolerance`` (a fraction)."""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get('results', {}).get(name)
+        if old is None:
+            continue
+        change = result['p50_us'] / old['p50_us'] - 1 if old['p50_us'] else 0.0
+        if change > tolerance:
+            regressions.append((name, old['p50_us'], result['p50_us'], change))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', default='bench_results.json', help="JSON file to write")
+    parser.add_argument('--iterations', type=int, default=5000)
+    parser.add_argument('--warmup', type=int, default=200)
+    parser.add_argument('--only', default=None, help="run only cases containing this substring")
+    parser.add_argument('--compare', default=None, help="baseline JSON to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed p50 slowdown vs. baseline")
+    args = parser.parse_args(argv)
+
+    # Read the baseline first: --output may overwrite the same file
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    results = {}
+    for name, (func, items) in build_cases().items():
+        if args.only and args.only not in name:
+            continue
+        # Batched cases are ~1000x slower per call; keep their wall time comparable
+        iterations = max(args.iterations // 50, 20) if items >= BATCH_SIZE else args.iterations
+        results[name] = measure(func, iterations, min(args.warmup, iterations), items)
+        r = results[name]
+        print(f"{name:32s} {r['items_per_s']:>14,.0f} items/s  p50 {r['p50_us']:9.2f} us  p99 {r['p99_us']:9.2f} us")
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {args.output}")
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        for name, old, new, change in regressions:
+            print(f"REGRESSION {name}: p50 {old:.2f} -> {new:.2f} us (+{change:.0%})")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
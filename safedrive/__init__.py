@@ -0,0 +1 @@
+"""Reusable, Streamlit-free building blocks for the SafeDrive Sync dashboard."""
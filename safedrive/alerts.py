@@ -0,0 +1,125 @@
+"""Alert debouncing: per-category hysteresis, dwell times and cooldowns.
+
+A driver hovering around a threshold makes the raw level flap every sample.
+``AlertEngine`` turns the raw levels into a debounced level per category:
+
+* escalation is accepted only after the higher level has held for
+  ``escalate_dwell`` seconds (levels at or above ``immediate_level`` escalate
+  at once so Critical transitions are never delayed),
+* de-escalation needs ``release_dwell`` seconds below the active level, which
+  is the hysteresis band that stops flapping,
+* the same (category, level, action) request is emitted at most once per
+  ``cooldown`` seconds.
+
+Counters of emitted and suppressed requests and of absorbed level changes are
+kept per category.  A cooldown decision is counted once per sample: asking
+again about the same request for the same ``seq`` returns the first answer
+without counting it again.  With an ``EventBus`` every change of a debounced level is
+published once as a ``LevelChange`` event.
+"""
+import threading
+from collections import Counter
+
+from safedrive.events import LevelChange
+from safedrive.rules import CATEGORIES
+from safedrive.telemetry import COLUMNS, LEVELS, LEVEL_CODES
+
+
+class _CategoryState:
+    __slots__ = ('active', 'pending', 'pending_since')
+
+    def __init__(self):
+        self.active = None
+        self.pending = 0  # +1 while escalating, -1 while releasing
+        self.pending_since = 0.0
+
+
+class AlertEngine:
+    def __init__(self, escalate_dwell=1.0, release_dwell=5.0, cooldown=30.0, immediate_level='Critical', bus=None):
+        self.escalate_dwell = escalate_dwell
+        self.release_dwell = release_dwell
+        self.cooldown = cooldown
+        self.immediate_code = LEVEL_CODES[immediate_level]
+        self.bus = bus
+        self._states = {category: _CategoryState() for category, _, _, _ in CATEGORIES}
+        self._fields = [(category, COLUMNS.index(column)) for category, _, _, column in CATEGORIES]
+        self._last_emitted = {}
+        self._decided = {}  # signature -> (seq, allowed) of the last decision
+        self._lock = threading.Lock()
+        self.emitted = Counter()
+        self.suppressed = Counter()
+        self.held = Counter()
+
+    def _step(self, category, state, code, now):
+        if state.active is None or code == state.active:
+            state.active = code
+            state.pending = 0
+            return
+        direction = 1 if code > state.active else -1
+        if direction > 0 and code >= self.immediate_code:
+            state.active = code
+            state.pending = 0
+            return
+        if state.pending != direction:
+            state.pending = direction
+            state.pending_since = now
+        dwell = self.escalate_dwell if direction > 0 else self.release_dwell
+        if now - state.pending_since >= dwell:
+            state.active = code
+            state.pending = 0
+        else:
+            self.held[category] += 1
+
+    def observe(self, sample, now, seq=None):
+        """Return a copy of ``sample`` with the three risk levels debounced.
+
+        ``seq`` identifies the sample in the ``LevelChange`` events published.
+        """
+        changes = []
+        with self._lock:
+            debounced = list(sample)
+            for category, field in self._fields:
+                state = self._states[category]
+                previous = state.active
+                self._step(category, state, sample[field], now)
+                debounced[field] = state.active
+                if previous is not None and state.active != previous:
+                    changes.append(LevelChange(seq, now, category, LEVELS[previous], LEVELS[state.active]))
+            debounced = sample._make(debounced)
+        if self.bus is not None:
+            for change in changes:
+                self.bus.publish(change)
+        return debounced
+
+    def allow(self, category, level, action, now, seq=None):
+        """Cooldown gate for one (category, level, action) emission of sample ``seq``."""
+        with self._lock:
+            signature = (category, level, action)
+            if seq is not None:
+                decided = self._decided.get(signature)
+                if decided is not None and decided[0] == seq:
+                    return decided[1]
+            last = self._last_emitted.get(signature)
+            allowed = last is None or now - last >= self.cooldown
+            if allowed:
+                self._last_emitted[signature] = now
+                self.emitted[category] += 1
+            else:
+                self.suppressed[category] += 1
+            if seq is not None:
+                self._decided[signature] = (seq, allowed)
+            return allowed
+
+    def filter_requests(self, requests, now, seq=None):
+        """Drop ``ActionRequest``s that are still inside their cooldown window."""
+        return [r for r in requests if self.allow(r.category, r.level, r.action, now, seq)]
+
+    def stats(self):
+        return {
+            category: {
+                'emitted': self.emitted[category],
+                'suppressed': self.suppressed[category],
+                'held': self.held[category],
+            }
+            for category in self._states
+        }
@@ -0,0 +1,246 @@
+"""Windowed fleet analytics over the stream of samples and dispatched actions.
+
+Everything is kept in fixed-width time buckets.  ``SlidingCounts`` holds a
+ring of count arrays plus their running total, so the sliding-window total is
+maintained incrementally (expired buckets are subtracted as time advances)
+and a query is a read, not a rescan of history.  The last complete bucket is
+the tumbling-window count.  ``WindowedQuantiles`` is a ``SlidingCounts`` over
+histogram bins, a quantile sketch whose memory and query cost depend only on
+the bin count; integer vitals at resolution 1 give exact quantiles.
+
+``FleetAnalytics`` combines them per group (e.g. depot): entries into each
+risk level per category, actions fired per category, and vital-sign
+quantiles.  It is fed either whole fleet batches (``update``) or the
+dashboard's ``ActionsDispatched`` events (``observe``, usable as an event bus
+handler).
+"""
+import threading
+
+import numpy as np
+
+from safedrive.rules import ACTIONS, CATEGORIES
+from safedrive.telemetry import COLUMNS, LEVELS, LEVEL_CODES
+
+# Metric -> (low, high, resolution) of its histogram; values outside are clipped
+QUANTILE_BINS = {
+    'heart_rate': (0, 256, 1),
+    'hrv': (0, 256, 1),
+    'spo2': (0, 101, 1),
+    'bp_systolic': (0, 256, 1),
+    'bp_diastolic': (0, 256, 1),
+    'blood_sugar': (0, 512, 1),
+    'body_temp': (30, 45, 0.1),
+}
+
+_ACTION_INDEX = {action: i for i, action in enumerate(ACTIONS)}
+_CATEGORY_INDEX = {category: c for c, (category, _, _, _) in enumerate(CATEGORIES)}
+
+
+class SlidingCounts:
+    """Counts of shape ``shape`` over a sliding window of ``bucket``-second buckets."""
+
+    def __init__(self, shape, window=3600.0, bucket=60.0):
+        self.window = window
+        self.bucket = bucket
+        self.n_buckets = max(int(np.ceil(window / bucket)), 1)
+        self._buckets = np.zeros((self.n_buckets,) + tuple(shape), dtype=np.int64)
+        self.total = np.zeros(shape, dtype=np.int64)
+        self._current = None  # absolute index of the newest bucket
+        self._first = None
+
+    def advance(self, now):
+        """Expire the buckets that fell out of the window by ``now``."""
+        index = int(now // self.bucket)
+        if self._current is None:
+            self._current = self._first = index
+            return
+        steps = index - self._current
+        if steps <= 0:
+            return
+        for k in range(1, min(steps, self.n_buckets) + 1):
+            slot = (self._current + k) % self.n_buckets
+            self.total -= self._buckets[slot]
+            self._buckets[slot] = 0
+        self._current = index
+
+    def add(self, counts, now):
+        self.advance(now)
+        # Late arrivals are counted in the newest bucket
+        self._buckets[self._current % self.n_buckets] += counts
+        self.total += counts
+
+    def sliding(self, now=None):
+        """Totals over the whole window."""
+        if now is not None:
+            self.advance(now)
+        return self.total
+
+    def tumbling(self, now=None):
+        """Totals of the last complete bucket."""
+        if now is not None:
+            self.advance(now)
+        if self._current is None:
+            return np.zeros_like(self.total)
+        return self._buckets[(self._current - 1) % self.n_buckets]
+
+    def span(self):
+        """Seconds of data the sliding totals cover, at most ``window``."""
+        if self._current is None:
+            return 0.0
+        return min(self._current - self._first + 1, self.n_buckets) * self.bucket
+
+    @property
+    def nbytes(self):
+        return self._buckets.nbytes + self.total.nbytes
+
+
+class WindowedQuantiles:
+    """Histogram quantile sketch over a sliding window, optionally per group."""
+
+    def __init__(self, low, high, resolution=1, n_groups=1, window=900.0, bucket=60.0):
+        self.low = low
+        self.resolution = resolution
+        self.n_bins = int(round((high - low) / resolution))
+        self.n_groups = n_groups
+        self.counts = SlidingCounts((n_groups, self.n_bins), window, bucket)
+
+    def add(self, values, now, groups=None):
+        bins = np.clip(((np.asarray(values) - self.low) / self.resolution).astype(np.int64), 0, self.n_bins - 1)
+        if groups is None:
+            hist = np.zeros((self.n_groups, self.n_bins), dtype=np.int64)
+            hist[0] = np.bincount(bins, minlength=self.n_bins)
+        else:
+            flat = np.asarray(groups, dtype=np.int64) * self.n_bins + bins
+            hist = np.bincount(flat, minlength=self.n_groups * self.n_bins).reshape(self.n_groups, self.n_bins)
+        self.counts.add(hist, now)
+
+    def quantile(self, q, group=None, now=None):
+        """Value at quantile ``q`` (0..1) in the window; ``None`` when empty."""
+        hist = self.counts.sliding(now)
+        hist = hist.sum(axis=0) if group is None else hist[group]
+        total = hist.sum()
+        if total == 0:
+            return None
+        cumulative = np.cumsum(hist)
+        index = int(np.searchsorted(cumulative, max(q * total, 1), side='left'))
+        return self.low + min(index, self.n_bins - 1) * self.resolution
+
+
+class FleetAnalytics:
+    """Level-entry and action counts per group, plus vital quantiles, over time windows."""
+
+    def __init__(self, group_names=("All",), event_window=3600.0, vitals_window=900.0, bucket=60.0, n_rows=None):
+        self.group_names = list(group_names)
+        self.n_rows = n_rows
+        n_groups = len(self.group_names)
+        self.events = SlidingCounts((n_groups, len(CATEGORIES), len(LEVELS)), event_window, bucket)
+        self.actions = SlidingCounts((n_groups, len(CATEGORIES), len(ACTIONS)), event_window, bucket)
+        self.vitals = {
+            metric: WindowedQuantiles(low, high, resolution, n_groups, vitals_window, bucket)
+            for metric, (low, high, resolution) in QUANTILE_BINS.items()
+        }
+        self._levels = None  # last risk levels per row, to count entries
+        self._lock = threading.Lock()
+        self.samples = 0
+
+    def _entries(self, batch, groups, rows):
+        n_groups = len(self.group_names)
+        levels = np.stack([batch[column] for _, _, _, column in CATEGORIES]).astype(np.int64)
+        n_rows = levels.shape[1] if rows is None else self.n_rows
+        if self._levels is None or self._levels.shape[1] != n_rows:
+            # -1 marks rows not seen yet, so their first levels count as entries
+            self._levels = np.full((len(CATEGORIES), n_rows), -1, dtype=np.int64)
+        if rows is None:
+            rows = slice(None)
+        entered = levels != self._levels[:, rows]
+        self._levels[:, rows] = levels
+        counts = np.zeros((n_groups, len(CATEGORIES), len(LEVELS)), dtype=np.int64)
+        for c in range(len(CATEGORIES)):
+            flat = groups[entered[c]] * len(LEVELS) + levels[c][entered[c]]
+            counts[:, c] = np.bincount(flat, minlength=n_groups * len(LEVELS)).reshape(n_groups, len(LEVELS))
+        return counts
+
+    def update(self, batch, now, groups=None, rules=None, rows=None, profiles=None):
+        """Add a columnar batch; ``groups`` maps each row to a group index.
+
+        ``rows`` gives the fleet row of each sample when the batch covers only
+        part of a fleet of ``n_rows``.  With a compiled ``RuleTable`` the
+        actions it fires are counted too.  ``rules`` may instead be a list of
+        tables, one per profile, with ``profiles`` giving each row's index
+        into it (see ``ConfigStore.fleet_rules``).
+        """
+        n = len(batch[COLUMNS[0]])
+        groups = np.zeros(n, dtype=np.int64) if groups is None else np.asarray(groups, dtype=np.int64)
+        if rows is not None and self.n_rows is None:
+            raise ValueError("updating a subset of rows needs n_rows")
+        with self._lock:
+            self.events.add(self._entries(batch, groups, rows), now)
+            if rules is not None:
+                tables = [rules] if profiles is None else rules
+                profiles = np.zeros(n, dtype=np.int64) if profiles is None else np.asarray(profiles, dtype=np.int64)
+                n_groups = len(self.group_names)
+                shape = (len(tables), n_groups, len(LEVELS))
+                counts = np.zeros((n_groups, len(CATEGORIES), len(ACTIONS)), dtype=np.int64)
+                for c, (_, _, _, column) in enumerate(CATEGORIES):
+                    flat = (profiles * n_groups + groups) * len(LEVELS) + batch[column]
+                    per_level = np.bincount(flat, minlength=np.prod(shape)).reshape(shape)
+                    fires = np.stack([table.fires[c] for table in tables]).astype(np.int64)
+                    counts[:, c] = np.einsum('pgl,pla->ga', per_level, fires)
+                self.actions.add(counts, now)
+            for metric, sketch in self.vitals.items():
+                sketch.add(batch[metric], now, groups)
+            self.samples += n
+
+    def observe(self, event, group=0):
+        """Add one ``ActionsDispatched`` event."""
+        batch = {name: np.array([value]) for name, value in zip(COLUMNS, event.sample)}
+        self.update(batch, event.timestamp, groups=[group])
+        counts = np.zeros((len(self.group_names), len(CATEGORIES), len(ACTIONS)), dtype=np.int64)
+        for request in event.requests:
+            counts[group, _CATEGORY_INDEX[request.category], _ACTION_INDEX[request.action]] += 1
+        with self._lock:
+            self.actions.add(counts, event.timestamp)
+
+    # Queries: each is a read of the maintained window totals
+
+    def _group_index(self, group):
+        return None if group is None else self.group_names.index(group)
+
+    def event_count(self, category, level, group=None, now=None):
+        """Entries into ``level`` of ``category`` within the event window."""
+        with self._lock:
+            totals = self.events.sliding(now)[:, _CATEGORY_INDEX[category], LEVEL_CODES[level]]
+        index = self._group_index(group)
+        return int(totals.sum() if index is None else totals[index])
+
+    def events_per_hour(self, category, level, group=None, now=None):
+        """Entry rate over the part of the window that has data."""
+        count = self.event_count(category, level, group, now)
+        span = self.events.span()
+        return count * 3600.0 / span if span else 0.0
+
+    def action_count(self, category, action, group=None, now=None):
+        with self._lock:
+            totals = self.actions.sliding(now)[:, _CATEGORY_INDEX[category], _ACTION_INDEX[action]]
+        index = self._group_index(group)
+        return int(totals.sum() if index is None else totals[index])
+
+    def quantile(self, metric, q, group=None, now=None):
+        """Quantile ``q`` of ``metric`` within the vitals window."""
+        with self._lock:
+            return self.vitals[metric].quantile(q, self._group_index(group), now)
+
+    def summary(self, level='Critical', q=0.95, metric='heart_rate', now=None):
+        """One row per group: ``level`` entries per hour by category and the ``q`` quantile of ``metric``."""
+        rows = []
+        for group in self.group_names:
+            row = {'Group': group}
+            for category, _, _, _ in CATEGORIES:
+                row[f"{level} {category} /h"] = round(self.events_per_hour(category, level, group, now), 1)
+            row[f"p{round(q * 100)} {metric}"] = self.quantile(metric, q, group, now)
+            rows.append(row)
+        return rows
+
+    @property
+    def nbytes(self):
+        return self.events.nbytes + self.actions.nbytes + sum(s.counts.nbytes for s in self.vitals.values())
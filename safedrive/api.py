@@ -0,0 +1,470 @@
+"""Headless HTTP/WebSocket API over a ``MonitoringEngine``.
+
+Everything runs on one asyncio event loop from the standard library, so an
+idle keep-alive or WebSocket client costs a socket and a few small buffers
+rather than a thread, and thousands of concurrent connections are fine.  The
+engine is ticked by a task on the same loop at the feed rate; the events it
+publishes are encoded once and the same frame is queued for every WebSocket
+subscriber of that topic.
+
+HTTP endpoints (JSON bodies, HTTP/1.1 keep-alive):
+
+* ``GET /state`` - latest sample, debounced levels and selected actions
+* ``GET /stats`` - engine, event bus and connection counters
+* ``POST /ingest`` - one sample object or a list of them, keyed by
+  ``safedrive.telemetry.COLUMNS``; answers ``202 {"accepted": n}``
+* ``GET /config``, ``PUT /config`` - the per-level action configuration
+
+WebSocket endpoints:
+
+* ``/subscribe?topics=actions,notifications`` - one JSON text message per
+  event; topics are ``samples``, ``levels``, ``actions`` and ``notifications``
+  (default: actions and notifications).  Every client has a bounded outbox; a
+  client that cannot keep up loses its oldest messages (counted) and never
+  holds up the others.
+* ``/ingest`` - samples sent as JSON text messages, same shape as ``POST /ingest``
+
+The WebSocket framing (RFC 6455) is implemented here so the server needs no
+optional package.  Run as a script:
+
+    python -m safedrive.api --port 8080
+    python -m safedrive.api --port 8080 --simulate
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import struct
+from collections import Counter, deque
+from urllib.parse import parse_qs, urlsplit
+
+from safedrive.engine import MonitoringEngine
+from safedrive.events import ActionsDispatched, LevelChange, NotificationIssued
+from safedrive.producer import Snapshot
+from safedrive.telemetry import COLUMNS
+
+MAX_HEADER = 16 * 1024
+MAX_BODY = 1024 * 1024
+OUTBOX_SIZE = 256
+LISTEN_BACKLOG = 4096
+WS_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+log = logging.getLogger(__name__)
+
+# Bus event type -> WebSocket topic
+TOPICS = {
+    Snapshot: 'samples',
+    LevelChange: 'levels',
+    ActionsDispatched: 'actions',
+    NotificationIssued: 'notifications',
+}
+DEFAULT_TOPICS = ('actions', 'notifications')
+
+REASONS = {
+    200: "OK", 202: "Accepted", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    409: "Conflict", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+}
+
+# WebSocket opcodes
+CONTINUATION, TEXT, BINARY, CLOSE, PING, PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class HttpError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or REASONS.get(status, ""))
+        self.status = status
+
+
+def event_json(event):
+    """JSON-ready dict of a bus event, tagged with its topic."""
+    topic = TOPICS[type(event)]
+    if topic == 'samples':
+        return {'topic': topic, 'seq': event.seq, 'timestamp': event.timestamp, 'sample': dict(zip(COLUMNS, event.sample))}
+    if topic == 'actions':
+        return {
+            'topic': topic, 'seq': event.seq, 'timestamp': event.timestamp,
+            'requests': [request._asdict() for request in event.requests],
+        }
+    return dict(event._asdict(), topic=topic)
+
+
+def dumps(payload):
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+def http_response(status, payload=None, keep_alive=True):
+    body = b"" if payload is None else dumps(payload)
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode() + body
+
+
+def ws_accept(key):
+    return base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+
+
+def ws_frame(payload, opcode=TEXT):
+    """One unmasked, final server frame."""
+    n = len(payload)
+    if n < 126:
+        head = struct.pack('!BB', 0x80 | opcode, n)
+    elif n < 1 << 16:
+        head = struct.pack('!BBH', 0x80 | opcode, 126, n)
+    else:
+        head = struct.pack('!BBQ', 0x80 | opcode, 127, n)
+    return head + payload
+
+
+def _unmask(payload, mask):
+    # XOR as one big integer instead of a Python loop over the bytes
+    n = len(payload)
+    key = (mask * (n // 4 + 1))[:n]
+    return (int.from_bytes(payload, 'big') ^ int.from_bytes(key, 'big')).to_bytes(n, 'big')
+
+
+async def read_frame(reader, limit=MAX_BODY):
+    """``(fin, opcode, payload)`` of the next frame, unmasked."""
+    first, second = await reader.readexactly(2)
+    n = second & 0x7F
+    if n == 126:
+        (n,) = struct.unpack('!H', await reader.readexactly(2))
+    elif n == 127:
+        (n,) = struct.unpack('!Q', await reader.readexactly(8))
+    if n > limit:
+        raise HttpError(413, "WebSocket frame too large")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(n)
+    if mask:
+        payload = _unmask(payload, mask)
+    return bool(first & 0x80), first & 0x0F, payload
+
+
+async def read_request(reader):
+    """``(method, path, query, headers, body)``, or ``None`` once the client has closed."""
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HttpError(431)
+    lines = head.decode('latin-1').split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ")
+    except ValueError:
+        raise HttpError(400, "malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    if 'transfer-encoding' in headers:
+        raise HttpError(400, "chunked bodies are not supported")
+    try:
+        length = int(headers.get('content-length', 0))
+    except ValueError:
+        raise HttpError(400, "bad Content-Length")
+    if length > MAX_BODY:
+        raise HttpError(413)
+    body = await reader.readexactly(length) if length else b""
+    url = urlsplit(target)
+    return method, url.path, parse_qs(url.query), headers, body
+
+
+class _Subscriber:
+    """A WebSocket client's topics and bounded outbox of encoded frames."""
+
+    __slots__ = ('topics', 'outbox', 'ready', 'sent', 'dropped')
+
+    def __init__(self, topics, maxsize):
+        self.topics = topics
+        self.outbox = deque(maxlen=maxsize)
+        self.ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+
+    def put(self, frame):
+        if len(self.outbox) == self.outbox.maxlen:
+            self.dropped += 1
+        self.outbox.append(frame)
+        self.ready.set()
+
+
+class ApiServer:
+    """Serves one ``MonitoringEngine`` over HTTP and WebSocket."""
+
+    def __init__(self, engine, host="127.0.0.1", port=8080, outbox=OUTBOX_SIZE):
+        self.engine = engine
+        self.host = host
+        self.port = port
+        self.outbox = outbox
+        # Drained by the ticker right after each tick, on the loop thread
+        self._events = engine.subscribe("api", tuple(TOPICS), maxsize=4096)
+        self._subscribers = {topic: set() for topic in TOPICS.values()}
+        self._server = None
+        self._ticker = None
+        self._writers = set()
+        self.requests = Counter()
+        self.dropped = 0
+        self.tick_errors = 0
+
+    async def start(self):
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_HEADER, backlog=LISTEN_BACKLOG
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ticker = asyncio.create_task(self._tick())
+        return self
+
+    async def serve_forever(self):
+        if self._server is None:
+            await self.start()
+        await self._server.serve_forever()
+
+    async def close(self):
+        if self._ticker is not None:
+            self._ticker.cancel()
+        if self._server is not None:
+            self._server.close()
+            # wait_closed waits for open connections too
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+
+    async def _tick(self):
+        while True:
+            try:
+                self.engine.tick()
+                self._fan_out()
+            except Exception:  # one bad tick must not stop the engine
+                self.tick_errors += 1
+                log.exception("engine tick failed")
+            await asyncio.sleep(self.engine.feed.period)
+
+    def _fan_out(self):
+        for event in self._events.drain():
+            subscribers = self._subscribers[TOPICS[type(event)]]
+            if subscribers:
+                frame = ws_frame(dumps(event_json(event)))
+                for subscriber in subscribers:
+                    subscriber.put(frame)
+
+    def stats(self):
+        subscribers = set().union(*self._subscribers.values())
+        return {
+            'connections': len(self._writers),
+            'subscribers': {topic: len(s) for topic, s in self._subscribers.items()},
+            'requests': dict(self.requests),
+            'sent': sum(s.sent for s in subscribers),
+            'dropped': self.dropped + sum(s.dropped for s in subscribers),
+            'tick_errors': self.tick_errors,
+            'engine': self.engine.stats(),
+        }
+
+    # HTTP
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    request = await read_request(reader)
+                except HttpError as exc:
+                    writer.write(http_response(exc.status, {'error': str(exc)}, keep_alive=False))
+                    await writer.drain()
+                    return
+                if request is None:
+                    return
+                method, path, query, headers, body = request
+                if headers.get('upgrade', '').lower() == 'websocket':
+                    await self._websocket(reader, writer, path, query, headers)
+                    return
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                status, payload = self._route(method, path, body)
+                writer.write(http_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    def _route(self, method, path, body):
+        self.requests[f"{method} {path}"] += 1
+        try:
+            if path == '/state' and method == 'GET':
+                return 200, self.engine.state()
+            if path == '/stats' and method == 'GET':
+                return 200, self.stats()
+            if path == '/ingest' and method == 'POST':
+                return 202, {'accepted': self._ingest(body)}
+            if path == '/config' and method == 'GET':
+                return 200, self.engine.config
+            if path == '/config' and method == 'PUT':
+                self.engine.set_config(self._json(body))
+                return 200, self.engine.config
+            if path in ('/state', '/stats', '/ingest', '/config'):
+                return 405, {'error': f"{method} not allowed on {path}"}
+            return 404, {'error': f"no endpoint {path}"}
+        except HttpError as exc:
+            return exc.status, {'error': str(exc)}
+        except (KeyError, TypeError, ValueError, AttributeError, OverflowError) as exc:
+            return 400, {'error': f"malformed payload: {exc!r}"}
+        except RuntimeError as exc:
+            return 409, {'error': str(exc)}
+
+    @staticmethod
+    def _json(body):
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise HttpError(400, "body is not valid JSON")
+
+    def _ingest(self, payload):
+        rows = self._json(payload)
+        if not isinstance(rows, (dict, list)):
+            raise HttpError(400, "expected a sample object or a list of them")
+        return self.engine.ingest(rows)
+
+    # WebSocket
+
+    async def _websocket(self, reader, writer, path, query, headers):
+        if path not in ('/subscribe', '/ingest') or 'sec-websocket-key' not in headers:
+            writer.write(http_response(404 if path not in ('/subscribe', '/ingest') else 400, keep_alive=False))
+            await writer.drain()
+            return
+        topics = DEFAULT_TOPICS
+        if path == '/subscribe' and 'topics' in query:
+            topics = tuple(t for value in query['topics'] for t in value.split(",") if t)
+            unknown = set(topics) - set(self._subscribers)
+            if unknown:
+                writer.write(http_response(400, {'error': f"unknown topics {sorted(unknown)}"}, keep_alive=False))
+                await writer.drain()
+                return
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {ws_accept(headers['sec-websocket-key'])}\r\n\r\n"
+        ).encode())
+        await writer.drain()
+        self.requests[f"WS {path}"] += 1
+        if path == '/ingest':
+            await self._receive(reader, writer, on_message=self._ws_ingest)
+            return
+        subscriber = _Subscriber(frozenset(topics), self.outbox)
+        for topic in subscriber.topics:
+            self._subscribers[topic].add(subscriber)
+        sender = asyncio.create_task(self._send(writer, subscriber))
+        try:
+            await self._receive(reader, writer)
+        finally:
+            for topic in subscriber.topics:
+                self._subscribers[topic].discard(subscriber)
+            self.dropped += subscriber.dropped
+            sender.cancel()
+
+    async def _send(self, writer, subscriber):
+        try:
+            while True:
+                await subscriber.ready.wait()
+                subscriber.ready.clear()
+                frames = list(subscriber.outbox)
+                subscriber.outbox.clear()
+                writer.write(b"".join(frames))
+                subscriber.sent += len(frames)
+                # Waits only while this client's socket buffer is full
+                await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def _receive(self, reader, writer, on_message=None):
+        """Read frames until the client closes; answers pings and reassembles fragments.
+
+        Frames are written whole, so replies never interleave with the sender task.
+        """
+        fragments = []
+        while True:
+            try:
+                fin, opcode, payload = await read_frame(reader)
+            except HttpError:
+                writer.write(ws_frame(struct.pack('!H', 1009), CLOSE))
+                return
+            if opcode == CLOSE:
+                writer.write(ws_frame(payload[:2], CLOSE))
+                return
+            if opcode == PING:
+                writer.write(ws_frame(payload, PONG))
+                continue
+            if opcode == PONG:
+                continue
+            fragments.append(payload)
+            if not fin:
+                if sum(map(len, fragments)) > MAX_BODY:
+                    writer.write(ws_frame(struct.pack('!H', 1009), CLOSE))
+                    return
+                continue
+            message, fragments = b"".join(fragments), []
+            if on_message is not None:
+                writer.write(ws_frame(dumps(on_message(message))))
+                await writer.drain()
+
+    def _ws_ingest(self, message):
+        self.requests["WS ingest message"] += 1
+        try:
+            return {'accepted': self._ingest(message)}
+        except HttpError as exc:
+            return {'error': str(exc)}
+        except (KeyError, TypeError, ValueError, AttributeError, OverflowError) as exc:
+            return {'error': f"malformed payload: {exc!r}"}
+        except RuntimeError as exc:
+            return {'error': str(exc)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve the monitoring engine over HTTP and WebSocket")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--hz', type=float, default=50, help="feed and tick rate")
+    parser.add_argument('--config', default=None, help="JSON action configuration (default: dashboard defaults)")
+    parser.add_argument('--simulate', action='store_true', help="generate samples instead of accepting ingest")
+    parser.add_argument('--derive-risk', action='store_true', help="score risk levels from the vitals")
+    args = parser.parse_args(argv)
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    source = None
+    if args.simulate:
+        from safedrive.sources import RandomSource
+
+        source = RandomSource(hz=args.hz)
+    engine = MonitoringEngine(config, hz=args.hz, source=source, derive_risk=args.derive_risk)
+    server = ApiServer(engine, args.host, args.port)
+
+    async def run():
+        await server.start()
+        print(f"Serving on http://{args.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        engine.close()
+
+
+if __name__ == '__main__':
+    main()
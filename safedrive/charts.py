@@ -0,0 +1,92 @@
+"""Plotly trend charts fed from ``VitalHistory`` ring buffers.
+
+``st.plotly_chart`` serializes and resends the whole figure on every refresh
+(Streamlit 1.65 has no append-only chart), so a trace is never sent at full
+history length: longer histories are reduced to a min/max envelope of
+about ``MAX_POINTS`` points.  Every spike, and every Critical level, is kept.
+"""
+import numpy as np
+
+from safedrive.telemetry import LEVELS
+
+# Subplot row -> [(metric, trace name)]
+TREND_ROWS = [
+    ("Heart Rate / HRV / SpO2", [('heart_rate', "Heart Rate (bpm)"), ('hrv', "HRV (ms)"), ('spo2', "SpO2 (%)")]),
+    ("Blood Pressure", [('bp_systolic', "Systolic (mmHg)"), ('bp_diastolic', "Diastolic (mmHg)")]),
+    ("Blood Sugar / Temperature", [('blood_sugar', "Blood Sugar (mg/dL)"), ('body_temp', "Body Temperature")]),
+    ("Risk Levels", [('stress', "Stress Level"), ('fatigue', "Fatigue Risk"), ('health', "Health Crisis Risk")]),
+]
+
+# Points per trace sent to the browser: 10 traces of 600 points, not 3600
+MAX_POINTS = 600
+
+
+def envelope(x, y, first=0, max_points=MAX_POINTS):
+    """``(x, y)`` reduced to the min and max of equal buckets, in time order.
+
+    ``first`` is the running index of ``y[0]``; buckets start at multiples
+    of the bucket size, so they stay put as new samples arrive.  The newest
+    partial bucket is kept as is and the oldest one is dropped.
+    """
+    n = len(y)
+    if n <= max_points:
+        return x, y
+    k = -(-2 * n // max_points)  # samples per bucket
+    skip = -first % k
+    m = (n - skip) // k * k
+    xs = x[skip:skip + m].reshape(-1, k)
+    ys = y[skip:skip + m].reshape(-1, k)
+    lo, hi = ys.argmin(axis=1), ys.argmax(axis=1)
+    picks = np.stack([np.minimum(lo, hi), np.maximum(lo, hi)], axis=1)
+    rows = np.arange(len(ys))[:, None]
+    return (
+        np.concatenate([xs[rows, picks].ravel(), x[skip + m:]]),
+        np.concatenate([ys[rows, picks].ravel(), y[skip + m:]]),
+    )
+
+
+class TrendChart:
+    """A figure built once whose traces are refilled from the ring buffers.
+
+    ``update`` is a no-op when no sample arrived since the previous call, and
+    otherwise sets each trace to the ``envelope`` of its buffer.  Plotly
+    copies the arrays it is given, and the page resends the figure, so the
+    caller should refresh it sparingly (the dashboard does so once a second).
+    """
+
+    def __init__(self, height=720, max_points=MAX_POINTS):
+        import plotly.graph_objects as go
+        from plotly.subplots import make_subplots
+
+        self.figure = make_subplots(
+            rows=len(TREND_ROWS), cols=1, shared_xaxes=True, vertical_spacing=0.06,
+            subplot_titles=[title for title, _ in TREND_ROWS],
+        )
+        self._traces = []
+        for row, (_, series) in enumerate(TREND_ROWS, start=1):
+            for metric, name in series:
+                shape = 'hv' if row == len(TREND_ROWS) else 'linear'
+                self.figure.add_trace(
+                    go.Scattergl(x=[], y=[], name=name, mode='lines', line_shape=shape), row=row, col=1
+                )
+                self._traces.append(metric)
+        self.figure.update_yaxes(
+            tickvals=list(range(len(LEVELS))), ticktext=LEVELS, range=[-0.2, len(LEVELS) - 0.8],
+            row=len(TREND_ROWS), col=1,
+        )
+        self.figure.update_xaxes(title_text="Seconds since start", row=len(TREND_ROWS), col=1)
+        self.figure.update_layout(height=height, margin=dict(t=40, b=20, l=20, r=20), uirevision='trends')
+        self.max_points = max_points
+        self._seen = -1
+
+    def update(self, history):
+        """Refresh the traces; return False when nothing changed."""
+        if history.count == self._seen:
+            return False
+        self._seen = history.count
+        first = history.count - len(history)
+        x = history.timestamps.view()
+        with self.figure.batch_update():
+            for trace, metric in zip(self.figure.data, self._traces):
+                trace.x, trace.y = envelope(x, history.view(metric), first, self.max_points)
+        return True
@@ -0,0 +1,169 @@
+"""Persistent, versioned vehicle-action configuration.
+
+Configurations (the nested ``category -> level -> [actions]`` dict used by the
+dashboard) are stored in SQLite as immutable numbered versions of named
+profiles.  Vehicles are assigned to profiles in bulk; unassigned vehicles use
+``DEFAULT_PROFILE``.
+
+Loads are served from an in-process cache.  Every write bumps a revision
+counter in the database, and the cache is dropped only when that counter
+moves, so repeated loads cost one tiny query and changes made by other
+processes are still picked up.
+"""
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from safedrive.rules import DEFAULT_ACTIONS, compile_rules
+
+DEFAULT_PROFILE = "default"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS profile_versions (
+    profile TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    config TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (profile, version)
+);
+CREATE TABLE IF NOT EXISTS assignments (
+    vehicle_id TEXT PRIMARY KEY,
+    profile TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS revision (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO revision (id, value) VALUES (0, 0);
+"""
+
+
+def _encode(config):
+    # default=dict also encodes the read-only mappings of ``shared_config``
+    return json.dumps(config, sort_keys=True, separators=(',', ':'), default=dict)
+
+
+class ConfigStore:
+    def __init__(self, path):
+        self.path = str(path)
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+        self._revision = None
+        self._cache = {}
+
+    def _check_revision(self):
+        (revision,) = self._db.execute("SELECT value FROM revision WHERE id = 0").fetchone()
+        if revision != self._revision:
+            self._cache.clear()
+            self._revision = revision
+
+    def _bump(self):
+        self._db.execute("UPDATE revision SET value = value + 1 WHERE id = 0")
+
+    def profiles(self):
+        with self._lock:
+            rows = self._db.execute("SELECT DISTINCT profile FROM profile_versions ORDER BY profile")
+            return [profile for (profile,) in rows]
+
+    def versions(self, profile):
+        """``[(version, created_at)]`` for ``profile``, oldest first."""
+        with self._lock:
+            return self._db.execute(
+                "SELECT version, created_at FROM profile_versions WHERE profile = ? ORDER BY version", (profile,)
+            ).fetchall()
+
+    def save(self, profile, config):
+        """Store ``config`` as the next version of ``profile``; returns its version.
+
+        Saving a config identical to the latest version returns that version
+        without creating a new one.
+        """
+        encoded = _encode(config)
+        with self._lock, self._db:
+            row = self._db.execute(
+                "SELECT version, config FROM profile_versions WHERE profile = ? ORDER BY version DESC LIMIT 1",
+                (profile,),
+            ).fetchone()
+            if row is not None and row[1] == encoded:
+                return row[0]
+            version = 1 if row is None else row[0] + 1
+            self._db.execute(
+                "INSERT INTO profile_versions (profile, version, config, created_at) VALUES (?, ?, ?, ?)",
+                (profile, version, encoded, time.time()),
+            )
+            self._bump()
+            return version
+
+    def load(self, profile=DEFAULT_PROFILE, version=None):
+        """Config for ``profile`` at ``version`` (latest if ``None``).
+
+        Falls back to ``DEFAULT_ACTIONS`` for the default profile before
+        anything has been saved; raises ``KeyError`` for unknown profiles.
+        The returned dict is shared; copy it before mutating.
+        """
+        with self._lock:
+            self._check_revision()
+            key = (profile, version)
+            if key in self._cache:
+                return self._cache[key]
+            if version is None:
+                row = self._db.execute(
+                    "SELECT config FROM profile_versions WHERE profile = ? ORDER BY version DESC LIMIT 1",
+                    (profile,),
+                ).fetchone()
+            else:
+                row = self._db.execute(
+                    "SELECT config FROM profile_versions WHERE profile = ? AND version = ?", (profile, version)
+                ).fetchone()
+            if row is None:
+                if profile == DEFAULT_PROFILE and version is None:
+                    config = DEFAULT_ACTIONS
+                else:
+                    raise KeyError(f"no configuration for profile {profile!r} version {version}")
+            else:
+                config = json.loads(row[0])
+            self._cache[key] = config
+            return config
+
+    def revision(self):
+        """Write counter; it moves whenever any profile or assignment changes."""
+        with self._lock:
+            self._check_revision()
+            return self._revision
+
+    def assign(self, vehicle_ids, profile):
+        """Assign every vehicle in ``vehicle_ids`` to ``profile`` in one transaction."""
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT INTO assignments (vehicle_id, profile) VALUES (?, ?) "
+                "ON CONFLICT (vehicle_id) DO UPDATE SET profile = excluded.profile",
+                ((str(vehicle_id), profile) for vehicle_id in vehicle_ids),
+            )
+            self._bump()
+
+    def profile_for(self, vehicle_id):
+        with self._lock:
+            row = self._db.execute("SELECT profile FROM assignments WHERE vehicle_id = ?", (str(vehicle_id),)).fetchone()
+        return DEFAULT_PROFILE if row is None else row[0]
+
+    def fleet_rules(self, vehicle_ids):
+        """Compiled rules for a fleet: ``(profile index per vehicle, [RuleTable])``.
+
+        One query resolves every vehicle's profile and each distinct profile
+        is compiled once, so applying profiles to 10k vehicles is a single
+        bulk operation.
+        """
+        with self._lock:
+            assigned = dict(self._db.execute("SELECT vehicle_id, profile FROM assignments"))
+        names = [assigned.get(str(v), DEFAULT_PROFILE) for v in vehicle_ids]
+        profiles = sorted(set(names))
+        position = {profile: i for i, profile in enumerate(profiles)}
+        index = np.fromiter((position[name] for name in names), dtype=np.int32, count=len(names))
+        return index, [compile_rules(self.load(profile)) for profile in profiles]
+
+    def close(self):
+        self._db.close()
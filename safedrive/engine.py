@@ -0,0 +1,226 @@
+"""The monitoring pipeline without Streamlit.
+
+``MonitoringEngine`` wires the same pieces the dashboard uses: a shared feed
+over a telemetry source, alert debouncing, compiled rules, the event bus and
+the background action executor.  It can be imported and driven directly or
+served by ``safedrive.api``.
+
+``ActionDispatcher`` debounces each new sample of a feed and publishes its
+actions exactly once, whoever reads the feed.  The engine drives it from
+``tick``; the dashboard runs one on its own thread, so vehicle actions never
+wait for a page to render and are dispatched with no page open.
+"""
+import threading
+import weakref
+
+from safedrive.alerts import AlertEngine
+from safedrive.events import ActionsDispatched, EventBus, NotificationIssued
+from safedrive.executor import BackgroundExecutor, requests_for
+from safedrive.producer import SharedFeed
+from safedrive.profiling import NULL_STAGE_TIMER
+from safedrive.risk import RiskEngine
+from safedrive.rules import CATEGORIES, DEFAULT_ACTIONS, NOTIFY_ACTION, compile_rules
+from safedrive.sources import PushSource
+from safedrive.telemetry import COLUMNS, LEVELS
+
+
+def publish_actions(bus, alerts, rules, snapshot, debounced, recording=False):
+    """Select, cooldown-filter and publish the requests for one new sample.
+
+    Publishes ``ActionsDispatched`` (the executor and recorder subscribe to it)
+    and one ``NotificationIssued`` per notification; returns the requests.
+    """
+    requests = alerts.filter_requests(requests_for(rules, debounced), snapshot.timestamp, snapshot.seq)
+    bus.publish(ActionsDispatched(snapshot.seq, snapshot.timestamp, snapshot.sample, requests, recording))
+    for request in requests:
+        if request.action == NOTIFY_ACTION:
+            message = rules.lookup(request.category, request.level).notifications[0]
+            bus.publish(NotificationIssued(snapshot.seq, snapshot.timestamp, request.category, request.level, message))
+    return requests
+
+
+class ActionDispatcher:
+    """Debounces and dispatches every new sample of a feed once.
+
+    ``dispatch`` ignores a snapshot whose seq is not newer than the last one
+    dispatched; ``poll`` dispatches every sample the feed produced since.
+    ``start`` polls the followed feed every period on a daemon thread;
+    ``follow`` switches feeds.  ``rules`` may be replaced at any time and
+    applies from the next sample.  ``latest`` is the last
+    ``(snapshot, debounced)`` pair, for pages to render.  With a ``StageTimer``
+    as ``timer`` each dispatch is timed in two stages, "debounce" and
+    "publish actions".
+
+    ``record(owner)`` asks for the dispatched samples to be recorded for as
+    long as ``owner`` (e.g. a session) is alive and has not called
+    ``record(owner, False)``.
+    """
+
+    def __init__(self, bus, alerts, rules, timer=NULL_STAGE_TIMER):
+        self.bus = bus
+        self.alerts = alerts
+        self.rules = rules
+        self.timer = timer
+        self.feed = None
+        self.latest = None
+        self.dispatched = 0
+        self.missed = 0  # samples that left the feed's backlog undispatched
+        self.errors = 0
+        self.last_error = None
+        self._seq = None
+        self._lock = threading.Lock()
+        self._recorders = weakref.WeakSet()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def recording(self):
+        return len(self._recorders) > 0
+
+    def record(self, owner, on=True):
+        if on:
+            self._recorders.add(owner)
+        else:
+            self._recorders.discard(owner)
+
+    def dispatch(self, snapshot):
+        """Debounce ``snapshot`` and publish its requests; ``None`` if it was already dispatched."""
+        with self._lock:
+            if snapshot is None or (self._seq is not None and snapshot.seq <= self._seq):
+                return None
+            self._seq = snapshot.seq
+            self.timer.begin()
+            debounced = self.alerts.observe(snapshot.sample, snapshot.timestamp, seq=snapshot.seq)
+            self.timer.lap("debounce")
+            requests = publish_actions(self.bus, self.alerts, self.rules, snapshot, debounced, self.recording)
+            self.timer.lap("publish actions")
+            self.latest = (snapshot, debounced)
+            self.dispatched += 1
+        return requests
+
+    def poll(self):
+        """Poll the followed feed and dispatch every new sample; returns their snapshots."""
+        self.feed.snapshot()
+        dispatched = []
+        for snapshot in self.feed.since(self._seq):
+            if self._seq is not None and snapshot.seq > self._seq + 1:
+                self.missed += snapshot.seq - self._seq - 1
+            if self.dispatch(snapshot) is not None:
+                dispatched.append(snapshot)
+        return dispatched
+
+    def follow(self, feed):
+        """Dispatch from ``feed`` from now on, starting after its latest sample."""
+        with self._lock:
+            if feed is not self.feed:
+                self.feed = feed
+                self._seq = None if feed.latest is None else feed.latest.seq
+
+    def start(self, feed=None):
+        if feed is not None:
+            self.follow(feed)
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="action-dispatcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.is_set():
+            feed = self.feed
+            try:
+                self.poll()
+            except Exception as exc:  # one bad sample must not stop dispatching
+                self.errors += 1
+                self.last_error = repr(exc)
+            self._stop.wait(feed.period)
+
+    def close(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+class MonitoringEngine:
+    """One vehicle's monitoring pipeline.
+
+    With the default ``PushSource`` samples arrive through ``ingest``; any
+    other ``TelemetrySource`` is polled.  ``tick`` advances the pipeline by
+    one feed period and is meant to be called at the feed rate.  Pushed risk
+    levels are used as sent unless ``derive_risk`` scores them from the vitals.
+    """
+
+    def __init__(self, config=None, hz=50, source=None, derive_risk=False, backend=None):
+        self.bus = EventBus()
+        self.source = source if source is not None else PushSource()
+        self.feed = SharedFeed(hz=hz, source=self.source, risk=RiskEngine() if derive_risk else None, bus=self.bus)
+        self.alerts = AlertEngine(bus=self.bus)
+        self.executor = BackgroundExecutor(backend)
+        self.bus.subscribe(
+            "vehicle actions", (ActionsDispatched,), maxsize=256, policy='block',
+            handler=lambda event: self.executor.submit(event.requests),
+        )
+        config = DEFAULT_ACTIONS if config is None else config
+        self.dispatcher = ActionDispatcher(self.bus, self.alerts, compile_rules(config))
+        self.dispatcher.follow(self.feed)
+        self.config = config
+        self.ticks = 0
+
+    @property
+    def rules(self):
+        return self.dispatcher.rules
+
+    def set_config(self, config):
+        """Switch to a new per-level action configuration; raises if it is malformed."""
+        self.dispatcher.rules = compile_rules(config)
+        self.config = config
+
+    def ingest(self, rows):
+        """Queue dict samples keyed by ``COLUMNS``; returns how many were accepted."""
+        if not hasattr(self.source, 'push'):
+            raise RuntimeError(f"the {self.source.name} source does not accept pushed samples")
+        return self.source.push(rows)
+
+    def tick(self):
+        """Poll the feed and debounce and dispatch every new sample; returns the latest or ``None``."""
+        self.ticks += 1
+        dispatched = self.dispatcher.poll()
+        return dispatched[-1] if dispatched else None
+
+    def subscribe(self, name, event_types, maxsize=64, policy='drop_oldest', handler=None):
+        return self.bus.subscribe(name, event_types, maxsize=maxsize, policy=policy, handler=handler)
+
+    def state(self):
+        """JSON-ready view of the latest sample, debounced levels and selected actions."""
+        latest = self.dispatcher.latest
+        if latest is None:
+            return {'seq': None}
+        snapshot, debounced = latest
+        rules = self.rules.rules_for(debounced)
+        return {
+            'seq': snapshot.seq,
+            'timestamp': snapshot.timestamp,
+            'sample': dict(zip(COLUMNS, snapshot.sample)),
+            'levels': {rule.category: rule.level for rule in rules},
+            'raw_levels': {
+                category: LEVELS[getattr(snapshot.sample, column)] for category, _, _, column in CATEGORIES
+            },
+            'actions': {rule.category: list(rule.actions) for rule in rules},
+            'notifications': {rule.category: list(rule.notifications) for rule in rules},
+        }
+
+    def stats(self):
+        return {
+            'ticks': self.ticks,
+            'dispatched': self.dispatcher.dispatched,
+            'missed': self.dispatcher.missed,
+            'feed': {'reads': self.feed.reads, 'produced': self.feed.produced},
+            'source': self.source.stats(),
+            'alerts': self.alerts.stats(),
+            'executor': dict(self.executor.executor.stats),
+            'bus': self.bus.stats(),
+        }
+
+    def close(self):
+        self.bus.close()
+        self.executor.close()
+        self.source.close()
@@ -0,0 +1,190 @@
+"""In-process publish/subscribe bus between sensors, rules, actions and UI.
+
+Events are typed named tuples.  Subscribers register for a tuple of event
+types and get their own bounded queue, so every consumer drains at its own
+pace.  What happens when a queue is full is chosen per subscriber:
+
+* ``drop_oldest`` discards the oldest queued event (latest-wins, for UIs),
+* ``drop_newest`` discards the incoming event,
+* ``block`` makes the publisher wait up to ``timeout`` seconds for space
+  (backpressure), then drops the incoming event.
+
+A full ``drop_*`` queue never delays the publisher, so a slow dashboard cannot
+stall the action path, which has its own queue.  Subscribers created with a
+``handler`` are drained by a daemon thread; the rest are polled with ``get``
+or ``drain``.  The bus only holds weak references to polled subscriptions, so
+one that is dropped by its owner (e.g. an expired session) unsubscribes
+itself.  Queue depth, drop and error counts are kept per subscription.
+"""
+import threading
+import weakref
+from collections import Counter, deque, namedtuple
+
+from safedrive.producer import Snapshot
+
+# Sensor samples are published as the feed's ``Snapshot(seq, timestamp, sample)``
+LevelChange = namedtuple('LevelChange', ['seq', 'timestamp', 'category', 'previous', 'level'])
+ActionsDispatched = namedtuple('ActionsDispatched', ['seq', 'timestamp', 'sample', 'requests', 'recording'])
+NotificationIssued = namedtuple('NotificationIssued', ['seq', 'timestamp', 'category', 'level', 'message'])
+
+EVENT_TYPES = (Snapshot, LevelChange, ActionsDispatched, NotificationIssued)
+POLICIES = ('drop_oldest', 'drop_newest', 'block')
+
+
+class Subscription:
+    def __init__(self, name, event_types, maxsize=64, policy='drop_oldest', timeout=0.05):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+        self.name = name
+        self.event_types = tuple(event_types)
+        self.maxsize = maxsize
+        self.policy = policy
+        self.timeout = timeout
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+        self.consumed = 0
+        self.max_depth = 0
+        self.errors = 0
+        self.last_error = None
+
+    def accepts(self, event):
+        return isinstance(event, self.event_types)
+
+    @property
+    def depth(self):
+        return len(self._queue)
+
+    def put(self, event):
+        """Queue ``event`` according to the policy; returns False if it was dropped."""
+        with self._cond:
+            if self.closed:
+                return False
+            if len(self._queue) >= self.maxsize:
+                if self.policy == 'block':
+                    self._cond.wait_for(lambda: len(self._queue) < self.maxsize or self.closed, self.timeout)
+                    if self.closed or len(self._queue) >= self.maxsize:
+                        self.dropped += 1
+                        return False
+                elif self.policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                else:
+                    self._queue.popleft()
+                    self.dropped += 1
+            self._queue.append(event)
+            self.delivered += 1
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._cond.notify_all()
+            return True
+
+    def get(self, timeout=None):
+        """Next event, waiting up to ``timeout`` seconds; ``None`` if there is none."""
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._queue or self.closed, timeout) or not self._queue:
+                return None
+            event = self._queue.popleft()
+            self.consumed += 1
+            self._cond.notify_all()
+            return event
+
+    def drain(self):
+        """All queued events, oldest first, without waiting."""
+        with self._cond:
+            events = list(self._queue)
+            self._queue.clear()
+            self.consumed += len(events)
+            self._cond.notify_all()
+            return events
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def stats(self):
+        return {
+            'name': self.name,
+            'policy': self.policy,
+            'depth': self.depth,
+            'max_depth': self.max_depth,
+            'maxsize': self.maxsize,
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'errors': self.errors,
+        }
+
+
+def _consume(subscription, handler):
+    while True:
+        event = subscription.get()
+        if event is None:
+            if subscription.closed:
+                return
+            continue
+        try:
+            handler(event)
+        except Exception as exc:  # a failing subscriber must not kill its thread
+            subscription.errors += 1
+            subscription.last_error = repr(exc)
+
+
+class EventBus:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = weakref.WeakSet()
+        self.published = Counter()
+
+    def subscribe(self, name, event_types=EVENT_TYPES, maxsize=64, policy='drop_oldest', timeout=0.05, handler=None):
+        """Register a subscriber; with ``handler`` a daemon thread consumes its queue."""
+        subscription = Subscription(name, event_types, maxsize, policy, timeout)
+        if handler is not None:
+            # The thread keeps the subscription alive for the life of the process
+            threading.Thread(
+                target=_consume, args=(subscription, handler), name=f"bus-{name}", daemon=True
+            ).start()
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+        subscription.close()
+
+    def publish(self, event):
+        """Fan ``event`` out to every matching subscriber; returns how many queued it."""
+        with self._lock:
+            self.published[type(event).__name__] += 1
+            targets = [s for s in self._subscriptions if s.accepts(event)]
+        # Queue outside the bus lock so a blocking subscriber only delays this publisher
+        return sum(subscription.put(event) for subscription in targets)
+
+    def subscriptions(self):
+        with self._lock:
+            return sorted(self._subscriptions, key=lambda s: s.name)
+
+    def stats(self):
+        return {
+            'published': dict(self.published),
+            'subscriptions': [s.stats() for s in self.subscriptions()],
+        }
+
+    def close(self):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+            self._subscriptions.clear()
+        for subscription in subscriptions:
+            subscription.close()
+
+
+def stats_table(bus):
+    """Markdown table of queue depth and drops per subscriber."""
+    lines = ["| Subscriber | policy | depth | max | delivered | dropped | errors |", "|---|---|---:|---:|---:|---:|---:|"]
+    for s in bus.stats()['subscriptions']:
+        lines.append(
+            f"| {s['name']} | {s['policy']} | {s['depth']}/{s['maxsize']} | {s['max_depth']} | {s['delivered']} | {s['dropped']} | {s['errors']} |"
+        )
+    return "\n".join(lines)
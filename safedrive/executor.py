@@ -0,0 +1,162 @@
+"""Asynchronous execution of vehicle actions with per-action latency budgets.
+
+Selected actions are sent to a vehicle backend concurrently.  Each call is
+bounded by its action's budget and ends as ``ok``, ``timeout`` or ``error``.
+"Critical" requests run on their own lane with a separate concurrency limit,
+so they never wait behind a backlog of notifications or comfort actions.
+``MockVehicleBackend`` simulates subsystem latencies for local testing.
+"""
+import asyncio
+import concurrent.futures
+import threading
+import time
+from collections import Counter, namedtuple
+
+import numpy as np
+
+from safedrive.rules import NOTIFY_ACTION
+
+ActionRequest = namedtuple('ActionRequest', ['category', 'level', 'action'])
+ActionResult = namedtuple('ActionResult', ['request', 'status', 'latency', 'detail'])
+
+# Typical subsystem latency in seconds, used by the mock backend
+TYPICAL_LATENCY = {
+    "No Action": 0.0,
+    "Send Notification": 0.05,
+    "Reduce Speed": 0.15,
+    "Play Calming Music": 0.1,
+    "Turn On Air Conditioning": 0.1,
+    "Adjust Seat Position": 0.3,
+    "Activate Horn": 0.02,
+    "Call Emergency Services": 0.8,
+    "Activate Autopilot": 0.5,
+    "Flash Alert Lights": 0.02,
+}
+
+# Latency budget in seconds before an action is reported as timed out
+ACTION_BUDGETS = {
+    "No Action": 0.05,
+    "Send Notification": 0.25,
+    "Reduce Speed": 0.3,
+    "Play Calming Music": 0.5,
+    "Turn On Air Conditioning": 0.5,
+    "Adjust Seat Position": 1.0,
+    "Activate Horn": 0.1,
+    "Call Emergency Services": 2.0,
+    "Activate Autopilot": 1.0,
+    "Flash Alert Lights": 0.1,
+}
+
+CRITICAL_LEVEL = 'Critical'
+
+
+def requests_for(rules, sample):
+    """Structured action requests selected by a compiled ``RuleTable`` for one ``Sample``."""
+    requests = []
+    for rule in rules.rules_for(sample):
+        requests.extend(ActionRequest(rule.category, rule.level, action) for action in rule.actions)
+        if rule.notifications:
+            requests.append(ActionRequest(rule.category, rule.level, NOTIFY_ACTION))
+    return requests
+
+
+class MockVehicleBackend:
+    """Simulated vehicle subsystems with log-normal latency jitter."""
+
+    def __init__(self, latencies=None, jitter=0.3, failure_rate=0.0, seed=None):
+        self.latencies = dict(TYPICAL_LATENCY if latencies is None else latencies)
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.rng = np.random.default_rng(seed)
+        self.calls = Counter()
+
+    async def execute(self, request):
+        self.calls[request.action] += 1
+        latency = self.latencies.get(request.action, 0.1)
+        if latency > 0:
+            await asyncio.sleep(latency * self.rng.lognormal(0.0, self.jitter))
+        if self.failure_rate and self.rng.random() < self.failure_rate:
+            raise RuntimeError(f"{request.action} rejected by vehicle")
+        return "ok"
+
+
+class ActionExecutor:
+    def __init__(self, backend, budgets=None, default_budget=1.0, concurrency=16, critical_concurrency=8):
+        self.backend = backend
+        self.budgets = dict(ACTION_BUDGETS if budgets is None else budgets)
+        self.default_budget = default_budget
+        self._lane = asyncio.Semaphore(concurrency)
+        self._critical_lane = asyncio.Semaphore(critical_concurrency)
+        self.stats = Counter()
+        self.worst_latency = {}
+
+    def budget(self, action):
+        return self.budgets.get(action, self.default_budget)
+
+    async def run(self, request):
+        lane = self._critical_lane if request.level == CRITICAL_LEVEL else self._lane
+        budget = self.budget(request.action)
+        async with lane:
+            start = time.perf_counter()
+            try:
+                detail = await asyncio.wait_for(self.backend.execute(request), budget)
+                status = 'ok'
+            except asyncio.TimeoutError:
+                detail, status = f"exceeded {budget * 1000:.0f} ms budget", 'timeout'
+            except Exception as exc:
+                detail, status = str(exc), 'error'
+            latency = time.perf_counter() - start
+
+        self.stats[status] += 1
+        if latency > self.worst_latency.get(request.action, 0.0):
+            self.worst_latency[request.action] = latency
+        return ActionResult(request, status, latency, detail)
+
+    async def dispatch(self, requests):
+        """Run ``requests`` concurrently, Critical ones first; results keep input order."""
+        # Tasks start in creation order, so Critical requests grab their lane first
+        order = sorted(range(len(requests)), key=lambda i: requests[i].level != CRITICAL_LEVEL)
+        tasks = {i: asyncio.ensure_future(self.run(requests[i])) for i in order}
+        await asyncio.gather(*tasks.values())
+        return [tasks[i].result() for i in range(len(requests))]
+
+
+class BackgroundExecutor:
+    """Runs an ``ActionExecutor`` on its own event loop thread; ``submit`` never blocks the caller.
+
+    ``close`` cancels the actions still in flight, waits up to ``timeout``
+    seconds for them to unwind, then stops and closes the loop.
+    """
+
+    def __init__(self, backend=None, **kwargs):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="action-executor", daemon=True)
+        self._thread.start()
+        self.executor = ActionExecutor(backend if backend is not None else MockVehicleBackend(), **kwargs)
+        self.closed = False
+
+    def submit(self, requests):
+        if not requests:
+            return None
+        if self.closed:
+            raise RuntimeError("executor is closed")
+        return asyncio.run_coroutine_threadsafe(self.executor.dispatch(requests), self.loop)
+
+    def close(self, timeout=5.0):
+        if self.closed:
+            return
+        self.closed = True
+
+        async def cancel_pending():
+            tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        try:
+            asyncio.run_coroutine_threadsafe(cancel_pending(), self.loop).result(timeout)
+        except concurrent.futures.TimeoutError:
+            pass
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,86 @@
+"""Columnar in-memory store for the latest sample of every driver in a fleet.
+
+Each field is one preallocated NumPy array with a row per driver, so a fleet
+update is a handful of vectorized scatter writes and filters are boolean masks
+rather than loops over per-driver dicts.
+"""
+import time
+
+import numpy as np
+
+from safedrive.rules import CATEGORIES
+from safedrive.telemetry import COLUMNS, LEVELS, LEVEL_CODES, RISK_PROBS, VITAL_RANGES
+
+# Batch column -> display column for the overview table
+DISPLAY_COLUMNS = {
+    'heart_rate': 'Heart Rate (bpm)',
+    'hrv': 'HRV (ms)',
+    'spo2': 'SpO2 (%)',
+    'bp_systolic': 'Systolic (mmHg)',
+    'bp_diastolic': 'Diastolic (mmHg)',
+    'blood_sugar': 'Blood Sugar (mg/dL)',
+    'body_temp': 'Body Temperature',
+    'stress': 'Stress Level',
+    'fatigue': 'Fatigue Risk',
+    'health': 'Health Crisis Risk',
+}
+
+# Display category -> batch column, plus "Any" for the worst of the three
+FILTER_CATEGORIES = {category: column for category, _, _, column in CATEGORIES}
+
+
+class FleetStore:
+    """Latest vitals and risk levels for ``capacity`` drivers."""
+
+    def __init__(self, capacity, driver_ids=None):
+        self.capacity = capacity
+        if driver_ids is None:
+            driver_ids = [f"V{i:05d}" for i in range(capacity)]
+        self.driver_ids = np.asarray(driver_ids)
+        self.columns = {name: np.zeros(capacity, dtype=np.int16) for name in VITAL_RANGES}
+        self.columns.update({name: np.zeros(capacity, dtype=np.int8) for name in RISK_PROBS})
+        self.updated_at = np.zeros(capacity, dtype=np.float64)
+        self.seen = np.zeros(capacity, dtype=bool)
+
+    def update(self, batch, rows=None, now=None):
+        """Write a columnar batch into ``rows`` (all drivers when ``None``)."""
+        if rows is None:
+            rows = slice(0, len(batch[COLUMNS[0]]))
+        for name, column in self.columns.items():
+            column[rows] = batch[name]
+        self.updated_at[rows] = time.time() if now is None else now
+        self.seen[rows] = True
+
+    def worst_level(self):
+        return np.maximum.reduce([self.columns[column] for column in FILTER_CATEGORIES.values()])
+
+    def mask(self, category="Any", min_level='Low'):
+        """Boolean mask of drivers at or above ``min_level`` in ``category``."""
+        if category == "Any":
+            levels = self.worst_level()
+        else:
+            levels = self.columns[FILTER_CATEGORIES[category]]
+        return self.seen & (levels >= LEVEL_CODES[min_level])
+
+    def level_counts(self, category):
+        column = self.columns[FILTER_CATEGORIES[category]][self.seen]
+        return dict(zip(LEVELS, np.bincount(column, minlength=len(LEVELS)).tolist()))
+
+    def to_frame(self, mask=None, sort_by=None, ascending=False, limit=None):
+        """Overview DataFrame of the selected drivers, levels as ordered categoricals."""
+        import pandas as pd
+
+        rows = np.flatnonzero(self.seen if mask is None else mask)
+        if sort_by is not None:
+            keys = self.columns[sort_by][rows].astype(np.int32)
+            rows = rows[np.argsort(keys if ascending else -keys, kind='stable')]
+        if limit is not None:
+            rows = rows[:limit]
+
+        frame = {'Driver': self.driver_ids[rows]}
+        for name, label in DISPLAY_COLUMNS.items():
+            values = self.columns[name][rows]
+            if name in RISK_PROBS:
+                values = pd.Categorical.from_codes(values, categories=LEVELS, ordered=True)
+            frame[label] = values
+        return pd.DataFrame(frame)
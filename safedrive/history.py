@@ -0,0 +1,96 @@
+"""Fixed-capacity per-metric history with O(1) appends.
+
+``RingBuffer`` writes every value twice, at ``i`` and ``i + capacity``, so the
+most recent ``capacity`` values are always one contiguous slice of the backing
+array.  Readers get a zero-copy view in chronological order and memory per
+driver is fixed no matter how long a shift runs.
+"""
+import time
+
+import numpy as np
+
+from safedrive.telemetry import COLUMNS
+
+# Metric -> dtype of its buffer
+METRICS = {
+    'heart_rate': np.int16,
+    'hrv': np.int16,
+    'spo2': np.int16,
+    'bp_systolic': np.int16,
+    'bp_diastolic': np.int16,
+    'blood_sugar': np.int16,
+    'body_temp': np.float32,
+    'stress': np.int8,
+    'fatigue': np.int8,
+    'health': np.int8,
+}
+
+
+class RingBuffer:
+    def __init__(self, capacity, dtype=np.float64):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._pos = 0
+        self.count = 0  # total values ever appended
+
+    def append(self, value):
+        pos = self._pos
+        self._data[pos] = value
+        self._data[pos + self.capacity] = value
+        self._pos = pos + 1 if pos + 1 < self.capacity else 0
+        self.count += 1
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def view(self):
+        """Chronological zero-copy view of the retained values."""
+        n = len(self)
+        end = self._pos + self.capacity if self.count >= self.capacity else self._pos
+        return self._data[end - n:end]
+
+    def since(self, count):
+        """Values appended after the buffer had seen ``count`` values."""
+        new = min(self.count - count, len(self))
+        return self.view()[len(self) - new:] if new > 0 else self._data[:0]
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+
+class VitalHistory:
+    """One ring buffer per vital sign and risk level, plus sample timestamps."""
+
+    def __init__(self, capacity=3600):
+        self.capacity = capacity
+        self.buffers = {name: RingBuffer(capacity, dtype) for name, dtype in METRICS.items()}
+        self.timestamps = RingBuffer(capacity, np.float64)
+        # Buffers in ``Sample`` field order
+        self._ordered = [self.buffers[name] for name in COLUMNS]
+        self.started = time.time()
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def count(self):
+        return self.timestamps.count
+
+    def append_row(self, batch, i, now=None):
+        for name, buffer in self.buffers.items():
+            buffer.append(batch[name][i])
+        self.timestamps.append((time.time() if now is None else now) - self.started)
+
+    def append_sample(self, sample, now=None):
+        """Append one ``Sample``."""
+        for buffer, value in zip(self._ordered, sample):
+            buffer.append(value)
+        self.timestamps.append((time.time() if now is None else now) - self.started)
+
+    def view(self, name):
+        return self.buffers[name].view()
+
+    @property
+    def nbytes(self):
+        return self.timestamps.nbytes + sum(b.nbytes for b in self.buffers.values())
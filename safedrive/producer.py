@@ -0,0 +1,96 @@
+"""Process-wide telemetry feed shared by every dashboard session.
+
+The feed polls its source at most once per period, no matter how many
+sessions read it.  Readers get the same immutable ``Snapshot`` until the period elapses,
+so all viewers see the same data and per-viewer cost is only rendering.
+Production is pull-driven: whichever reader first finds the snapshot stale
+reads the source under a lock, so the feed itself has no thread to manage
+across Streamlit reruns.  The dashboard's ``ActionDispatcher`` is one such
+reader and polls it every period, so samples keep flowing with no page open.
+Sources are non-blocking; when one has nothing new
+the current snapshot is kept.  With a ``RiskEngine`` the risk levels of every
+sample read are re-derived from the vitals before publishing.
+
+Every sample read becomes its own ``Snapshot`` with consecutive seqs, even
+when one poll reads many.  ``snapshot`` returns the latest; ``since`` returns
+all those after a given seq from a bounded backlog, so consumers that must
+see every sample (the dispatcher) can.  With an ``EventBus`` every new
+snapshot is also published on it, outside the lock.
+"""
+import threading
+import time
+from collections import deque, namedtuple
+from itertools import islice
+
+from safedrive.sources import RandomSource, batch_len
+from safedrive.telemetry import to_sample
+
+Snapshot = namedtuple('Snapshot', ['seq', 'timestamp', 'sample'])
+
+
+class SharedFeed:
+    def __init__(self, hz=50, source=None, risk=None, max_batch=1024, clock=time.time, bus=None, backlog=None):
+        self.period = 1.0 / hz
+        self.source = source if source is not None else RandomSource(hz=hz)
+        self.risk = risk
+        self.bus = bus
+        self.max_batch = max_batch
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._snapshot = None
+        # Recent snapshots for ``since``; several polls' worth by default
+        self._recent = deque(maxlen=4 * max_batch if backlog is None else backlog)
+        self._polled = float('-inf')
+        self.reads = 0
+        self.produced = 0
+
+    def _produce(self, now):
+        """Read the source; returns the new snapshots, one per sample."""
+        self._polled = now
+        batch = self.source.read(self.max_batch)
+        n = batch_len(batch)
+        if n == 0:
+            return []
+        if self.risk is not None:
+            self.risk.apply_series(batch)
+        first = self._snapshot.seq + 1 if self._snapshot else 0
+        snapshots = [Snapshot(first + i, now, to_sample(batch, i)) for i in range(n)]
+        self._recent.extend(snapshots)
+        self._snapshot = snapshots[-1]
+        self.produced += n
+        return snapshots
+
+    def snapshot(self):
+        """Latest sample, polling the source at most once per period.
+
+        Returns ``None`` until the source has delivered its first sample.
+        """
+        self.reads += 1
+        now = self._clock()
+        if now - self._polled < self.period:
+            return self._snapshot
+        with self._lock:
+            # Another session may have polled while we waited for the lock
+            produced = self._produce(now) if now - self._polled >= self.period else []
+            snapshot = self._snapshot
+        if self.bus is not None:
+            for new in produced:
+                self.bus.publish(new)
+        return snapshot
+
+    @property
+    def latest(self):
+        """The latest snapshot without polling."""
+        return self._snapshot
+
+    def since(self, seq):
+        """Snapshots after ``seq`` (all retained ones for ``None``), oldest first.
+
+        Only the last ``backlog`` samples are retained; a caller further
+        behind than that gets the retained ones and can tell from the seqs.
+        """
+        with self._lock:
+            if seq is None:
+                return list(self._recent)
+            skip = len(self._recent) - (self._snapshot.seq - seq) if self._snapshot else len(self._recent)
+            return list(islice(self._recent, max(skip, 0), None))
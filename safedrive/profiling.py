@@ -0,0 +1,153 @@
+"""Timing for the dashboard script's cold start, reruns and monitor ticks.
+
+A ``PhaseTimer`` is marked at the end of each phase of a script run.  The
+first run recorded in a process is kept as the cold-start profile, later runs
+feed a per-phase running mean, so the two can be compared side by side.
+Both live at module level and therefore survive Streamlit reruns.
+
+A ``StageTimer`` times the stages of every monitor tick into fixed-size ring
+buffers, from which rolling percentiles and histograms are computed on demand.
+``NULL_STAGE_TIMER`` has the same interface and does nothing, so a disabled
+performance panel costs one no-op method call per stage.
+"""
+import time
+
+import numpy as np
+
+from safedrive.history import RingBuffer
+
+_cold_start = None
+_rerun_means = {}
+_reruns = 0
+
+
+class PhaseTimer:
+    def __init__(self, start=None, clock=time.perf_counter):
+        self._clock = clock
+        self.start = clock() if start is None else start
+        self._last = self.start
+        self.phases = {}
+
+    def mark(self, phase):
+        """Close ``phase`` at the current time; repeated phases accumulate."""
+        now = self._clock()
+        self.phases[phase] = self.phases.get(phase, 0.0) + now - self._last
+        self._last = now
+
+    @property
+    def total(self):
+        return sum(self.phases.values())
+
+
+def record_run(timer):
+    """Record a finished run; returns True if it was the process's cold start."""
+    global _cold_start, _reruns
+    if _cold_start is None:
+        _cold_start = dict(timer.phases)
+        return True
+    _reruns += 1
+    for phase, seconds in timer.phases.items():
+        mean = _rerun_means.get(phase, seconds)
+        _rerun_means[phase] = mean + (seconds - mean) / _reruns
+    return False
+
+
+def report():
+    """Rows of (phase, cold start ms, mean rerun ms) plus a total row."""
+    if _cold_start is None:
+        return []
+    phases = list(_cold_start) + [p for p in _rerun_means if p not in _cold_start]
+    rows = [
+        (phase, _cold_start.get(phase, 0.0) * 1000, _rerun_means.get(phase, 0.0) * 1000 if _reruns else None)
+        for phase in phases
+    ]
+    rows.append(("total", sum(_cold_start.values()) * 1000,
+                 sum(_rerun_means.values()) * 1000 if _reruns else None))
+    return rows
+
+
+def markdown_table(rows, reruns=None):
+    reruns = _reruns if reruns is None else reruns
+    lines = [f"| Phase | Cold start (ms) | Rerun mean (ms, n={reruns}) |", "|---|---:|---:|"]
+    for phase, cold, rerun in rows:
+        lines.append(f"| {phase} | {cold:.1f} | {'-' if rerun is None else f'{rerun:.1f}'} |")
+    return "\n".join(lines)
+
+
+class StageTimer:
+    def __init__(self, capacity=2000, clock=time.perf_counter):
+        self.capacity = capacity
+        self._clock = clock
+        self._last = clock()
+        self.buffers = {}
+
+    def begin(self):
+        self._last = self._clock()
+
+    def lap(self, stage):
+        """Record the time since the previous ``begin``/``lap`` under ``stage``."""
+        now = self._clock()
+        buffer = self.buffers.get(stage)
+        if buffer is None:
+            buffer = self.buffers[stage] = RingBuffer(self.capacity)
+        buffer.append(now - self._last)
+        self._last = now
+
+    def summary(self):
+        """``{stage: {count, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}`` over the window."""
+        out = {}
+        # A copy: another thread may be adding a stage (e.g. the dispatcher's timer)
+        for stage, buffer in list(self.buffers.items()):
+            ms = buffer.view() * 1000
+            if not len(ms):
+                continue
+            p50, p90, p99 = np.percentile(ms, [50, 90, 99])
+            out[stage] = {
+                'count': buffer.count, 'mean_ms': float(ms.mean()), 'p50_ms': float(p50),
+                'p90_ms': float(p90), 'p99_ms': float(p99), 'max_ms': float(ms.max()),
+            }
+        return out
+
+    def histogram(self, stage, bins=12):
+        """Log-spaced histogram of ``stage`` durations: ``(counts, edges_ms)``."""
+        ms = self.buffers[stage].view() * 1000
+        lo, hi = max(ms.min(), 1e-3), max(ms.max(), 2e-3)
+        return np.histogram(ms, bins=np.geomspace(lo, hi * 1.0001, bins + 1))
+
+    def export(self):
+        """JSON-serialisable summary plus the raw rolling samples in ms."""
+        return {
+            'summary': self.summary(),
+            'samples_ms': {stage: (b.view() * 1000).round(4).tolist() for stage, b in self.buffers.items()},
+        }
+
+
+class _NullStageTimer:
+    buffers = {}
+
+    def begin(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+
+NULL_STAGE_TIMER = _NullStageTimer()
+
+_SPARK = " ▁▂▃▄▅▆▇█"
+
+
+def sparkline(counts):
+    """Unicode bar sketch of histogram ``counts``."""
+    top = max(counts.max(), 1)
+    return "".join(_SPARK[int(round(c / top * (len(_SPARK) - 1)))] for c in counts)
+
+
+def stage_table(timer):
+    lines = ["| Stage | p50 ms | p99 ms | max ms | histogram |", "|---|---:|---:|---:|---|"]
+    for stage, stats in timer.summary().items():
+        counts, _ = timer.histogram(stage)
+        lines.append(
+            f"| {stage} | {stats['p50_ms']:.3f} | {stats['p99_ms']:.3f} | {stats['max_ms']:.3f} | `{sparkline(counts)}` |"
+        )
+    return "\n".join(lines)
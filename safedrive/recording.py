@@ -0,0 +1,258 @@
+"""Append-only fixed-width binary recording of monitored sessions.
+
+Each record is 20 bytes:
+
+    t_ms         uint32   milliseconds since the recording's start time
+    heart_rate   uint8
+    hrv          uint8
+    spo2         uint8
+    bp           uint16   systolic << 8 | diastolic
+    blood_sugar  uint16
+    body_temp    int16    hundredths of a degree
+    levels       uint8    stress | fatigue << 2 | health << 4
+    stress_actions, fatigue_actions, health_actions
+                 uint16   bitmask over ``ACTIONS`` of what was dispatched,
+                          "Send Notification" included
+
+behind a 32-byte header (magic, version, record size, start epoch).  Vitals
+outside a field's range (e.g. a heart rate over 255) are clamped to it, and
+the writer counts the samples affected in ``clamped``.  A day at 1 Hz is
+~1.7 MB.  ``RecordingReader`` memory-maps the file so records are
+zero-copy NumPy views and time lookups are a binary search.
+"""
+import os
+import struct
+import threading
+import time
+
+import numpy as np
+
+from safedrive.rules import ACTIONS, CATEGORIES
+from safedrive.telemetry import Sample, to_display
+
+MAGIC = b'SDSREC\x00\x01'
+VERSION = 1
+HEADER = struct.Struct('<8sHHxxxx d 8x')
+
+RECORD_DTYPE = np.dtype([
+    ('t_ms', '<u4'),
+    ('heart_rate', 'u1'),
+    ('hrv', 'u1'),
+    ('spo2', 'u1'),
+    ('bp', '<u2'),
+    ('blood_sugar', '<u2'),
+    ('body_temp', '<i2'),
+    ('levels', 'u1'),
+    ('stress_actions', '<u2'),
+    ('fatigue_actions', '<u2'),
+    ('health_actions', '<u2'),
+])
+RECORD = struct.Struct('<IBBBHHhBHHH')
+assert RECORD.size == RECORD_DTYPE.itemsize
+
+# Vital -> (min, max) the record can hold, in ``Sample`` field order
+LIMITS = {
+    'heart_rate': (0, 0xFF),
+    'hrv': (0, 0xFF),
+    'spo2': (0, 0xFF),
+    'bp_systolic': (0, 0xFF),
+    'bp_diastolic': (0, 0xFF),
+    'blood_sugar': (0, 0xFFFF),
+    'body_temp': (-327.68, 327.67),
+}
+
+ACTION_BITS = {action: 1 << i for i, action in enumerate(ACTIONS)}
+_CATEGORY_SLOTS = {category: i for i, (category, _, _, _) in enumerate(CATEGORIES)}
+
+
+def action_masks(requests):
+    """Per-category action bitmasks for a list of ``ActionRequest``s."""
+    masks = [0, 0, 0]
+    for request in requests:
+        masks[_CATEGORY_SLOTS[request.category]] |= ACTION_BITS[request.action]
+    return masks
+
+
+def mask_actions(mask):
+    return [action for action, bit in ACTION_BITS.items() if mask & bit]
+
+
+class RecordingWriter:
+    """Appends records to a recording, creating it with a header if needed.
+
+    A torn trailing record (or header) left by a crash is cut off first, so
+    new records stay aligned.
+    """
+
+    def __init__(self, path, start=None, buffering=64 * RECORD.size, flush_interval=1.0):
+        self.path = str(path)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        exists = size >= HEADER.size
+        if exists:
+            with open(self.path, 'rb') as f:
+                self.start = _read_header(f.read(HEADER.size))
+            whole = HEADER.size + (size - HEADER.size) // RECORD.size * RECORD.size
+        else:
+            self.start = time.time() if start is None else start
+            whole = 0
+        if size != whole:
+            os.truncate(self.path, whole)
+        self._file = open(self.path, 'ab', buffering=buffering)
+        if not exists:
+            self._file.write(HEADER.pack(MAGIC, VERSION, RECORD.size, self.start))
+        self.count = 0
+        self.clamped = 0
+        self.flush_interval = flush_interval
+        self._flushed = time.monotonic()
+        self._lock = threading.Lock()
+
+    def append(self, sample, requests=(), now=None):
+        """Append one ``Sample`` and the requests dispatched for it."""
+        with self._lock:
+            self._append(sample, requests, now)
+
+    def _append(self, sample, requests, now):
+        now = time.time() if now is None else now
+        stress, fatigue, health = action_masks(requests)
+        vitals = sample[:len(LIMITS)]
+        clamped = [min(max(value, low), high) for value, (low, high) in zip(vitals, LIMITS.values())]
+        if clamped != list(vitals):
+            self.clamped += 1
+        heart_rate, hrv, spo2, systolic, diastolic, blood_sugar, body_temp = clamped
+        self._file.write(RECORD.pack(
+            max(int((now - self.start) * 1000), 0),
+            heart_rate,
+            hrv,
+            spo2,
+            systolic << 8 | diastolic,
+            blood_sugar,
+            round(body_temp * 100),
+            sample.stress | sample.fatigue << 2 | sample.health << 4,
+            stress, fatigue, health,
+        ))
+        self.count += 1
+        self._maybe_flush()
+
+    def append_batch(self, batch, timestamps, masks=None):
+        """Append a columnar batch; ``masks`` is an optional (n, 3) action bitmask array."""
+        n = len(timestamps)
+        out = np.zeros(n, dtype=RECORD_DTYPE)
+        out['t_ms'] = np.maximum((np.asarray(timestamps) - self.start) * 1000, 0).astype(np.uint32)
+        vitals = {}
+        outside = np.zeros(n, dtype=bool)
+        for name, (low, high) in LIMITS.items():
+            column = np.asarray(batch[name])
+            outside |= (column < low) | (column > high)
+            vitals[name] = np.clip(column, low, high)
+        self.clamped += int(outside.sum())
+        for name in ('heart_rate', 'hrv', 'spo2', 'blood_sugar'):
+            out[name] = vitals[name]
+        out['bp'] = vitals['bp_systolic'].astype(np.uint16) << 8 | vitals['bp_diastolic'].astype(np.uint16)
+        out['body_temp'] = np.round(vitals['body_temp'] * 100)
+        out['levels'] = batch['stress'] | batch['fatigue'] << 2 | batch['health'] << 4
+        if masks is not None:
+            out['stress_actions'], out['fatigue_actions'], out['health_actions'] = np.asarray(masks).T
+        self._file.write(out.tobytes())
+        self.count += n
+        self._maybe_flush()
+
+    def _maybe_flush(self):
+        # Bounds how much a crash can lose while keeping writes batched
+        now = time.monotonic()
+        if now - self._flushed >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        self._file.flush()
+        self._flushed = time.monotonic()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _read_header(raw):
+    magic, version, record_size, start = HEADER.unpack(raw)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError("not a SafeDrive recording")
+    if version != VERSION:
+        raise ValueError(f"unsupported recording version {version}")
+    return start
+
+
+class RecordingReader:
+    """Zero-copy, memory-mapped random access to a recording."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self.start = _read_header(f.read(HEADER.size))
+        size = os.path.getsize(self.path) - HEADER.size
+        count = size // RECORD.size  # ignore a torn trailing record
+        if count:
+            self.records = np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=HEADER.size, shape=(count,))
+        else:
+            self.records = np.zeros(0, dtype=RECORD_DTYPE)
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        return self.records[index]
+
+    def timestamps(self):
+        return self.start + self.records['t_ms'] / 1000.0
+
+    def index_at(self, t):
+        """Index of the last record at or before epoch time ``t``."""
+        t_ms = (t - self.start) * 1000
+        return max(int(np.searchsorted(self.records['t_ms'], t_ms, side='right')) - 1, 0)
+
+    def window(self, t0, t1):
+        """Records between epoch times ``t0`` and ``t1`` as a view."""
+        t_ms = self.records['t_ms']
+        lo = np.searchsorted(t_ms, (t0 - self.start) * 1000, side='left')
+        hi = np.searchsorted(t_ms, (t1 - self.start) * 1000, side='right')
+        return self.records[lo:hi]
+
+    @staticmethod
+    def unpack(records):
+        """Columnar batch (as in ``generate_batch``) from a slice of records."""
+        levels = records['levels']
+        return {
+            'heart_rate': records['heart_rate'].astype(np.int16),
+            'hrv': records['hrv'].astype(np.int16),
+            'spo2': records['spo2'].astype(np.int16),
+            'bp_systolic': (records['bp'] >> 8).astype(np.int16),
+            'bp_diastolic': (records['bp'] & 0xFF).astype(np.int16),
+            'blood_sugar': records['blood_sugar'].astype(np.int16),
+            'body_temp': records['body_temp'] / 100.0,
+            'stress': (levels & 3).astype(np.int8),
+            'fatigue': (levels >> 2 & 3).astype(np.int8),
+            'health': (levels >> 4 & 3).astype(np.int8),
+        }
+
+    def sample(self, index):
+        """One record as a ``Sample``."""
+        row = self.records[index]
+        temp = row['body_temp'] / 100
+        bp, levels = int(row['bp']), int(row['levels'])
+        return Sample(
+            int(row['heart_rate']), int(row['hrv']), int(row['spo2']), bp >> 8, bp & 0xFF,
+            int(row['blood_sugar']), int(temp) if temp == int(temp) else float(temp),
+            levels & 3, levels >> 2 & 3, levels >> 4 & 3,
+        )
+
+    def decode(self, index):
+        """Display record plus ``{category: [actions]}`` for one record."""
+        row = self.records[index]
+        actions = {
+            category: mask_actions(int(row[f'{key}_actions']))
+            for category, _, key, _ in CATEGORIES
+        }
+        return to_display(self.sample(index)), actions
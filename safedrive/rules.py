@@ -0,0 +1,160 @@
+"""Compiled action/notification rules.
+
+The dashboard's per-level multiselect configuration (``st.session_state.actions``)
+is compiled once into a ``RuleTable`` holding the prebuilt action and
+notification messages for every (category, level) pair, so dispatching a
+sample is a dict lookup per category instead of walking and formatting the
+selected actions on every tick.  The same table exposes boolean firing masks
+for scoring whole batches with NumPy.
+"""
+from functools import lru_cache
+from types import MappingProxyType
+
+import numpy as np
+
+from safedrive.telemetry import COLUMNS, LEVELS
+
+ACTIONS = [
+    "No Action", "Send Notification", "Reduce Speed", "Play Calming Music",
+    "Turn On Air Conditioning", "Adjust Seat Position", "Activate Horn",
+    "Call Emergency Services", "Activate Autopilot", "Flash Alert Lights"
+]
+NOTIFY_ACTION = "Send Notification"
+
+# Initial per-session configuration: config key -> level -> selected actions
+DEFAULT_ACTIONS = {
+    'stress': {'Low': ["Send Notification"], 'Moderate': [], 'High': [], 'Critical': []},
+    'fatigue': {'Low': ["Send Notification"], 'Moderate': [], 'High': [], 'Critical': []},
+    'health': {'Low': ["Send Notification"], 'Moderate': [], 'High': [], 'Critical': []}
+}
+
+# (display category, display risk key, config key, batch column)
+CATEGORIES = [
+    ("Stress", "Stress Level", "stress", "stress"),
+    ("Fatigue", "Fatigue Risk", "fatigue", "fatigue"),
+    ("Health Crisis", "Health Crisis Risk", "health", "health"),
+]
+
+NOTIFICATION_MESSAGES = {
+    "Stress": {
+        "Moderate": "🟠 Moderate stress detected. Consider taking deep breaths.",
+        "High": "🔴 High stress detected! Reduce distractions and focus on the road.",
+        "Critical": "🚨 CRITICAL STRESS! Pull over safely and take a break."
+    },
+    "Fatigue": {
+        "Moderate": "🟠 Moderate fatigue detected. Consider stretching or stopping soon.",
+        "High": "🔴 High fatigue detected! Take a break immediately.",
+        "Critical": "🚨 CRITICAL FATIGUE! Your reaction time is dangerously low. Stop now."
+    },
+    "Health Crisis": {
+        "Moderate": "🟠 Mild health irregularity detected. Monitor your condition.",
+        "High": "🔴 Significant health concern! Consider seeking medical attention.",
+        "Critical": "🚨 EMERGENCY! Health crisis detected. Contact emergency services immediately."
+    }
+}
+
+
+# Notification generator
+def generate_notification(category, level):
+    return NOTIFICATION_MESSAGES.get(category, {}).get(level, "✅ Normal Condition")
+
+
+class Rule:
+    __slots__ = ('category', 'level', 'actions', 'action_messages', 'notifications')
+
+    def __init__(self, category, level, selected):
+        self.category = category
+        self.level = level
+        self.actions = tuple(a for a in selected if a != NOTIFY_ACTION)
+        self.action_messages = tuple(
+            f"🚗 {action} activated due to {category} ({level})" for action in self.actions
+        )
+        self.notifications = tuple(
+            generate_notification(category, level) for a in selected if a == NOTIFY_ACTION
+        )
+
+
+class RuleTable:
+    """Prebuilt rules indexed by (category, level)."""
+
+    def __init__(self, config):
+        self.rules = {}
+        # fires[category, level, action] -> whether the action is selected
+        self.fires = np.zeros((len(CATEGORIES), len(LEVELS), len(ACTIONS)), dtype=bool)
+        action_index = {action: i for i, action in enumerate(ACTIONS)}
+        for c, (category, _, config_key, _) in enumerate(CATEGORIES):
+            for l, level in enumerate(LEVELS):
+                selected = config[config_key].get(level, [])
+                self.rules[category, level] = Rule(category, level, selected)
+                for action in selected:
+                    self.fires[c, l, action_index[action]] = True
+        # (sample field index, rules by level code) per category
+        self._by_code = [
+            (COLUMNS.index(column), tuple(self.rules[category, level] for level in LEVELS))
+            for category, _, _, column in CATEGORIES
+        ]
+
+    def lookup(self, category, level):
+        return self.rules[category, level]
+
+    def rules_for(self, sample):
+        """The ``Rule`` of every category, in ``CATEGORIES`` order, for one ``Sample``."""
+        return [by_level[sample[field]] for field, by_level in self._by_code]
+
+    def dispatch(self, sample):
+        """Return ``(actions_taken, notifications)`` for one ``Sample``.
+
+        The returned lists are fresh, but the message strings are shared.
+        """
+        actions_taken = {}
+        notifications = {}
+        for rule in self.rules_for(sample):
+            actions_taken[rule.category] = list(rule.action_messages)
+            notifications[rule.category] = list(rule.notifications)
+        return actions_taken, notifications
+
+    def dispatch_batch(self, batch):
+        """Return ``{category: bool array (n, len(ACTIONS))}`` for a columnar batch."""
+        return {
+            category: self.fires[c][batch[column]]
+            for c, (category, _, _, column) in enumerate(CATEGORIES)
+        }
+
+    def action_counts(self, batch):
+        """Return ``{category: int array (len(ACTIONS),)}`` firing counts for a batch."""
+        counts = {}
+        for c, (category, _, _, column) in enumerate(CATEGORIES):
+            per_level = np.bincount(batch[column], minlength=len(LEVELS))
+            counts[category] = per_level @ self.fires[c].astype(np.int64)
+        return counts
+
+
+def config_key(config):
+    return tuple(
+        (key, tuple((level, tuple(config[key].get(level, []))) for level in LEVELS))
+        for _, _, key, _ in CATEGORIES
+    )
+
+
+@lru_cache(maxsize=32)
+def _compile_frozen(frozen):
+    return RuleTable({key: dict(levels) for key, levels in frozen})
+
+
+@lru_cache(maxsize=256)
+def _share_frozen(frozen):
+    return MappingProxyType({key: MappingProxyType(dict(levels)) for key, levels in frozen})
+
+
+def shared_config(config):
+    """Read-only copy of ``config``; equal configurations get the same object.
+
+    Sessions keep this instead of a private deep copy, so a server with many
+    dashboards on the same profile holds the configuration once.
+    """
+    return _share_frozen(config_key(config))
+
+
+def compile_rules(config):
+    """Compile ``config``, reusing the cached table while it is unchanged."""
+    return _compile_frozen(config_key(config))
@@ -0,0 +1,187 @@
+"""Per-session memory accounting, budgets and eviction for a multi-user server.
+
+Each dashboard session keeps its heavy state (trend history and chart, fleet
+views) in a ``SessionMemory`` rather than directly in ``st.session_state``,
+and registers it with the process-wide ``SessionRegistry``.  Because that
+state is only reachable through the ``SessionMemory``, the registry can
+release an idle session's state from any thread.  The next time the session
+runs, it rebuilds the state empty through ``SessionMemory.get``.
+
+Sessions measure themselves when they run, and ``enforce`` then evicts idle
+sessions:
+
+* idle sessions over the per-session budget are always evicted
+* while the server total is over its budget, the remaining idle sessions are
+  evicted least recently active first
+
+An active session is never evicted.  If it is over budget it is reported,
+and it is evicted first once it goes idle.
+
+``sizeof`` estimates a footprint.  Objects with an ``nbytes`` property report
+it themselves.  Other objects are walked through their containers and
+attributes, counting each object once.
+"""
+import sys
+import threading
+import time
+import weakref
+from collections import deque
+from types import BuiltinFunctionType, FunctionType, MethodType, ModuleType
+
+_OPAQUE = (type, ModuleType, FunctionType, BuiltinFunctionType, MethodType)
+
+MB = 2 ** 20
+
+
+def sizeof(obj, _seen=None):
+    """Approximate bytes held by ``obj`` and everything it references."""
+    if _seen is None:
+        _seen = set()
+    if id(obj) in _seen or isinstance(obj, _OPAQUE):
+        return 0
+    _seen.add(id(obj))
+    nbytes = getattr(type(obj), 'nbytes', None)
+    if isinstance(nbytes, property):
+        return obj.nbytes
+    # For NumPy arrays this includes the data when the array owns it
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(sizeof(key, _seen) + sizeof(value, _seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(sizeof(item, _seen) for item in obj)
+    else:
+        if hasattr(obj, '__dict__'):
+            size += sizeof(vars(obj), _seen)
+        for slot in getattr(type(obj), '__slots__', ()):
+            size += sizeof(getattr(obj, slot, None), _seen)
+    return size
+
+
+class SessionMemory:
+    """One session's evictable state plus its last measured footprint."""
+
+    def __init__(self, name):
+        self.name = name
+        self._state = {}
+        self._lock = threading.Lock()
+        self.last_active = time.time()
+        self.nbytes = 0  # everything measured by the last ``touch``
+        self.evictable = 0  # the part held here
+        self.evictions = 0
+
+    def get(self, key, factory, valid=None):
+        """The object under ``key``; ``factory()`` builds it when missing, evicted or not ``valid``."""
+        with self._lock:
+            obj = self._state.get(key)
+            if obj is None or (valid is not None and not valid(obj)):
+                obj = self._state[key] = factory()
+        return obj
+
+    def peek(self, key):
+        with self._lock:
+            return self._state.get(key)
+
+    def touch(self, other=None, now=None):
+        """Mark the session active and measure it; ``other`` is state kept outside (e.g. widgets)."""
+        with self._lock:
+            state = dict(self._state)
+        seen = set()
+        self.evictable = sizeof(state, seen)
+        self.nbytes = self.evictable + (sizeof(other, seen) if other is not None else 0)
+        self.last_active = time.time() if now is None else now
+
+    def evict(self):
+        """Drop all evictable state; returns the bytes released."""
+        with self._lock:
+            self._state.clear()
+            freed = self.evictable
+            self.nbytes -= freed
+            self.evictable = 0
+            self.evictions += 1
+        return freed
+
+
+class SessionRegistry:
+    """Tracks every live session's memory and enforces the budgets."""
+
+    def __init__(self, session_budget=64 * MB, server_budget=1024 * MB, idle_after=300.0):
+        self.session_budget = session_budget
+        self.server_budget = server_budget
+        self.idle_after = idle_after
+        self._lock = threading.Lock()
+        # A session's memory lives as long as its session state holds it
+        self._sessions = weakref.WeakValueDictionary()
+        self._created = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+
+    def register(self):
+        with self._lock:
+            self._created += 1
+            memory = SessionMemory(f"session-{self._created}")
+            self._sessions[memory.name] = memory
+        return memory
+
+    def sessions(self):
+        with self._lock:
+            return sorted(self._sessions.values(), key=lambda s: s.name)
+
+    @property
+    def nbytes(self):
+        return sum(s.nbytes for s in self.sessions())
+
+    def enforce(self, now=None, keep=None):
+        """Evict idle sessions as the budgets require; returns the names evicted."""
+        now = time.time() if now is None else now
+        sessions = self.sessions()
+        total = sum(s.nbytes for s in sessions)
+        idle = [
+            s for s in sessions
+            if s is not keep and s.evictable and now - s.last_active >= self.idle_after
+        ]
+        # Over-budget sessions first, then least recently active
+        idle.sort(key=lambda s: (s.nbytes <= self.session_budget, s.last_active))
+        evicted = []
+        for session in idle:
+            if session.nbytes <= self.session_budget and total <= self.server_budget:
+                break
+            freed = session.evict()
+            total -= freed
+            self.evicted_bytes += freed
+            self.evictions += 1
+            evicted.append(session.name)
+        return evicted
+
+    def metrics(self, now=None):
+        """One row per live session."""
+        now = time.time() if now is None else now
+        return [
+            {
+                'session': s.name,
+                'bytes': s.nbytes,
+                'evictable': s.evictable,
+                'budget_pct': 100.0 * s.nbytes / self.session_budget,
+                'idle_seconds': max(now - s.last_active, 0.0),
+                'evictions': s.evictions,
+            }
+            for s in self.sessions()
+        ]
+
+
+def memory_table(registry, now=None):
+    """Markdown table of memory per session against the budgets."""
+    rows = registry.metrics(now)
+    total = sum(row['bytes'] for row in rows)
+    lines = [
+        f"Sessions: {len(rows)} · {total / MB:.1f} of {registry.server_budget / MB:.0f} MB"
+        f" · evicted {registry.evictions} ({registry.evicted_bytes / MB:.1f} MB)",
+        "",
+        "| Session | MB | evictable MB | % of budget | idle s | evictions |",
+        "|---|---:|---:|---:|---:|---:|",
+    ]
+    for row in rows:
+        lines.append(
+            f"| {row['session']} | {row['bytes'] / MB:.2f} | {row['evictable'] / MB:.2f} | {row['budget_pct']:.0f} |"
+            f" {row['idle_seconds']:.0f} | {row['evictions']} |"
+        )
+    return "\n".join(lines)
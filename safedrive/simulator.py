@@ -0,0 +1,154 @@
+"""Headless multiprocess fleet simulator for load testing.
+
+Virtual drivers are sharded across worker processes.  Every worker runs the
+generate -> risk -> rules pipeline on its whole shard per tick with its own
+seeded generator and compiled ``RuleTable``.  Workers accumulate counters in
+their own row of a shared-memory array, so the parent aggregates fleet
+statistics without any per-sample pickling.
+
+    python -m safedrive.simulator --drivers 100000 --ticks 200 --workers 8
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from safedrive.risk import RiskEngine
+from safedrive.rules import ACTIONS, CATEGORIES, DEFAULT_ACTIONS, RuleTable
+from safedrive.telemetry import LEVEL_CODES, generate_batch
+
+N_CATEGORIES = len(CATEGORIES)
+N_ACTIONS = len(ACTIONS)
+CRITICAL = LEVEL_CODES['Critical']
+
+# Per-worker counter row: action firings per (category, action), Critical
+# samples per category, samples processed, ticks completed
+_FIRES = slice(0, N_CATEGORIES * N_ACTIONS)
+_CRITICAL = slice(_FIRES.stop, _FIRES.stop + N_CATEGORIES)
+_SAMPLES = _CRITICAL.stop
+_TICKS = _SAMPLES + 1
+ROW_WIDTH = _TICKS + 1
+
+
+def shard_sizes(n_drivers, n_workers):
+    base, extra = divmod(n_drivers, n_workers)
+    return [base + (i < extra) for i in range(n_workers)]
+
+
+def _worker(shm_name, row, n_drivers, seed, config, ticks, hz, derive_risk):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        counters = np.ndarray(ROW_WIDTH, dtype=np.int64, buffer=shm.buf, offset=row * ROW_WIDTH * 8)
+        rng = np.random.default_rng(seed)
+        rules = RuleTable(config)
+        fires = rules.fires.astype(np.int64)
+        risk = RiskEngine(n_drivers) if derive_risk else None
+        period = 1.0 / hz if hz else 0.0
+        deadline = time.perf_counter()
+        for _ in range(ticks):
+            batch = generate_batch(n_drivers, rng)
+            if risk is not None:
+                risk.apply(batch)
+            for c, (_, _, _, column) in enumerate(CATEGORIES):
+                per_level = np.bincount(batch[column], minlength=fires.shape[1])
+                start = _FIRES.start + c * N_ACTIONS
+                counters[start:start + N_ACTIONS] += per_level @ fires[c]
+                counters[_CRITICAL.start + c] += per_level[CRITICAL]
+            counters[_SAMPLES] += n_drivers
+            counters[_TICKS] += 1
+            if period:
+                deadline += period
+                delay = deadline - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+    finally:
+        shm.close()
+
+
+def summarize(totals, elapsed):
+    fires = totals[_FIRES].reshape(N_CATEGORIES, N_ACTIONS)
+    critical = totals[_CRITICAL]
+    return {
+        'elapsed_s': elapsed,
+        'samples': int(totals[_SAMPLES]),
+        'samples_per_s': totals[_SAMPLES] / elapsed,
+        'actions_per_s': fires.sum() / elapsed,
+        'critical_events_per_s': critical.sum() / elapsed,
+        'actions': {
+            category: {action: int(n) for action, n in zip(ACTIONS, fires[c]) if n}
+            for c, (category, _, _, _) in enumerate(CATEGORIES)
+        },
+        'critical_events': {category: int(critical[c]) for c, (category, _, _, _) in enumerate(CATEGORIES)},
+    }
+
+
+def simulate(n_drivers, ticks, n_workers=None, config=None, hz=None, derive_risk=True, seed=0):
+    """Run the simulation and return fleet-level statistics."""
+    n_workers = n_workers or os.cpu_count()
+    config = DEFAULT_ACTIONS if config is None else config
+    seeds = np.random.SeedSequence(seed).spawn(n_workers)
+    shm = shared_memory.SharedMemory(create=True, size=n_workers * ROW_WIDTH * 8)
+    try:
+        counters = np.ndarray((n_workers, ROW_WIDTH), dtype=np.int64, buffer=shm.buf)
+        counters[:] = 0
+        workers = [
+            mp.Process(target=_worker, args=(shm.name, row, size, seeds[row], config, ticks, hz, derive_risk))
+            for row, size in enumerate(shard_sizes(n_drivers, n_workers))
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        failed = [w.exitcode for w in workers if w.exitcode]
+        if failed:
+            raise RuntimeError(f"{len(failed)} simulator worker(s) failed, exit codes {failed}")
+        result = summarize(counters.sum(axis=0), elapsed)
+    finally:
+        shm.close()
+        shm.unlink()
+    result.update(drivers=n_drivers, ticks=ticks, workers=n_workers)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Multiprocess SafeDrive fleet simulator")
+    parser.add_argument('--drivers', type=int, default=10_000)
+    parser.add_argument('--ticks', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None, help="default: one per CPU")
+    parser.add_argument('--hz', type=float, default=None, help="pace ticks instead of running flat out")
+    parser.add_argument('--config', default=None, help="JSON action configuration (default: dashboard defaults)")
+    parser.add_argument('--raw-levels', action='store_true', help="use generated levels instead of RiskEngine")
+    parser.add_argument('--scaling', action='store_true', help="repeat with 1, 2, 4, ... workers")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    config = None
+    if args.config:
+        with open(args.config) as f:
+            config = json.load(f)
+    max_workers = args.workers or os.cpu_count()
+    worker_counts = [max_workers]
+    if args.scaling:
+        worker_counts = sorted({min(2 ** i, max_workers) for i in range(max_workers.bit_length() + 1)})
+
+    baseline = None
+    for n_workers in worker_counts:
+        result = simulate(args.drivers, args.ticks, n_workers, config, args.hz, not args.raw_levels, args.seed)
+        baseline = baseline or result['samples_per_s'] / n_workers
+        print(
+            f"{n_workers:3d} workers  {result['samples_per_s']:>14,.0f} samples/s"
+            f"  {result['actions_per_s']:>12,.0f} actions/s"
+            f"  {result['critical_events_per_s']:>12,.0f} critical/s"
+            f"  efficiency {result['samples_per_s'] / (baseline * n_workers):.0%}"
+        )
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,441 @@
+"""Pluggable telemetry sources.
+
+Every source implements ``read(max_samples)``, a non-blocking call that returns
+whatever samples are available as a columnar batch (see
+``safedrive.telemetry.generate_batch``), possibly empty.  Sources track their
+own ingest rate and backlog (samples available but not yet read) so the
+dashboard can tell whether ingestion keeps up.
+
+* ``RandomSource`` - the simulator behind ``generate_fake_data``
+* ``ReplaySource`` - recorded CSV/Parquet logs at real or accelerated speed
+* ``UdpSource`` - JSON datagrams from a local simulator process
+* ``WebSocketSource`` - JSON messages from a local WebSocket endpoint
+  (needs the optional ``websockets`` package)
+* ``PushSource`` - samples handed in by the caller, e.g. an API's ingest endpoint
+"""
+import json
+import math
+import numbers
+import socket
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+from safedrive.telemetry import COLUMNS, LEVEL_CODES, LEVELS, RISK_PROBS, VITAL_RANGES, generate_batch, make_rng
+
+_DTYPES = {name: np.int16 for name in VITAL_RANGES}
+# Devices report fractional degrees (the recording keeps hundredths)
+_DTYPES['body_temp'] = np.float64
+_DTYPES.update({name: np.int8 for name in RISK_PROBS})
+
+
+def batch_len(batch):
+    return len(batch[COLUMNS[0]])
+
+
+def empty_batch():
+    return {name: np.zeros(0, dtype=dtype) for name, dtype in _DTYPES.items()}
+
+
+def check_row(row):
+    """Values of one dict row in ``COLUMNS`` order; raises ``ValueError`` if it is malformed.
+
+    Levels may be names or codes 0-3.  Vitals must be finite numbers;
+    all but ``body_temp`` are rounded to whole units and must fit their column.
+    """
+    if not isinstance(row, dict):
+        raise ValueError(f"expected a sample object, got {type(row).__name__}")
+    values = []
+    for name, dtype in _DTYPES.items():
+        if name not in row:
+            raise ValueError(f"missing {name!r}")
+        value = row[name]
+        if name in RISK_PROBS:
+            if isinstance(value, str):
+                if value not in LEVEL_CODES:
+                    raise ValueError(f"unknown {name} level {value!r}")
+                value = LEVEL_CODES[value]
+            elif isinstance(value, bool) or not isinstance(value, numbers.Integral) or not 0 <= value < len(LEVELS):
+                raise ValueError(f"{name} must be a level name or a code 0-{len(LEVELS) - 1}, got {value!r}")
+        else:
+            if isinstance(value, bool) or not isinstance(value, numbers.Real) or not math.isfinite(value):
+                raise ValueError(f"{name} must be a number, got {value!r}")
+            if np.issubdtype(dtype, np.integer):
+                value = round(value)
+                limits = np.iinfo(dtype)
+                if not limits.min <= value <= limits.max:
+                    raise ValueError(f"{name} {value} is out of range")
+        values.append(value)
+    return values
+
+
+def _to_batch(values):
+    if not values:
+        return empty_batch()
+    return {name: np.array(column, dtype=dtype) for (name, dtype), column in zip(_DTYPES.items(), zip(*values))}
+
+
+def rows_to_batch(rows):
+    """Columnar batch from dict rows; raises ``ValueError`` for the first malformed row."""
+    return _to_batch([check_row(row) for row in rows])
+
+
+def valid_rows_to_batch(rows):
+    """``(batch, malformed)``: a batch of the well-formed rows and how many were dropped."""
+    values = []
+    for row in rows:
+        try:
+            values.append(check_row(row))
+        except ValueError:
+            pass
+    return _to_batch(values), len(rows) - len(values)
+
+
+class RateMeter:
+    """Samples per second over a sliding window of read calls."""
+
+    def __init__(self, window=2.0, clock=time.perf_counter):
+        self.window = window
+        self._clock = clock
+        self._events = deque()
+        self._total = 0
+        self.count = 0
+
+    def add(self, n):
+        now = self._clock()
+        self.count += n
+        self._events.append((now, n))
+        self._total += n
+        while now - self._events[0][0] > self.window:
+            self._total -= self._events.popleft()[1]
+
+    @property
+    def rate(self):
+        if len(self._events) < 2:
+            return 0.0
+        span = self._events[-1][0] - self._events[0][0]
+        return (self._total - self._events[0][1]) / span if span > 0 else 0.0
+
+
+class TelemetrySource:
+    name = "source"
+
+    def __init__(self):
+        self.meter = RateMeter()
+        self.backlog = 0
+
+    def read(self, max_samples=256):
+        raise NotImplementedError
+
+    @property
+    def samples_per_sec(self):
+        return self.meter.rate
+
+    def stats(self):
+        return {'source': self.name, 'samples_per_sec': self.samples_per_sec,
+                'backlog': self.backlog, 'total': self.meter.count}
+
+    def close(self):
+        pass
+
+
+class RandomSource(TelemetrySource):
+    """Simulated vitals at ``hz`` samples per second of wall time."""
+
+    name = "simulator"
+
+    def __init__(self, hz=50, seed=None, clock=time.perf_counter):
+        super().__init__()
+        self.hz = hz
+        self.rng = make_rng(seed)
+        self._clock = clock
+        self._start = clock()
+        self._emitted = 0
+
+    def read(self, max_samples=256):
+        due = int((self._clock() - self._start) * self.hz) - self._emitted + 1
+        n = max(0, min(due, max_samples))
+        self.backlog = max(0, due - n)
+        self._emitted += n
+        self.meter.add(n)
+        return generate_batch(n, self.rng) if n else empty_batch()
+
+
+class PushSource(TelemetrySource):
+    """Samples pushed in by the caller rather than pulled from a device.
+
+    ``push`` checks and converts its rows at once (see ``check_row``), so
+    malformed or out-of-range input raises ``ValueError`` in the caller (and
+    can be reported to the sender) and nothing of that push is queued.  At most ``capacity`` samples
+    wait to be read; beyond that the oldest are dropped and counted.
+    """
+
+    name = "push"
+
+    def __init__(self, capacity=65536):
+        super().__init__()
+        self.capacity = capacity
+        self._pending = deque()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def push(self, rows):
+        """Queue dict rows (or one dict); returns the number of samples accepted.
+
+        Raises ``ValueError`` if any row is malformed.
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        batch = rows_to_batch(rows)
+        n = batch_len(batch)
+        if n == 0:
+            return 0
+        with self._lock:
+            self._pending.append(batch)
+            self.backlog += n
+            while self.backlog > self.capacity:
+                oldest = self._pending.popleft()
+                self.backlog -= batch_len(oldest)
+                self.dropped += batch_len(oldest)
+        return n
+
+    def read(self, max_samples=256):
+        parts = []
+        taken = 0
+        with self._lock:
+            while self._pending and taken < max_samples:
+                batch = self._pending.popleft()
+                n = batch_len(batch)
+                if taken + n > max_samples:
+                    split = max_samples - taken
+                    self._pending.appendleft({name: column[split:] for name, column in batch.items()})
+                    batch = {name: column[:split] for name, column in batch.items()}
+                    n = split
+                parts.append(batch)
+                taken += n
+            self.backlog -= taken
+        self.meter.add(taken)
+        if not parts:
+            return empty_batch()
+        if len(parts) == 1:
+            return parts[0]
+        return {name: np.concatenate([part[name] for part in parts]) for name in _DTYPES}
+
+    def stats(self):
+        return dict(super().stats(), dropped=self.dropped)
+
+
+class ReplaySource(TelemetrySource):
+    """Replays a recorded CSV/Parquet log.
+
+    The file holds the ``COLUMNS`` of a batch (levels as names or codes) and
+    optionally a ``t`` column of seconds; without it rows are spaced at
+    ``hz``.  ``speed`` scales playback (2.0 = twice real time).  Rows that
+    ``check_row`` would reject (unknown levels, missing, non-finite or
+    out-of-range values) are dropped at load time and counted in ``malformed``.
+    """
+
+    name = "replay"
+
+    def __init__(self, path, speed=1.0, hz=1.0, loop=False, clock=time.perf_counter):
+        import pandas as pd
+
+        super().__init__()
+        path = str(path)
+        frame = pd.read_parquet(path) if path.endswith('.parquet') else pd.read_csv(path)
+        values = {}
+        valid = np.ones(len(frame), dtype=bool)
+        for name, dtype in _DTYPES.items():
+            column = frame[name]
+            if name in RISK_PROBS and not pd.api.types.is_numeric_dtype(column):
+                column = column.map(lambda value: LEVEL_CODES.get(value, value))
+            column = pd.to_numeric(column, errors='coerce').to_numpy(dtype=np.float64)
+            with np.errstate(invalid='ignore'):
+                valid &= np.isfinite(column)
+                if name in RISK_PROBS:
+                    valid &= (column >= 0) & (column < len(LEVELS)) & (column == np.round(column))
+                elif np.issubdtype(dtype, np.integer):
+                    column = np.round(column)
+                    limits = np.iinfo(dtype)
+                    valid &= (column >= limits.min) & (column <= limits.max)
+            values[name] = column
+        if 't' in frame:
+            t = pd.to_numeric(frame['t'], errors='coerce').to_numpy(dtype=np.float64)
+            valid &= np.isfinite(t)
+        self.malformed = int(len(frame) - valid.sum())
+        self.columns = {name: values[name][valid].astype(dtype) for name, dtype in _DTYPES.items()}
+        if 't' in frame:
+            t = t[valid]
+            self.offsets = t - t[0] if len(t) else t
+        else:
+            self.offsets = np.arange(int(valid.sum()), dtype=np.float64) / hz
+        self.duration = float(self.offsets[-1]) if len(self.offsets) else 0.0
+        self.speed = speed
+        self.loop = loop
+        self._clock = clock
+        self._start = clock()
+        self._pos = 0
+        self._cycle = 0
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def read(self, max_samples=256):
+        elapsed = (self._clock() - self._start) * self.speed
+        if self.loop and self.duration > 0:
+            cycle = int(elapsed // (self.duration + 1e-9))
+            if cycle > self._cycle:
+                self._cycle, self._pos = cycle, 0
+            elapsed -= cycle * self.duration
+        due = int(np.searchsorted(self.offsets, elapsed, side='right'))
+        end = min(due, self._pos + max_samples)
+        batch = {name: column[self._pos:end] for name, column in self.columns.items()}
+        self.backlog = due - end
+        self.meter.add(end - self._pos)
+        self._pos = end
+        return batch
+
+    @property
+    def finished(self):
+        return not self.loop and self._pos >= len(self.offsets)
+
+    def stats(self):
+        return dict(super().stats(), malformed=self.malformed)
+
+
+class UdpSource(TelemetrySource):
+    """Non-blocking UDP listener for JSON datagrams.
+
+    Each datagram is one sample object or a list of them, keyed by the
+    ``COLUMNS`` names.  Malformed datagrams and samples (see ``check_row``)
+    are counted and dropped; the valid samples of a datagram are kept.
+    """
+
+    name = "udp"
+
+    def __init__(self, host="127.0.0.1", port=9870, bufsize=65535):
+        super().__init__()
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+        self.sock.bind((host, port))
+        self.address = self.sock.getsockname()
+        self.bufsize = bufsize
+        self._pending = deque()
+        self.malformed = 0
+
+    def _drain(self, limit):
+        while len(self._pending) < limit:
+            try:
+                payload = self.sock.recv(self.bufsize)
+            except (BlockingIOError, InterruptedError):
+                return
+            try:
+                message = json.loads(payload)
+            except ValueError:
+                self.malformed += 1
+                continue
+            self._pending.extend(message if isinstance(message, list) else [message])
+
+    def read(self, max_samples=256):
+        self._drain(max_samples)
+        rows = [self._pending.popleft() for _ in range(min(max_samples, len(self._pending)))]
+        batch, malformed = valid_rows_to_batch(rows)
+        self.malformed += malformed
+        self.backlog = len(self._pending)
+        self.meter.add(batch_len(batch))
+        return batch
+
+    def close(self):
+        self.sock.close()
+
+
+class WebSocketSource(TelemetrySource):
+    """JSON samples from a WebSocket endpoint, received on a background thread.
+
+    The receiver fills a bounded queue; ``read`` drains it without blocking.
+    When the queue is full the oldest samples are dropped and counted;
+    malformed messages and samples are counted in ``malformed``.  A failed or
+    lost connection is kept in ``error`` and retried after a delay that doubles
+    from ``min_retry`` up to ``max_retry`` seconds; ``error`` is cleared once
+    a connection is made.
+    """
+
+    name = "websocket"
+
+    def __init__(self, url="ws://127.0.0.1:8765", max_pending=10_000, min_retry=0.5, max_retry=30.0):
+        try:
+            import websockets  # noqa: F401
+        except ImportError as exc:
+            raise ImportError("WebSocketSource requires the 'websockets' package") from exc
+        super().__init__()
+        self.url = url
+        self._pending = deque(maxlen=max_pending)
+        self._lock = threading.Lock()
+        self.dropped = 0
+        self.malformed = 0
+        self.error = None
+        self.connected = False
+        self.reconnects = 0
+        self.min_retry = min_retry
+        self.max_retry = max_retry
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="websocket-source", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        import asyncio
+
+        import websockets
+
+        delay = self.min_retry
+
+        async def receive():
+            nonlocal delay
+            async with websockets.connect(self.url) as ws:
+                self.error = None
+                self.connected = True
+                delay = self.min_retry
+                async for payload in ws:
+                    if self._stop.is_set():
+                        return
+                    try:
+                        message = json.loads(payload)
+                    except ValueError:
+                        self.malformed += 1
+                        continue
+                    rows = message if isinstance(message, list) else [message]
+                    with self._lock:
+                        overflow = len(self._pending) + len(rows) - self._pending.maxlen
+                        if overflow > 0:
+                            self.dropped += overflow
+                        self._pending.extend(rows)
+
+        while not self._stop.is_set():
+            try:
+                asyncio.run(receive())
+            except Exception as exc:
+                self.error = exc
+            self.connected = False
+            if self._stop.wait(delay):
+                return
+            delay = min(delay * 2, self.max_retry)
+            self.reconnects += 1
+
+    def read(self, max_samples=256):
+        with self._lock:
+            rows = [self._pending.popleft() for _ in range(min(max_samples, len(self._pending)))]
+            self.backlog = len(self._pending)
+        batch, malformed = valid_rows_to_batch(rows)
+        self.malformed += malformed
+        self.meter.add(batch_len(batch))
+        return batch
+
+    def stats(self):
+        return dict(super().stats(), connected=self.connected, reconnects=self.reconnects,
+                    error=None if self.error is None else str(self.error),
+                    dropped=self.dropped, malformed=self.malformed)
+
+    def close(self):
+        self._stop.set()
@@ -0,0 +1,120 @@
+"""Tick pacing for the continuous monitoring loop and risk-adaptive sampling."""
+import time
+from collections import deque
+
+import numpy as np
+
+
+class TickClock:
+    """Paces a loop at ``hz`` ticks per second and measures the achieved rate.
+
+    Deadlines advance by a fixed period so sleep jitter does not accumulate.
+    If a tick overruns by more than a full period the schedule is reset
+    rather than bursting to catch up, which would only flood the browser.
+    """
+
+    def __init__(self, hz, window=1.0, clock=time.perf_counter, sleep=time.sleep):
+        self.target_hz = float(hz)
+        self.period = 1.0 / self.target_hz
+        self.window = window
+        self._clock = clock
+        self._sleep = sleep
+        self._next = clock() + self.period
+        self._ticks = deque()
+        self.missed = 0
+
+    def set_hz(self, hz):
+        """Change the rate; a faster rate takes effect from the current tick."""
+        if hz == self.target_hz:
+            return
+        self.target_hz = float(hz)
+        self.period = 1.0 / self.target_hz
+        if self._ticks:
+            self._next = min(self._next, self._ticks[-1] + self.period)
+
+    def wait(self):
+        now = self._clock()
+        delay = self._next - now
+        if delay > 0:
+            self._sleep(delay)
+            now = self._clock()
+            self._next += self.period
+        elif -delay > self.period:
+            self.missed += int(-delay // self.period)
+            self._next = now + self.period
+        else:
+            self._next += self.period
+
+        self._ticks.append(now)
+        while now - self._ticks[0] > self.window:
+            self._ticks.popleft()
+        return now
+
+    @property
+    def achieved_hz(self):
+        if len(self._ticks) < 2:
+            return 0.0
+        span = self._ticks[-1] - self._ticks[0]
+        return (len(self._ticks) - 1) / span if span > 0 else 0.0
+
+    @property
+    def keeping_up(self):
+        return self.achieved_hz >= 0.95 * self.target_hz
+
+
+class AdaptiveScheduler:
+    """Per-driver sampling intervals that follow the worst of the three risk levels.
+
+    High and Critical drivers are sampled at ``base_hz`` and Moderate ones at
+    half of it, never slower than idle.  A driver that has been Low on all
+    three risks for ``calm_after`` seconds drops to ``idle_hz``.  Any reading
+    above Low puts the driver back on the faster rate on the sample where it
+    is seen.  The idle and Moderate intervals are capped at ``max_latency``,
+    so a transition to Critical is always picked up within ``max_latency``
+    seconds, at most one tick late.
+    """
+
+    def __init__(self, n, base_hz, idle_hz=1.0, calm_after=5.0, max_latency=1.0):
+        self.n = n
+        self.base_period = 1.0 / base_hz
+        self.idle_period = max(min(1.0 / idle_hz, max_latency), self.base_period)
+        # Never slower than idle, so the max_latency bound holds for Moderate too
+        self.moderate_period = min(2.0 / base_hz, self.idle_period)
+        self.calm_after = calm_after
+        self.max_latency = max_latency
+        self.interval = np.full(n, self.base_period)
+        self.next_due = np.zeros(n)
+        self.calm_since = np.full(n, np.nan)
+
+    def due(self, now):
+        """Indices of the drivers to sample at ``now``."""
+        return np.flatnonzero(self.next_due <= now)
+
+    def update(self, rows, worst, now):
+        """Reschedule ``rows`` after sampling them; ``worst`` is their worst level code."""
+        worst = np.asarray(worst)
+        calm = worst == 0
+        since = self.calm_since[rows]
+        since = np.where(calm, np.where(np.isnan(since), now, since), np.nan)
+        self.calm_since[rows] = since
+        idle = calm & (now - since >= self.calm_after)
+        interval = np.where(
+            idle, self.idle_period, np.where(worst == 1, self.moderate_period, self.base_period)
+        )
+        self.interval[rows] = interval
+        self.next_due[rows] = now + interval
+
+    def escalate(self, rows):
+        """Make ``rows`` due at once, e.g. on an out-of-band alert."""
+        self.next_due[rows] = 0.0
+        self.calm_since[rows] = np.nan
+
+    @property
+    def effective_hz(self):
+        """Samples per second across all drivers at the current intervals."""
+        return float((1.0 / self.interval).sum())
+
+    @property
+    def full_rate(self):
+        """Drivers currently sampled at the base rate."""
+        return int((self.interval <= self.base_period).sum())
@@ -0,0 +1,142 @@
+"""Columnar telemetry generation.
+
+``generate_batch`` draws N samples at once with the same distributions as the
+dashboard's ``generate_fake_data`` but returns one NumPy array per field, with
+risk levels as small integer codes and blood pressure split into numeric
+systolic/diastolic columns.  A single sample travels through the pipeline
+as a ``Sample`` named tuple of plain numbers in the same layout; the display
+dict with its long human-readable keys is only built at the edge with
+``to_display`` (or ``to_record`` straight from a batch).
+"""
+from collections import namedtuple
+
+import numpy as np
+
+LEVELS = ['Low', 'Moderate', 'High', 'Critical']
+LEVEL_CODES = {level: code for code, level in enumerate(LEVELS)}
+
+# Display keys used by the dashboard, in card order
+RISK_KEYS = ['Stress Level', 'Fatigue Risk', 'Health Crisis Risk']
+
+# Column name -> (low, high) for the integer vitals, high exclusive as in np.random.randint
+VITAL_RANGES = {
+    'heart_rate': (60, 110),
+    'hrv': (20, 80),
+    'spo2': (90, 100),
+    'bp_systolic': (90, 140),
+    'bp_diastolic': (60, 90),
+    'blood_sugar': (70, 140),
+    'body_temp': (35, 40),
+}
+
+STRESS_PROBS = np.array([0.25, 0.25, 0.25, 0.25])
+FATIGUE_PROBS = np.array([0.5, 0.3, 0.15, 0.05])
+HEALTH_CRISIS_PROBS = np.array([0.57, 0.23, 0.1, 0.1])
+HEALTH_CRISIS_PROBS = HEALTH_CRISIS_PROBS / HEALTH_CRISIS_PROBS.sum()
+
+# Column name -> level probabilities for the risk columns
+RISK_PROBS = {
+    'stress': STRESS_PROBS,
+    'fatigue': FATIGUE_PROBS,
+    'health': HEALTH_CRISIS_PROBS,
+}
+
+COLUMNS = list(VITAL_RANGES) + list(RISK_PROBS)
+
+# One sample, fields in ``COLUMNS`` order; risk levels are ``LEVELS`` indices
+Sample = namedtuple('Sample', COLUMNS)
+
+
+def make_rng(seed=None):
+    return np.random.default_rng(seed)
+
+
+def _draw_levels(rng, probs, n):
+    # Inverse-CDF sampling: one uniform draw and a searchsorted per column,
+    # much cheaper than rng.choice with p= for large n.
+    cdf = np.cumsum(probs)
+    cdf[-1] = 1.0
+    return np.searchsorted(cdf, rng.random(n), side='right').astype(np.int8)
+
+
+def generate_batch(n, rng=None):
+    """Return ``n`` samples as a dict of column name -> NumPy array."""
+    if rng is None:
+        rng = make_rng()
+    batch = {
+        name: rng.integers(low, high, size=n, dtype=np.int16)
+        for name, (low, high) in VITAL_RANGES.items()
+    }
+    for name, probs in RISK_PROBS.items():
+        batch[name] = _draw_levels(rng, probs, n)
+    return batch
+
+
+def batch_to_frame(batch):
+    import pandas as pd
+
+    return pd.DataFrame(batch, columns=COLUMNS)
+
+
+def to_sample(batch, i=0):
+    """Row ``i`` of a batch as a ``Sample`` of Python numbers."""
+    return Sample._make([batch[name][i].item() for name in COLUMNS])
+
+
+def to_display(sample):
+    """The dashboard's display dict for a ``Sample``."""
+    return {
+        'Heart Rate (bpm)': sample.heart_rate,
+        'HRV (ms)': sample.hrv,
+        'SpO2 (%)': sample.spo2,
+        'Blood Pressure (mmHg)': f"{sample.bp_systolic}/{sample.bp_diastolic}",
+        'Blood Sugar (mg/dL)': sample.blood_sugar,
+        'Body Temperature': sample.body_temp,
+        'Stress Level': LEVELS[sample.stress],
+        'Fatigue Risk': LEVELS[sample.fatigue],
+        'Health Crisis Risk': LEVELS[sample.health],
+    }
+
+
+def to_record(batch, i=0):
+    """Build the dashboard's display dict for row ``i`` of a batch."""
+    return {
+        'Heart Rate (bpm)': int(batch['heart_rate'][i]),
+        'HRV (ms)': int(batch['hrv'][i]),
+        'SpO2 (%)': int(batch['spo2'][i]),
+        'Blood Pressure (mmHg)': f"{batch['bp_systolic'][i]}/{batch['bp_diastolic'][i]}",
+        'Blood Sugar (mg/dL)': int(batch['blood_sugar'][i]),
+        'Body Temperature': batch['body_temp'][i].item(),
+        'Stress Level': LEVELS[batch['stress'][i]],
+        'Fatigue Risk': LEVELS[batch['fatigue'][i]],
+        'Health Crisis Risk': LEVELS[batch['health'][i]],
+    }
+
+
+class BatchSampler:
+    """Hands out samples one at a time from a pre-generated batch."""
+
+    def __init__(self, batch_size=1024, seed=None):
+        self.batch_size = batch_size
+        self.rng = make_rng(seed)
+        self._batch = None
+        self._samples = None
+        self._pos = batch_size
+
+    def _advance(self):
+        if self._pos >= self.batch_size:
+            self._batch = generate_batch(self.batch_size, self.rng)
+            self._samples = None
+            self._pos = 0
+        self._pos += 1
+        return self._batch, self._pos - 1
+
+    def next_sample(self):
+        batch, i = self._advance()
+        if self._samples is None:
+            # One tolist() per column is far cheaper than ten scalar reads per row
+            self._samples = list(map(Sample._make, zip(*(batch[name].tolist() for name in COLUMNS))))
+        return self._samples[i]
+
+    def next_record(self):
+        return to_record(*self._advance())
@@ -0,0 +1,66 @@
+"""Static page styling, built once per process instead of on every rerun."""
+
+DASHBOARD_CSS = """
+    <style>
+        .main { background-color: #3a3a3a; color: black; }
+        .stAlert { font-size: 16px; }
+        .stButton>button { border-radius: 8px; padding: 10px; background: #007bff; color: white; border: none; }
+        .stDataFrame { background-color: white; color: black; border-radius: 10px; padding: 10px; }
+        .stSidebar { background: #e9ecef; }
+        .dashboard-container { display: flex; justify-content: space-between; padding: 10px; gap: 20px; }
+        .dashboard-box { 
+            flex: 1; 
+            padding: 20px; 
+            border-radius: 10px; 
+            background: #ffffff; 
+            margin: 10px; 
+            border: 2px solid #ced4da; 
+            text-align: left;
+            transition: transform 0.2s ease;
+        }
+        .dashboard-box:hover { transform: translateY(-3px); }
+        .action-box { border-left: 4px solid #004085; }
+        .notification-box { border-left: 4px solid #dc3545; }
+        .panel-head { margin-bottom: 0; padding-bottom: 0; border-bottom: none; border-radius: 10px 10px 0 0; }
+        .panel-item { margin-top: -1rem; margin-bottom: 0; padding-top: 0; padding-bottom: 0; border-top: none; border-bottom: none; border-radius: 0; }
+        .panel-head:hover, .panel-item:hover { transform: none; }
+        .alert-title { 
+            font-weight: bold; 
+            font-size: 22px; 
+            margin-bottom: 15px; 
+            text-align: left;
+            display: flex;
+            align-items: center;
+            gap: 10px;
+        }
+        .status-item { margin-bottom: 15px; }
+        .status-indicator { font-size: 18px; margin-right: 8px; }
+        .metric-header { 
+            font-size: 18px !important; 
+            margin: 0 0 12px 0 !important; 
+            color: #2c3e50; 
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }
+        .status-text { margin-left: 28px; }
+
+        /* Multiselect Color Coding */
+        div[data-baseweb="select"] [aria-selected="true"] {
+            background-color: #28a745 !important;
+            color: white !important;
+        }
+        div[data-baseweb="select"] [aria-selected="true"][title*="Moderate"] {
+            background-color: #90EE90 !important;
+            color: #2c3e50 !important;
+        }
+        div[data-baseweb="select"] [aria-selected="true"][title*="High"] {
+            background-color: #FFA500 !important;
+            color: white !important;
+        }
+        div[data-baseweb="select"] [aria-selected="true"][title*="Critical"] {
+            background-color: #dc3545 !important;
+            color: white !important;
+        }
+    </style>
+"""
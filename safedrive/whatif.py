@@ -0,0 +1,153 @@
+"""Offline what-if evaluation of action policies.
+
+A candidate per-level action configuration is scored against recorded or
+generated samples in one vectorized pass per chunk: ``RuleTable.action_counts``
+turns each chunk's level histogram into per-action firing counts, so millions
+of samples take seconds instead of a tick-by-tick replay.  The candidate is
+compared side by side with the current policy on the same samples.
+
+Counts are raw firings, one per sample whose level selects the action, before
+the alert engine's dwell times and cooldowns.  Generated samples get their
+levels from a ``RiskEngine`` by default, like the live pipeline with "Derive
+Risk Levels From Vitals" on; the simulator's raw levels fire far more often.
+
+Run as a script to compare two JSON configurations:
+
+    python -m safedrive.whatif --candidate candidate.json --recording recordings/session-20250101.sdsrec
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from safedrive.risk import RiskEngine
+from safedrive.rules import ACTIONS, CATEGORIES, DEFAULT_ACTIONS, RuleTable
+from safedrive.telemetry import generate_batch, make_rng
+
+CHUNK_SIZE = 1_000_000
+# Vehicles per generated tick when risk is derived
+DRIVERS = 1000
+
+
+def generated_batches(n, seed=None, chunk=CHUNK_SIZE, derive_risk=True, drivers=DRIVERS):
+    """``n`` generated samples, in chunks of at most ``chunk``.
+
+    With ``derive_risk`` the samples are generated as ticks of ``drivers``
+    vehicles and scored by a ``RiskEngine``, as ``simulator`` does, after one
+    window of warm-up ticks that are not counted.
+    """
+    rng = make_rng(seed)
+    if not derive_risk:
+        for start in range(0, n, chunk):
+            yield generate_batch(min(chunk, n - start), rng)
+        return
+    risk = RiskEngine(drivers)
+    for _ in range(risk.window):
+        risk.update(generate_batch(drivers, rng))
+    for start in range(0, n, chunk):
+        size = min(chunk, n - start)
+        ticks = [risk.apply(generate_batch(drivers, rng)) for _ in range(-(-size // drivers))]
+        yield {name: np.concatenate([tick[name] for tick in ticks])[:size] for name in ticks[0]}
+
+
+def recording_batches(reader, chunk=CHUNK_SIZE):
+    """Every record of a ``RecordingReader``, unpacked in chunks."""
+    for start in range(0, len(reader), chunk):
+        yield reader.unpack(reader.records[start:start + chunk])
+
+
+def evaluate(batches, configs):
+    """Firing counts of every configuration over the same samples.
+
+    ``configs`` maps a name to an action configuration.  Returns
+    ``{'samples': n, 'seconds': elapsed, 'counts': {name: {category: int array (len(ACTIONS),)}}}``.
+    """
+    started = time.perf_counter()
+    tables = {name: RuleTable(config) for name, config in configs.items()}
+    counts = {
+        name: {category: np.zeros(len(ACTIONS), dtype=np.int64) for category, _, _, _ in CATEGORIES}
+        for name in configs
+    }
+    n = 0
+    for batch in batches:
+        n += len(batch[CATEGORIES[0][3]])
+        for name, table in tables.items():
+            for category, fired in table.action_counts(batch).items():
+                counts[name][category] += fired
+    return {'samples': n, 'seconds': time.perf_counter() - started, 'counts': counts}
+
+
+def comparison_rows(result, current='current', candidate='candidate', hz=None):
+    """One row per (category, action) fired by either policy, side by side.
+
+    Rates are percent of samples, and firings per hour when the sample rate
+    ``hz`` is known.
+    """
+    n = max(result['samples'], 1)
+    rows = []
+    for category, _, _, _ in CATEGORIES:
+        before = result['counts'][current][category]
+        after = result['counts'][candidate][category]
+        for a, action in enumerate(ACTIONS):
+            if not before[a] and not after[a]:
+                continue
+            row = {
+                'Category': category,
+                'Action': action,
+                'Current': int(before[a]),
+                'Candidate': int(after[a]),
+                'Change': int(after[a] - before[a]),
+                'Current %': round(100.0 * before[a] / n, 3),
+                'Candidate %': round(100.0 * after[a] / n, 3),
+            }
+            if hz:
+                row['Current /h'] = round(before[a] / n * hz * 3600, 1)
+                row['Candidate /h'] = round(after[a] / n * hz * 3600, 1)
+            rows.append(row)
+    return rows
+
+
+def recording_hz(reader):
+    """Mean sample rate of a recording, or ``None`` if it spans no time."""
+    if len(reader) < 2:
+        return None
+    span = (int(reader.records['t_ms'][-1]) - int(reader.records['t_ms'][0])) / 1000
+    return (len(reader) - 1) / span if span > 0 else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare action policies on recorded or generated samples")
+    parser.add_argument('--candidate', required=True, help="JSON action configuration to evaluate")
+    parser.add_argument('--current', default=None, help="JSON action configuration (default: dashboard defaults)")
+    parser.add_argument('--recording', default=None, help="recording to replay (default: generated samples)")
+    parser.add_argument('--samples', type=int, default=10_000_000, help="generated samples")
+    parser.add_argument('--hz', type=float, default=None, help="sample rate for per-hour figures")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--raw-levels', action='store_true', help="use generated levels instead of RiskEngine")
+    parser.add_argument('--drivers', type=int, default=DRIVERS, help="vehicles per generated tick")
+    args = parser.parse_args(argv)
+
+    configs = {'current': DEFAULT_ACTIONS}
+    if args.current:
+        with open(args.current) as f:
+            configs['current'] = json.load(f)
+    with open(args.candidate) as f:
+        configs['candidate'] = json.load(f)
+
+    hz = args.hz
+    if args.recording:
+        from safedrive.recording import RecordingReader
+
+        reader = RecordingReader(args.recording)
+        hz = hz or recording_hz(reader)
+        result = evaluate(recording_batches(reader), configs)
+    else:
+        batches = generated_batches(args.samples, args.seed, derive_risk=not args.raw_levels, drivers=args.drivers)
+        result = evaluate(batches, configs)
+    print(f"{result['samples']:,} samples in {result['seconds']:.2f} s")
+    print(json.dumps(comparison_rows(result, hz=hz), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+from safedrive.alerts import AlertEngine
+from safedrive.events import EventBus, LevelChange
+from safedrive.telemetry import Sample
+
+SAMPLE = Sample(72, 55, 97, 120, 80, 95, 36.6, 0, 0, 0)
+
+
+def stress(engine, level, now):
+    return engine.observe(SAMPLE._replace(stress=level), now).stress
+
+
+def test_escalation_waits_for_the_dwell_time():
+    engine = AlertEngine(escalate_dwell=1.0)
+    assert stress(engine, 0, 0.0) == 0
+    assert stress(engine, 2, 0.5) == 0
+    # Dropping back to the active level restarts the dwell
+    assert stress(engine, 0, 0.8) == 0
+    assert stress(engine, 2, 1.0) == 0
+    assert stress(engine, 2, 1.9) == 0
+    assert stress(engine, 2, 2.0) == 2
+    assert engine.stats()['Stress']['held'] == 3
+    assert engine.stats()['Fatigue']['held'] == 0
+
+
+def test_release_needs_the_longer_dwell_below_the_active_level():
+    engine = AlertEngine(escalate_dwell=1.0, release_dwell=5.0)
+    stress(engine, 0, 0.0)
+    stress(engine, 2, 0.0)
+    assert stress(engine, 2, 1.0) == 2
+    assert stress(engine, 1, 10.0) == 2
+    assert stress(engine, 0, 14.9) == 2
+    # A sample back at the active level restarts the release
+    assert stress(engine, 2, 15.0) == 2
+    assert stress(engine, 1, 16.0) == 2
+    assert stress(engine, 1, 20.9) == 2
+    assert stress(engine, 1, 21.0) == 1
+
+
+def test_critical_escalates_at_once_and_is_published_once():
+    bus = EventBus()
+    events = bus.subscribe("test", (LevelChange,), maxsize=16)
+    engine = AlertEngine(escalate_dwell=1.0, release_dwell=5.0, bus=bus)
+    try:
+        engine.observe(SAMPLE, 0.0, seq=0)
+        assert engine.observe(SAMPLE._replace(health=3), 0.01, seq=1).health == 3
+        assert engine.observe(SAMPLE._replace(health=3), 0.02, seq=2).health == 3
+        # Leaving Critical still takes the release dwell
+        assert engine.observe(SAMPLE, 1.0, seq=3).health == 3
+        assert engine.observe(SAMPLE, 6.0, seq=4).health == 0
+        changes = events.drain()
+    finally:
+        bus.close()
+    assert [(c.seq, c.category, c.previous, c.level) for c in changes] == [
+        (1, "Health Crisis", "Low", "Critical"),
+        (4, "Health Crisis", "Critical", "Low"),
+    ]
+
+
+def test_cooldown_suppresses_repeats_of_the_same_request():
+    engine = AlertEngine(cooldown=30.0)
+    assert engine.allow("Stress", "High", "Reduce Speed", 0.0)
+    assert not engine.allow("Stress", "High", "Reduce Speed", 10.0)
+    # Another level or action is a different request
+    assert engine.allow("Stress", "Critical", "Reduce Speed", 10.0)
+    assert engine.allow("Stress", "High", "Send Notification", 10.0)
+    assert not engine.allow("Stress", "High", "Reduce Speed", 29.9)
+    assert engine.allow("Stress", "High", "Reduce Speed", 30.0)
+    assert engine.stats()['Stress'] == {'emitted': 4, 'suppressed': 2, 'held': 0}
+
+
+def test_a_cooldown_decision_is_counted_once_per_sample():
+    engine = AlertEngine(cooldown=30.0)
+    for _ in range(3):
+        assert engine.allow("Fatigue", "High", "Activate Horn", 0.0, seq=7)
+    for _ in range(3):
+        assert not engine.allow("Fatigue", "High", "Activate Horn", 1.0, seq=8)
+    assert engine.stats()['Fatigue'] == {'emitted': 1, 'suppressed': 1, 'held': 0}
+    # The repeated question for seq 7 did not restart the cooldown
+    assert engine.allow("Fatigue", "High", "Activate Horn", 30.0, seq=9)
@@ -0,0 +1,45 @@
+import numpy as np
+
+from safedrive.analytics import SlidingCounts, WindowedQuantiles
+
+
+def test_buckets_expire_as_the_window_slides():
+    counts = SlidingCounts((2,), window=300.0, bucket=60.0)
+    counts.add([1, 0], now=0.0)
+    counts.add([0, 2], now=30.0)
+    counts.add([3, 0], now=61.0)
+    assert counts.sliding().tolist() == [4, 2]
+    # The last complete bucket is [0, 60)
+    assert counts.tumbling().tolist() == [1, 2]
+    assert counts.span() == 120.0
+
+    # At 300 s the first bucket has left the 5-bucket window
+    assert counts.sliding(now=300.0).tolist() == [3, 0]
+    assert counts.tumbling().tolist() == [0, 0]
+    assert counts.span() == 300.0
+    assert counts.sliding(now=360.0).tolist() == [0, 0]
+
+    counts.add([5, 5], now=400.0)
+    # A late arrival is counted in the newest bucket
+    counts.add([1, 0], now=10.0)
+    assert counts.sliding().tolist() == [6, 5]
+    assert counts.tumbling(now=420.0).tolist() == [6, 5]
+    assert counts.sliding(now=10_000.0).tolist() == [0, 0]
+
+
+def test_quantiles_are_exact_at_unit_resolution():
+    sketch = WindowedQuantiles(0, 256, n_groups=2, window=900.0, bucket=60.0)
+    sketch.add(np.arange(1, 101), now=0.0)
+    sketch.add([200, 210, 300], now=30.0, groups=[1, 1, 1])
+    assert sketch.quantile(0.5, group=0) == 50
+    assert sketch.quantile(0.95, group=0) == 95
+    assert sketch.quantile(0.0, group=0) == 1
+    # Values above the histogram are clipped into its last bin
+    assert sketch.quantile(1.0, group=1) == 255
+    assert sketch.quantile(0.5) == 52
+
+    sketch.add([120] * 100, now=600.0)
+    assert sketch.quantile(0.75, group=0) == 120
+    # Once the first minute leaves the 15-minute window only the later values remain
+    assert sketch.quantile(0.0, group=0, now=900.0) == 120
+    assert sketch.quantile(0.5, group=1) is None
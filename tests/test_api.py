@@ -0,0 +1,274 @@
+import asyncio
+import json
+import os
+import struct
+import time
+
+import pytest
+
+from safedrive.api import BINARY, CLOSE, CONTINUATION, PING, PONG, TEXT, ApiServer, HttpError, read_frame, ws_accept, ws_frame
+from safedrive.engine import MonitoringEngine
+from safedrive.events import ActionsDispatched
+from safedrive.rules import CATEGORIES
+from safedrive.sources import PushSource, RandomSource
+from safedrive.telemetry import LEVELS
+
+SAMPLE = {
+    'heart_rate': 72, 'hrv': 55, 'spo2': 97, 'bp_systolic': 120, 'bp_diastolic': 80,
+    'blood_sugar': 95, 'body_temp': 36.6, 'stress': 'Low', 'fatigue': 1, 'health': 0,
+}
+
+
+def client_frame(payload, opcode=TEXT, fin=True, mask=b"\x01\x02\x03\x04"):
+    """A masked client frame, as a browser would send it."""
+    n = len(payload)
+    first = (0x80 if fin else 0) | opcode
+    if n < 126:
+        head = struct.pack('!BB', first, 0x80 | n)
+    elif n < 1 << 16:
+        head = struct.pack('!BBH', first, 0x80 | 126, n)
+    else:
+        head = struct.pack('!BBQ', first, 0x80 | 127, n)
+    masked = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return head + mask + masked
+
+
+async def parse(data, limit=1 << 20):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return await read_frame(reader, limit)
+
+
+@pytest.fixture
+def engine():
+    engine = MonitoringEngine(hz=100)
+    yield engine
+    engine.close()
+
+
+@pytest.fixture
+def server(engine):
+    return ApiServer(engine, port=0)
+
+
+# WebSocket framing
+
+def test_ws_accept_matches_rfc_example():
+    assert ws_accept("dGhlIHNhbXBsZSBub25jZQ==") == "s3pPLMBiTxaQ9kYGzzhZRbK+xOo="
+
+
+@pytest.mark.parametrize('size', [0, 5, 125, 126, 65535, 65536, 70000])
+def test_server_frame_round_trips(size):
+    payload = os.urandom(size)
+    frame = ws_frame(payload, BINARY)
+    assert frame[0] == 0x80 | BINARY and not frame[1] & 0x80
+    assert asyncio.run(parse(frame)) == (True, BINARY, payload)
+
+
+@pytest.mark.parametrize('size', [3, 126, 70000])
+def test_masked_client_frame_is_unmasked(size):
+    payload = os.urandom(size)
+    assert asyncio.run(parse(client_frame(payload, mask=os.urandom(4)))) == (True, TEXT, payload)
+
+
+def test_continuation_frame_is_not_final():
+    assert asyncio.run(parse(client_frame(b"abc", CONTINUATION, fin=False))) == (False, CONTINUATION, b"abc")
+
+
+def test_oversized_frame_is_rejected_before_reading_payload():
+    with pytest.raises(HttpError) as exc:
+        asyncio.run(parse(ws_frame(b"x" * 200), limit=100))
+    assert exc.value.status == 413
+
+
+# HTTP ingest
+
+def ingest(server, payload):
+    return server._route('POST', '/ingest', json.dumps(payload).encode())
+
+
+def test_ingest_accepts_samples(server, engine):
+    assert ingest(server, SAMPLE) == (202, {'accepted': 1})
+    assert ingest(server, [SAMPLE, dict(SAMPLE, stress=3)]) == (202, {'accepted': 2})
+    assert engine.tick() is not None
+    status, state = server._route('GET', '/state', b"")
+    assert status == 200 and state['sample']['body_temp'] == 36.6
+
+
+@pytest.mark.parametrize('bad', [
+    {'stress': 7}, {'stress': -1}, {'fatigue': 'Extreme'}, {'health': 1.5},
+    {'heart_rate': 40000}, {'spo2': 'high'}, {'body_temp': None}, {'hrv': True},
+])
+def test_ingest_rejects_out_of_range_or_malformed_rows(server, engine, bad):
+    status, payload = ingest(server, [SAMPLE, dict(SAMPLE, **bad)])
+    assert status == 400 and 'error' in payload
+    # Nothing of a rejected push is queued, and the engine keeps running
+    assert engine.source.backlog == 0
+    ingest(server, SAMPLE)
+    assert engine.tick() is not None
+    assert server._route('GET', '/state', b"")[0] == 200
+
+
+def test_every_row_of_an_ingested_list_is_dispatched():
+    config = {category: {level: [] for level in LEVELS} for _, _, category, _ in CATEGORIES}
+    config['stress']['Critical'] = ["Reduce Speed"]
+    engine = MonitoringEngine(config)
+    events = engine.subscribe("test", (ActionsDispatched,), maxsize=16)
+    try:
+        engine.ingest([SAMPLE, dict(SAMPLE, stress='Critical'), SAMPLE])
+        assert engine.tick().seq == 2
+        dispatched = events.drain()
+        assert [event.seq for event in dispatched] == [0, 1, 2]
+        assert [(r.category, r.level, r.action) for r in dispatched[1].requests] == [
+            ("Stress", "Critical", "Reduce Speed")
+        ]
+        assert engine.stats()['dispatched'] == 3
+    finally:
+        engine.close()
+
+
+def test_rows_pushed_between_ticks_are_all_dispatched(engine):
+    for _ in range(5):
+        engine.ingest(SAMPLE)
+    engine.tick()
+    engine.ingest([SAMPLE] * 3)
+    # The feed polls its source at most once per period
+    time.sleep(engine.feed.period)
+    assert engine.tick().seq == 7
+    assert engine.stats()['dispatched'] == 8 and engine.stats()['missed'] == 0
+
+
+def test_ingest_rejects_missing_fields_and_bad_json(server):
+    row = dict(SAMPLE)
+    del row['spo2']
+    assert ingest(server, row)[0] == 400
+    assert ingest(server, 5)[0] == 400
+    assert server._route('POST', '/ingest', b"{not json")[0] == 400
+
+
+def test_ingest_conflicts_with_a_polled_source():
+    engine = MonitoringEngine(source=RandomSource())
+    try:
+        assert ingest(ApiServer(engine, port=0), SAMPLE)[0] == 409
+    finally:
+        engine.close()
+
+
+def test_push_source_queues_nothing_when_a_row_is_bad():
+    source = PushSource()
+    with pytest.raises(ValueError):
+        source.push([SAMPLE, dict(SAMPLE, heart_rate=-40000)])
+    assert source.backlog == 0
+
+
+def test_failing_tick_is_counted_and_does_not_stop_ticking(server, engine, monkeypatch):
+    calls = []
+
+    def tick():
+        calls.append(None)
+        if len(calls) == 1:
+            raise IndexError("boom")
+
+    monkeypatch.setattr(engine, 'tick', tick)
+
+    async def run():
+        await server.start()
+        try:
+            for _ in range(100):
+                if len(calls) >= 3:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+    assert len(calls) >= 3
+    assert server.stats()['tick_errors'] == 1
+
+
+# Over a socket
+
+async def http(port, method, path, payload=None):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    body = b"" if payload is None else json.dumps(payload).encode()
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: test\r\nConnection: close\r\nContent-Length: {len(body)}\r\n\r\n".encode()
+        + body
+    )
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split(b" ")[1]), json.loads(body) if body else None
+
+
+async def upgrade(port, path):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    writer.write(
+        f"GET {path} HTTP/1.1\r\nHost: test\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+        "Sec-WebSocket-Key: dGhlIHNhbXBsZSBub25jZQ==\r\nSec-WebSocket-Version: 13\r\n\r\n".encode()
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 101") and b"s3pPLMBiTxaQ9kYGzzhZRbK+xOo=" in head
+    return reader, writer
+
+
+def test_http_ingest_then_state(server):
+    async def run():
+        await server.start()
+        try:
+            status, _ = await http(server.port, 'POST', '/ingest', dict(SAMPLE, stress=7))
+            assert status == 400
+            assert await http(server.port, 'POST', '/ingest', [SAMPLE] * 3) == (202, {'accepted': 3})
+            for _ in range(100):
+                status, state = await http(server.port, 'GET', '/state')
+                if state['seq'] is not None:
+                    break
+                await asyncio.sleep(0.01)
+            assert status == 200 and state['sample']['heart_rate'] == 72
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_websocket_ingest_reassembles_fragments_and_answers_pings(server):
+    async def run():
+        await server.start()
+        try:
+            reader, writer = await upgrade(server.port, '/ingest')
+            message = json.dumps([SAMPLE, SAMPLE]).encode()
+            writer.write(client_frame(message[:10], TEXT, fin=False))
+            # Control frames may arrive between fragments
+            writer.write(client_frame(b"hi", PING))
+            writer.write(client_frame(message[10:], CONTINUATION))
+            assert await read_frame(reader) == (True, PONG, b"hi")
+            assert json.loads((await read_frame(reader))[2]) == {'accepted': 2}
+
+            writer.write(client_frame(json.dumps(dict(SAMPLE, heart_rate=40000)).encode()))
+            assert 'error' in json.loads((await read_frame(reader))[2])
+
+            writer.write(client_frame(struct.pack('!H', 1000), CLOSE))
+            assert await read_frame(reader) == (True, CLOSE, struct.pack('!H', 1000))
+            writer.close()
+        finally:
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_websocket_subscriber_receives_samples(server):
+    async def run():
+        await server.start()
+        try:
+            reader, writer = await upgrade(server.port, '/subscribe?topics=samples')
+            await http(server.port, 'POST', '/ingest', SAMPLE)
+            fin, opcode, payload = await asyncio.wait_for(read_frame(reader), 5)
+            event = json.loads(payload)
+            assert (fin, opcode) == (True, TEXT) and event['topic'] == 'samples'
+            assert event['sample']['stress'] == 0
+            writer.close()
+        finally:
+            await server.close()
+
+    asyncio.run(run())
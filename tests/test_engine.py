@@ -0,0 +1,60 @@
+import time
+
+from safedrive.alerts import AlertEngine
+from safedrive.engine import ActionDispatcher
+from safedrive.events import EventBus
+from safedrive.producer import SharedFeed
+from safedrive.profiling import StageTimer
+from safedrive.rules import DEFAULT_ACTIONS, compile_rules
+from safedrive.sources import PushSource
+from safedrive.telemetry import COLUMNS, generate_batch, make_rng
+
+
+def rows(n, seed=0):
+    batch = generate_batch(n, make_rng(seed))
+    return [{name: batch[name][i].item() for name in COLUMNS} for i in range(n)]
+
+
+def test_dispatcher_thread_dispatches_every_sample_of_a_burst():
+    bus = EventBus()
+    source = PushSource()
+    feed = SharedFeed(hz=100, source=source)
+    dispatcher = ActionDispatcher(bus, AlertEngine(bus=bus), compile_rules(DEFAULT_ACTIONS)).start(feed)
+    try:
+        source.push(rows(300))
+        source.push(rows(200, seed=1))
+        deadline = time.monotonic() + 5
+        while dispatcher.dispatched < 500 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        dispatcher.close()
+        bus.close()
+    assert (feed.produced, dispatcher.dispatched, dispatcher.missed, dispatcher.errors) == (500, 500, 0, 0)
+    assert dispatcher.latest[0].seq == 499
+
+
+def test_dispatch_ignores_a_sample_it_has_seen():
+    bus = EventBus()
+    feed = SharedFeed(hz=100, source=PushSource())
+    feed.source.push(rows(3))
+    dispatcher = ActionDispatcher(bus, AlertEngine(bus=bus), compile_rules(DEFAULT_ACTIONS))
+    dispatcher.follow(feed)
+    assert [s.seq for s in dispatcher.poll()] == [0, 1, 2]
+    assert dispatcher.dispatch(feed.latest) is None
+    assert dispatcher.poll() == []
+    bus.close()
+
+
+def test_dispatcher_times_each_dispatch():
+    bus = EventBus()
+    feed = SharedFeed(hz=100, source=PushSource())
+    feed.source.push(rows(5))
+    timer = StageTimer()
+    dispatcher = ActionDispatcher(bus, AlertEngine(bus=bus), compile_rules(DEFAULT_ACTIONS), timer=timer)
+    dispatcher.follow(feed)
+    dispatcher.poll()
+    dispatcher.poll()
+    summary = timer.summary()
+    assert list(summary) == ["debounce", "publish actions"]
+    assert [stage['count'] for stage in summary.values()] == [5, 5]
+    bus.close()
@@ -0,0 +1,97 @@
+import gc
+import threading
+import time
+
+import pytest
+
+from safedrive.events import EventBus, LevelChange, NotificationIssued, stats_table
+
+
+def change(seq):
+    return LevelChange(seq, float(seq), "Stress", "Low", "High")
+
+
+def seqs(events):
+    return [event.seq for event in events]
+
+
+def test_drop_oldest_keeps_the_latest_events():
+    bus = EventBus()
+    subscription = bus.subscribe("ui", (LevelChange,), maxsize=3, policy='drop_oldest')
+    assert [bus.publish(change(i)) for i in range(5)] == [1] * 5
+    assert seqs(subscription.drain()) == [2, 3, 4]
+    assert (subscription.delivered, subscription.dropped, subscription.consumed, subscription.max_depth) == (5, 2, 3, 3)
+
+
+def test_drop_newest_keeps_the_first_events():
+    bus = EventBus()
+    subscription = bus.subscribe("log", (LevelChange,), maxsize=3, policy='drop_newest')
+    assert [bus.publish(change(i)) for i in range(5)] == [1, 1, 1, 0, 0]
+    assert seqs(subscription.drain()) == [0, 1, 2]
+    assert (subscription.delivered, subscription.dropped) == (3, 2)
+    assert "| log | drop_newest | 0/3 | 3 | 3 | 2 | 0 |" in stats_table(bus)
+
+
+def test_block_waits_for_space_then_drops_after_the_timeout():
+    bus = EventBus()
+    subscription = bus.subscribe("actions", (LevelChange,), maxsize=1, policy='block', timeout=0.05)
+    bus.publish(change(0))
+    start = time.perf_counter()
+    assert bus.publish(change(1)) == 0
+    assert time.perf_counter() - start >= 0.05
+    assert subscription.dropped == 1
+
+    # A consumer that frees a slot within the timeout lets the publisher through
+    subscription.timeout = 5.0
+    reader = threading.Timer(0.05, subscription.get)
+    reader.start()
+    assert bus.publish(change(2)) == 1
+    reader.join()
+    assert seqs(subscription.drain()) == [2] and subscription.dropped == 1
+
+
+def test_subscribers_only_get_their_event_types():
+    bus = EventBus()
+    levels = bus.subscribe("levels", (LevelChange,))
+    notifications = bus.subscribe("notifications", (NotificationIssued,))
+    bus.publish(change(0))
+    bus.publish(NotificationIssued(1, 1.0, "Stress", "High", "Take a break"))
+    assert seqs(levels.drain()) == [0] and seqs(notifications.drain()) == [1]
+    assert bus.stats()['published'] == {'LevelChange': 1, 'NotificationIssued': 1}
+
+
+def test_dropped_polled_subscription_unsubscribes_itself():
+    bus = EventBus()
+    kept = bus.subscribe("kept", (LevelChange,))
+    subscription = bus.subscribe("session", (LevelChange,))
+    del subscription
+    gc.collect()
+    assert [s.name for s in bus.subscriptions()] == ["kept"]
+    assert bus.publish(change(0)) == 1 and seqs(kept.drain()) == [0]
+
+
+def test_handler_errors_are_counted_and_do_not_stop_the_thread():
+    bus = EventBus()
+    handled = []
+    done = threading.Event()
+
+    def handler(event):
+        if event.seq == 0:
+            raise KeyError("boom")
+        handled.append(event.seq)
+        done.set()
+
+    subscription = bus.subscribe("handler", (LevelChange,), handler=handler)
+    try:
+        bus.publish(change(0))
+        bus.publish(change(1))
+        assert done.wait(5)
+    finally:
+        bus.close()
+    assert handled == [1]
+    assert subscription.errors == 1 and subscription.last_error == "KeyError('boom')"
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        EventBus().subscribe("bad", policy='drop_all')
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+import pytest
+
+from safedrive.executor import ActionExecutor, ActionRequest, BackgroundExecutor, MockVehicleBackend
+
+SEAT = ActionRequest("Fatigue", "Moderate", "Adjust Seat Position")
+HORN = ActionRequest("Fatigue", "Critical", "Activate Horn")
+
+
+def test_critical_request_is_not_delayed_by_a_saturated_normal_lane():
+    backend = MockVehicleBackend({"Adjust Seat Position": 0.2, "Activate Horn": 0.01}, jitter=0.0)
+    executor = ActionExecutor(backend, concurrency=2, critical_concurrency=1)
+
+    async def run():
+        backlog = asyncio.ensure_future(executor.dispatch([SEAT] * 10))
+        await asyncio.sleep(0.02)
+        start = time.perf_counter()
+        [result] = await executor.dispatch([HORN])
+        waited = time.perf_counter() - start
+        await backlog
+        return result, waited
+
+    result, waited = asyncio.run(run())
+    assert result.status == 'ok'
+    # Behind the normal lane it would wait for several 200 ms seat adjustments
+    assert waited < 0.1
+    assert executor.stats['ok'] == 11
+
+
+def test_slow_backend_call_times_out_at_its_budget():
+    backend = MockVehicleBackend({"Adjust Seat Position": 1.0}, jitter=0.0)
+    executor = ActionExecutor(backend, budgets={"Adjust Seat Position": 0.05})
+    [result] = asyncio.run(executor.dispatch([SEAT]))
+    assert result.status == 'timeout' and result.latency < 0.5
+    assert executor.stats == {'timeout': 1}
+
+
+def test_close_cancels_actions_in_flight_and_closes_the_loop():
+    background = BackgroundExecutor(MockVehicleBackend({"Adjust Seat Position": 10.0}, jitter=0.0),
+                                    budgets={"Adjust Seat Position": 20.0})
+    future = background.submit([SEAT, SEAT])
+    time.sleep(0.02)
+    start = time.perf_counter()
+    background.close()
+    assert time.perf_counter() - start < 1.0
+    assert future.cancelled() and background.loop.is_closed()
+    background.close()
+    with pytest.raises(RuntimeError):
+        background.submit([SEAT])
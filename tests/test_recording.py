@@ -0,0 +1,85 @@
+import numpy as np
+
+from safedrive.executor import ActionRequest
+from safedrive.recording import HEADER, RECORD, RecordingReader, RecordingWriter, action_masks
+from safedrive.telemetry import Sample, to_display
+
+SAMPLE = Sample(72, 55, 97, 120, 80, 95, 36.6, 0, 1, 2)
+
+
+def test_appending_after_a_torn_record_keeps_records_aligned(tmp_path):
+    path = tmp_path / "torn.sdsrec"
+    with RecordingWriter(path, start=1000.0) as writer:
+        for i in range(2):
+            writer.append(SAMPLE, now=1000.0 + i)
+    with open(path, 'ab') as f:
+        f.write(b"\x01\x02\x03")
+    with RecordingWriter(path) as writer:
+        assert writer.start == 1000.0
+        for i in range(3):
+            writer.append(SAMPLE, now=1002.0 + i)
+    assert path.stat().st_size == HEADER.size + 5 * RECORD.size
+    reader = RecordingReader(path)
+    assert [reader.sample(i) for i in range(len(reader))] == [SAMPLE] * 5
+    assert list(reader.records['t_ms']) == [0, 1000, 2000, 3000, 4000]
+
+
+def test_a_torn_header_is_replaced(tmp_path):
+    path = tmp_path / "header.sdsrec"
+    path.write_bytes(b"SDS")
+    with RecordingWriter(path, start=5.0) as writer:
+        writer.append(SAMPLE, now=6.0)
+    reader = RecordingReader(path)
+    assert reader.start == 5.0 and reader.sample(0) == SAMPLE
+
+
+def test_samples_and_actions_round_trip(tmp_path):
+    path = tmp_path / "round.sdsrec"
+    hot = Sample(131, 18, 88, 165, 104, 240, 38.25, 3, 2, 1)
+    requests = [
+        ActionRequest("Stress", "Critical", "Reduce Speed"),
+        ActionRequest("Stress", "Critical", "Send Notification"),
+        ActionRequest("Health Crisis", "Moderate", "Call Emergency Services"),
+    ]
+    batch = {name: np.array([value, value]) for name, value in zip(Sample._fields, hot)}
+    with RecordingWriter(path, start=100.0) as writer:
+        writer.append(SAMPLE, now=100.0)
+        writer.append(hot, requests, now=100.5)
+        writer.append_batch(batch, [101.0, 101.25], masks=[action_masks(requests)] * 2)
+    reader = RecordingReader(path)
+    assert len(reader) == 4 and writer.clamped == 0
+    assert [reader.sample(i) for i in range(4)] == [SAMPLE, hot, hot, hot]
+    assert list(reader.timestamps()) == [100.0, 100.5, 101.0, 101.25]
+
+    columns = RecordingReader.unpack(reader.records)
+    for name, value in zip(Sample._fields, hot):
+        assert columns[name][1:].tolist() == [value] * 3
+    assert columns['body_temp'][0] == 36.6
+
+    display, actions = reader.decode(1)
+    assert display == to_display(hot)
+    assert actions == {
+        "Stress": ["Send Notification", "Reduce Speed"],
+        "Fatigue": [],
+        "Health Crisis": ["Call Emergency Services"],
+    }
+    assert reader.decode(3)[1] == actions
+    assert reader.decode(0)[1] == {"Stress": [], "Fatigue": [], "Health Crisis": []}
+
+
+def test_out_of_range_vitals_are_clamped_and_counted(tmp_path):
+    path = tmp_path / "clamped.sdsrec"
+    with RecordingWriter(path, start=0.0) as writer:
+        writer.append(SAMPLE._replace(heart_rate=300), now=0.0)
+        writer.append(SAMPLE._replace(bp_systolic=-5, blood_sugar=70000), now=1.0)
+        writer.append(SAMPLE, now=2.0)
+        batch = {name: np.array([value, value]) for name, value in zip(Sample._fields, SAMPLE)}
+        batch['spo2'][1] = 256
+        writer.append_batch(batch, [3.0, 4.0])
+    assert writer.clamped == 3
+    reader = RecordingReader(path)
+    assert reader.sample(0) == SAMPLE._replace(heart_rate=255)
+    # A negative systolic must not borrow from the diastolic byte
+    assert reader.sample(1) == SAMPLE._replace(bp_systolic=0, blood_sugar=65535)
+    assert [reader.sample(i) for i in (2, 3)] == [SAMPLE] * 2
+    assert reader.sample(4) == SAMPLE._replace(spo2=255)
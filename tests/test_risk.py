@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from safedrive.risk import RiskEngine
+from safedrive.telemetry import generate_batch, make_rng
+
+NORMAL = {
+    'heart_rate': 75, 'hrv': 50, 'spo2': 98, 'bp_systolic': 120, 'bp_diastolic': 80,
+    'blood_sugar': 95, 'body_temp': 36.6,
+}
+
+
+def batch(n=1, **vitals):
+    return {name: np.full(n, vitals.get(name, value)) for name, value in NORMAL.items()}
+
+
+@pytest.fixture(scope='module')
+def simulated_levels():
+    rng = make_rng(7)
+    engine = RiskEngine(2000)
+    counts = {name: np.zeros(4) for name in ('stress', 'fatigue', 'health')}
+    for step in range(200):
+        levels = engine.update(generate_batch(2000, rng))
+        if step >= engine.window:
+            for name, codes in levels.items():
+                counts[name] += np.bincount(codes, minlength=4)
+    return {name: c / c.sum() for name, c in counts.items()}
+
+
+@pytest.mark.parametrize('category', ['stress', 'fatigue', 'health'])
+def test_simulated_vitals_match_the_documented_distribution(simulated_levels, category):
+    low, moderate, high, critical = simulated_levels[category]
+    assert 0.55 < low < 0.72
+    assert 0.18 < moderate < 0.33
+    assert 0.05 < high < 0.13
+    assert 0.005 < critical < 0.03
+
+
+def test_spo2_dips_are_scored_against_the_drivers_baseline():
+    steady_low, dropping = RiskEngine(), RiskEngine()
+    for _ in range(30):
+        steady_low.update(batch(spo2=93))
+        dropping.update(batch(spo2=98))
+    assert steady_low.update(batch(spo2=93))['health'][0] == 0
+    assert dropping.update(batch(spo2=94))['health'][0] == 1
+
+
+def test_sustained_dips_with_fever_are_critical():
+    engine = RiskEngine()
+    for _ in range(30):
+        engine.update(batch(spo2=98))
+    for _ in range(25):
+        levels = engine.update(batch(spo2=90, body_temp=39.6))
+    assert levels['health'][0] == 3
@@ -0,0 +1,40 @@
+from safedrive.sessions import SessionRegistry
+
+
+class Blob:
+    def __init__(self, size):
+        self.size = size
+
+    @property
+    def nbytes(self):
+        return self.size
+
+
+def test_enforce_evicts_over_budget_then_least_recently_active():
+    registry = SessionRegistry(session_budget=10_000, server_budget=0, idle_after=100.0)
+    sizes = {'big': 20_000, 'oldest': 8_000, 'older': 8_000, 'kept': 8_000, 'idle': 8_000,
+             'active': 8_000, 'active big': 20_000}
+    last_active = {'big': 50.0, 'oldest': 10.0, 'older': 40.0, 'kept': 5.0, 'idle': 60.0,
+                   'active': 990.0, 'active big': 995.0}
+    memories = {}
+    for label, size in sizes.items():
+        memory = memories[label] = registry.register()
+        memory.get('trends', lambda: Blob(size))
+        memory.touch(now=last_active[label])
+    names = {memory.name: label for label, memory in memories.items()}
+    # Evicting the three sessions ahead of 'idle' brings the server back within budget
+    registry.server_budget = sum(memories[label].nbytes for label in ('kept', 'idle', 'active', 'active big'))
+
+    evicted = registry.enforce(now=1000.0, keep=memories['kept'])
+    assert [names[name] for name in evicted] == ['big', 'oldest', 'older']
+    assert registry.nbytes == registry.server_budget
+    assert memories['kept'].peek('trends') is not None and memories['idle'].peek('trends') is not None
+    assert memories['big'].peek('trends') is None and memories['big'].evictions == 1
+
+    # Within the server budget only sessions over their own budget go, once idle
+    assert registry.enforce(now=1000.0) == []
+    evicted = registry.enforce(now=1100.0)
+    assert [names[name] for name in evicted] == ['active big']
+    assert registry.evictions == 4
+    assert all(memories[label].nbytes == 0 for label in ('big', 'oldest', 'older', 'active big'))
+    assert registry.evicted_bytes > sum(sizes[label] for label in ('big', 'oldest', 'older', 'active big'))
@@ -0,0 +1,95 @@
+import asyncio
+import json
+import socket
+import threading
+import time
+
+import pytest
+
+from safedrive.sources import ReplaySource, WebSocketSource, batch_len
+
+HEADER = "heart_rate,hrv,spo2,bp_systolic,bp_diastolic,blood_sugar,body_temp,stress,fatigue,health"
+ROW = "72,55,97,120,80,95,36.6,Low,1,0"
+SAMPLE = {
+    'heart_rate': 72, 'hrv': 55, 'spo2': 97, 'bp_systolic': 120, 'bp_diastolic': 80,
+    'blood_sugar': 95, 'body_temp': 36.6, 'stress': 'Low', 'fatigue': 1, 'health': 0,
+}
+
+
+def test_replay_drops_rows_with_bad_levels_or_vitals(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text("\n".join([
+        HEADER,
+        ROW,
+        "72,55,97,120,80,95,36.6,5,1,0",
+        "72,55,97,120,80,95,36.6,Low,-1,0",
+        "72,55,97,120,80,95,36.6,Low,1,Extreme",
+        "72,55,97,120,80,95,36.6,Low,1.5,0",
+        "40000,55,97,120,80,95,36.6,Low,1,0",
+        "72,,97,120,80,95,36.6,Low,1,0",
+        "72,55,97,120,80,95,inf,Low,1,0",
+        "131,18,88,165,104,240,38.25,Critical,3,2",
+    ]) + "\n")
+    source = ReplaySource(path, speed=1000.0)
+    assert len(source) == 2 and source.malformed == 7
+    assert source.stats()['malformed'] == 7
+    time.sleep(0.01)
+    batch = source.read()
+    assert batch['heart_rate'].tolist() == [72, 131]
+    assert batch['stress'].tolist() == [0, 3] and batch['health'].tolist() == [0, 2]
+    assert batch['body_temp'].tolist() == [36.6, 38.25]
+
+
+def test_replay_keeps_timestamps_of_the_valid_rows(tmp_path):
+    path = tmp_path / "log.csv"
+    path.write_text(f"t,{HEADER}\n10,{ROW}\n11,{ROW.replace('Low', 'Severe')}\n12.5,{ROW}\n")
+    source = ReplaySource(path)
+    assert source.malformed == 1 and source.offsets.tolist() == [0.0, 2.5]
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_websocket_source_retries_until_the_server_is_up():
+    websockets = pytest.importorskip("websockets")
+    port = free_port()
+    source = WebSocketSource(f"ws://127.0.0.1:{port}", min_retry=0.05, max_retry=0.2)
+    try:
+        for _ in range(100):
+            if source.error is not None:
+                break
+            time.sleep(0.01)
+        assert source.error is not None and not source.connected
+
+        async def handler(ws):
+            await ws.send(json.dumps([SAMPLE] * 3))
+            await ws.wait_closed()
+
+        ready, done = threading.Event(), threading.Event()
+
+        async def serve():
+            async with websockets.serve(handler, "127.0.0.1", port):
+                ready.set()
+                while not done.is_set():
+                    await asyncio.sleep(0.01)
+
+        server = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+        server.start()
+        assert ready.wait(5)
+        try:
+            received = 0
+            for _ in range(300):
+                received += batch_len(source.read())
+                if received:
+                    break
+                time.sleep(0.01)
+            assert received == 3
+            assert source.error is None and source.connected and source.reconnects >= 1
+        finally:
+            done.set()
+            server.join(5)
+    finally:
+        source.close()